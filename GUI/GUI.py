@@ -1,8 +1,10 @@
 # ---- IMPORT ZONE ----
 import pygame
+from concurrent.futures import ThreadPoolExecutor
 from win32api import GetSystemMetrics
 from start_game.start import Game
 from start_game.minimax import EasyMode, MediumMode, HardMode
+from start_game.mcts import MonteCarloMode
 import math
 import numpy as np
 
@@ -14,14 +16,18 @@ class GuiElements(Game):
         self._DISPLAY_WIDTH = GetSystemMetrics(0)
         self._DISPLAY_HEIGHT = GetSystemMetrics(1)
         self._GAME_DISPLAY = pygame.display.set_mode((self._DISPLAY_WIDTH, self._DISPLAY_HEIGHT))
+        # the largest size of a square of the board, it is smaller if the board does not fit on the screen
         self._SQUARE_SIZE = 100
-        self._RADIUS = self._SQUARE_SIZE / 2 - 5
+        self._BOARD_LEFT = 415
         self._transparent_black = (0, 0, 0, 200)
         self._black = (0, 0, 0, 255)
         self._white = (255, 255, 255)
         self._blue = (0, 0, 200)
         self._purple = (221, 160, 221)
         self._indigo = (138, 43, 226)
+        self._FPS = 60
+        self._clock = pygame.time.Clock()
+        self._dirty_rects = []
 
     # --- getters ----
     def game_display(self):
@@ -34,7 +40,14 @@ class GuiElements(Game):
         return self._DISPLAY_HEIGHT
 
     def square_size(self):
-        return self._SQUARE_SIZE
+        """
+        The size of a square of the board, so that the board fits under the menu bar and right of the left margin
+        """
+        return int(min(self._SQUARE_SIZE, (self._DISPLAY_HEIGHT - 200) // self.rowcount(),
+                       (self._DISPLAY_WIDTH - self._BOARD_LEFT) // self.columncount()))
+
+    def radius(self):
+        return self.square_size() / 2 - 5
 
     # --- objects ---
     def button(self, msg, color, x, y, w, h, ic, ac, action=None, actionArgs=None):
@@ -50,7 +63,7 @@ class GuiElements(Game):
         :param ac: Active color (when a mouse is hovering)
         :param action: The function that is called after pressing the button
         :param actionArgs: Function arguments (type: tuple)
-        :return:
+        :return: the area of the button (type: <class 'pygame.Rect'>)
         """
         mouse = pygame.mouse.get_pos()  # position of the mouse
         click = pygame.mouse.get_pressed(5)  # if you click
@@ -75,6 +88,7 @@ class GuiElements(Game):
         # the text on the buttons
 
         self.text("comicsansms", 30, msg, color, x, y)
+        return rect1
 
     def text(self, font, font_size, text, color, x, y):
         """
@@ -118,6 +132,7 @@ class GuiElements(Game):
         shape_surf = pygame.Surface(pygame.Rect(rect1).size, pygame.SRCALPHA)
         pygame.draw.rect(shape_surf, self._black, shape_surf.get_rect())
         self._GAME_DISPLAY.blit(shape_surf, rect1)
+        return rect1
 
     def draw_circle(self, pos_x, turn):
         """
@@ -125,15 +140,32 @@ class GuiElements(Game):
         :param pos_x: the center in the axis Ox of the circle
         :param turn: who needs to play
         """
-        self.mini_background(self._DISPLAY_WIDTH / 2, 100, self._DISPLAY_WIDTH / 2, 200)
+        self._dirty_rects.append(self.mini_background(self._DISPLAY_WIDTH / 2, 100, self._DISPLAY_WIDTH / 2, 200))
         if turn == 'player1':
             pygame.draw.circle(self._GAME_DISPLAY, self.color('player1 color'),
-                               (pos_x, 100 + self._SQUARE_SIZE / 2), self._RADIUS)
+                               (pos_x, 100 + self.square_size() / 2), self.radius())
         else:
             pygame.draw.circle(self._GAME_DISPLAY, self.color('player2 color'),
-                               (pos_x, 100 + self._SQUARE_SIZE / 2), self._RADIUS)
+                               (pos_x, 100 + self.square_size() / 2), self.radius())
         self.text("comicsansms", 30, turn + str('\'s turn'), self._white, self._DISPLAY_WIDTH / 2, 50)
 
+    def draw_thinking(self):
+        """
+        Show that the computer is thinking, the dots change every 300 ms so the window visibly stays alive
+        """
+        dots = (pygame.time.get_ticks() // 300) % 4
+        self._dirty_rects.append(self.mini_background(self._DISPLAY_WIDTH / 2, 100, self._DISPLAY_WIDTH / 2, 200))
+        self.text("comicsansms", 30, "computer is thinking" + "." * dots, self._white, self._DISPLAY_WIDTH / 2, 50)
+
+    def draw_search_stats(self, stats):
+        """
+        Show the search stats of the last move of the computer, under the board
+        :param stats: (type: <class SearchStats>)
+        """
+        y = self._DISPLAY_HEIGHT - 40
+        self._dirty_rects.append(self.mini_background(self._DISPLAY_WIDTH / 2, y, self._DISPLAY_WIDTH, 40))
+        self.text("comicsansms", 18, stats.summary(), self._white, self._DISPLAY_WIDTH / 2, y)
+
     # --- getter ---
     def color(self, color):
         """
@@ -173,10 +205,15 @@ class GUI(GuiElements):
     def __init__(self):
         super().__init__()
         self._ai = None
+        self._ai_worker = ThreadPoolExecutor(max_workers=1)
+        self._ai_move = None
+        self._ai_move_start = 0
         self._board = None
         self._turn = None
         self._button_clicked = "start_main_menu"
         self._button_clicked_arg = None
+        self._board_surface = None
+        self._drawn_cells = None
 
     # ---- QUIT ----
     @staticmethod
@@ -193,7 +230,7 @@ class GUI(GuiElements):
         When someone wins
         :param turn: the player who won (type: <str>)
         """
-        self.create_board()
+        self.new_game()
         self.mini_background(self.display_width() / 2, 100, self.display_width() / 2, 200)
         self.text("comicsansms", 30, turn + str(' wins!!!!!!!!'), self.color('white'), self.display_width() / 2, 50)
         pygame.display.update()
@@ -201,29 +238,61 @@ class GUI(GuiElements):
         self.main_menu()
 
     # ---- DRAW BOARD ----
-    def draw_board(self, board):
+    def board_surface(self):
+        """
+        The empty board (blue squares with black holes), drawn only once and kept
+        :return: the surface (type: <class 'pygame.Surface'>)
+        """
+        size = self.square_size()
+        if self._board_surface is None or \
+                self._board_surface.get_size() != (self.columncount() * size, self.rowcount() * size):
+            surface = pygame.Surface((self.columncount() * size, self.rowcount() * size))
+            surface.fill(self.color('board color'))
+            for c in range(self.columncount()):
+                for r in range(self.rowcount()):
+                    pygame.draw.circle(surface, self.color('black'), (c * size + size / 2, r * size + size / 2),
+                                       self.radius())
+            self._board_surface = surface
+        return self._board_surface
+
+    def draw_board(self, board, full=False):
         """
         Draw the board
-        :param board: type: <class>
-        """
-        radius = self.square_size() / 2 - 5
-        matrix = np.flip(board.boardmatrix(), 0)
-        for c in range(self.columncount()):
-            for r in range(self.rowcount()):
-                rect_x = c * self.square_size() + 415
-                rect_y = self.square_size()*(r+1)+100
-                pygame.draw.rect(self.game_display(), self.color('board color'),
-                                 (rect_x, rect_y, self.square_size(), self.square_size()))
-                if matrix[r][c] == 0:
-                    pygame.draw.circle(self.game_display(), self.color('black'),
-                                       (rect_x + self.square_size()/2, rect_y + self.square_size()/2), radius)
-                elif int(matrix[r][c]) == 1:
-                    pygame.draw.circle(self.game_display(), self.color('player1 color'),
-                                       (rect_x + self.square_size()/2, rect_y + self.square_size()/2), radius)
-                else:
-                    pygame.draw.circle(self.game_display(), self.color('player2 color'),
-                                       (rect_x + self.square_size() / 2, rect_y + self.square_size() / 2), radius)
-        pygame.display.update()
+        Only the cells that changed since the last call are drawn again. Their areas are added to the dirty
+        rects, which the game loop sends to the screen.
+        :param board: type: <class Position>
+        :param full: draw all the board, not only the cells that changed (type: <bool>)
+        """
+        size = self.square_size()
+        left, top = self._BOARD_LEFT, size + 100
+        matrix = np.flip(np.array(board.to_matrix()), 0)
+        if full or self._drawn_cells is None or len(self._drawn_cells) != self.rowcount() or \
+                len(self._drawn_cells[0]) != self.columncount():
+            self.game_display().blit(self.board_surface(), (left, top))
+            self._dirty_rects.append(pygame.Rect(left, top, self.columncount() * size, self.rowcount() * size))
+            self._drawn_cells = [[0] * self.columncount() for _ in range(self.rowcount())]
+        for r in range(self.rowcount()):
+            for c in range(self.columncount()):
+                piece = int(matrix[r][c])
+                if piece == self._drawn_cells[r][c]:
+                    continue
+                cell = pygame.Rect(left + c * size, top + r * size, size, size)
+                # put back the empty hole, then the piece
+                self.game_display().blit(self.board_surface(), cell, pygame.Rect(c * size, r * size, size, size))
+                if piece != 0:
+                    color = self.color('player1 color') if piece == 1 else self.color('player2 color')
+                    pygame.draw.circle(self.game_display(), color, cell.center, self.radius())
+                self._drawn_cells[r][c] = piece
+                self._dirty_rects.append(cell)
+
+    def update_display(self):
+        """
+        Send only the dirty rects to the screen, then wait so the loop runs at most FPS times per second
+        """
+        if self._dirty_rects:
+            pygame.display.update(self._dirty_rects)
+            self._dirty_rects = []
+        self._clock.tick(self._FPS)
 
     # ---- MANAGE THE GAME ----
     def player_turn(self, board, turn, event):
@@ -232,7 +301,7 @@ class GUI(GuiElements):
         Execute player's turn
 
         --- Parameters
-        :param board: (type: <class>)
+        :param board: (type: <class Position>)
         :param turn: either player1 or player2 (type: <str>)
         :param event: get the events from the screen (from pygame)
 
@@ -243,38 +312,62 @@ class GUI(GuiElements):
         if event.type == pygame.QUIT:
             pygame.quit()
             quit()
+        if turn == 'player_ai':
+            # the computer is thinking, the player cannot move for it
+            return game_over, board, turn
+        # the piece stays above the board, not closer to its edges than the radius
+        size = self.square_size()
+        low, high = self._BOARD_LEFT + size * 0.45, self._BOARD_LEFT + self.columncount() * size - size * 0.4
         if event.type == pygame.MOUSEMOTION:
             pos_x = event.pos[0]
-            if 460 < pos_x < 1075:
+            if low < pos_x < high:
                 self.draw_circle(pos_x, turn)
         if event.type == pygame.MOUSEBUTTONDOWN:
             pos_x = event.pos[0]
-            col = int(math.floor((pos_x - 415) / self.square_size()))
-            if 460 < pos_x < 1075:
+            col = int(math.floor((pos_x - self._BOARD_LEFT) / size))
+            if low < pos_x < high:
                 game_over, board, turn = self.run_game(board, turn, col)
                 self.draw_circle(pos_x, turn)
                 self.draw_board(board)
         return game_over, board, turn
 
+    def computer_move(self, position):
+        """
+        --- Description
+        Find the computer's move. It runs in the worker thread, so it only reads its own copy of the board.
+
+        --- Parameters
+        :param position: a copy of the board (type: <class Position>)
+
+        --- Return
+        :return: the column (type: <int>)
+        """
+        return self.find_computer_move(self._ai, position)
+
     def computer_turn(self, board, turn):
         """
         --- Description
-        Execute player's turn
+        Execute computer's turn without blocking the window.
+        The first call starts the search in the worker thread. The next calls show that the computer is thinking,
+        until the move is ready and at least a second has passed, then the move is played.
 
         --- Parameters
-        :param board: (type: <class>)
-        :param turn: either player1 or player2 (type: <str>)
+        :param board: (type: <class Position>)
+        :param turn: player_ai (type: <str>)
 
         --- Return
         :return: if it is game over or not, the board, the turn
         """
-        op = None
-        if self.difficulty() == "easy":
-            op = self._ai.calculate_move(board)
-        elif self.difficulty() == "medium":
-            op = self._ai.pick_best_move(board, 2)
-        elif self.difficulty() == "hard":
-            op, minimax_score = self._ai.minimax(board, 3, math.inf, -math.inf, True)
+        if self._ai_move is None:
+            self._ai_move = self._ai_worker.submit(self.computer_move, board.copy())
+            self._ai_move_start = pygame.time.get_ticks()
+        if not self._ai_move.done() or pygame.time.get_ticks() - self._ai_move_start < 1000:
+            self.draw_thinking()
+            return False, board, turn
+        op = self._ai_move.result()
+        self._ai_move = None
+        if self.difficulty() == "hard" and self.show_search_stats():
+            self.draw_search_stats(self._ai.search_stats())
         game_over, board, turn = self.run_game(board, turn, op)
         return game_over, board, turn
 
@@ -284,7 +377,7 @@ class GUI(GuiElements):
         The main function for the game, processing the information
 
         --- Parameters
-        :param board: type: <class>
+        :param board: type: <class Position>
         :param turn: type: <str>
         """
         game_over = False
@@ -293,22 +386,23 @@ class GUI(GuiElements):
         self.background("../GUI/galaxy.jpg")
         self.mini_background(self.display_width() / 2, self.display_height() / 2, self.display_width() / 2,
                              self.display_height())
-        self.draw_board(board)
+        self.draw_board(board, True)
         pygame.display.update()
+        self._dirty_rects = []
         while not game_over:
             for event in pygame.event.get():
                 game_over, board, turn = self.player_turn(board, turn, event)
 
             if turn == 'player_ai':
-                self.mini_background(self.display_width() / 2, 100, self.display_width() / 2, 200)
-                pygame.time.wait(1000)
                 game_over, board, turn = self.computer_turn(board, turn)
-                self.draw_circle(self.display_width()/2, turn)
+                if self._ai_move is None:
+                    # the computer moved
+                    self.draw_circle(self.display_width()/2, turn)
 
-            self.button("x", "white", 1400, 100, 50, 50, self.color('transparent_black'), self.color('black'),
-                        self.quit_game)
+            self._dirty_rects.append(self.button("x", "white", 1400, 100, 50, 50, self.color('transparent_black'),
+                                                 self.color('black'), self.quit_game))
             self.draw_board(board)
-            pygame.display.update()
+            self.update_display()
 
         self.gui_winning(turn)
         self.quit_game()
@@ -343,6 +437,8 @@ class GUI(GuiElements):
             self._ai = MediumMode()
         elif difficulty == "hard":
             self._ai = HardMode()
+        elif difficulty == "mcts":
+            self._ai = MonteCarloMode()
         self.set_dif(dif)
         self._button_clicked = "run_new_game"
 
@@ -350,7 +446,7 @@ class GUI(GuiElements):
     def gui_difficulty_menu(self):
         """
         --- Description
-        Choose from easy, medium or hard
+        Choose from easy, medium, hard or Monte Carlo
         """
         self.game_display().fill(self.color('white'))
         self.background("../GUI/galaxy.jpg")
@@ -358,15 +454,18 @@ class GUI(GuiElements):
         self.text("gabriola", 215, "Connect Four", "white", (self.display_width() / 2 + 15),
                   (self.display_height() / 4))
 
-        self.button("Easy", "white", (self.display_width() / 2), (self.display_height() / 2), 300, 100,
+        self.button("Easy", "white", (self.display_width() / 2), (self.display_height() * 0.45), 300, 100,
                     self.color('transparent_black'), self.color('black'), self.change_button_clicked,
                     ("set_ai", "easy"))
-        self.button("Medium", "white", (self.display_width() / 2), (self.display_height() * 2 / 3), 300, 100,
+        self.button("Medium", "white", (self.display_width() / 2), (self.display_height() * 0.6), 300, 100,
                     self.color('transparent_black'), self.color('black'), self.change_button_clicked,
                     ("set_ai", "medium"))
-        self.button("Hard", "white", (self.display_width() / 2), (self.display_height() * 5 / 6), 300, 100,
+        self.button("Hard", "white", (self.display_width() / 2), (self.display_height() * 0.75), 300, 100,
                     self.color('transparent_black'), self.color('black'), self.change_button_clicked,
                     ("set_ai", "hard"))
+        self.button("Monte Carlo", "white", (self.display_width() / 2), (self.display_height() * 0.9), 300, 100,
+                    self.color('transparent_black'), self.color('black'), self.change_button_clicked,
+                    ("set_ai", "mcts"))
         pygame.display.update()
 
     def gui_choose_battle_mode(self, ai_exists):
@@ -462,7 +561,6 @@ class GUI(GuiElements):
             # --- Run game ---
             if self._button_clicked == "run_new_game":
                 board, turn = self.new_game()
-                self.create_board("player1", self.battle_mode())
                 self.gui_run_game(board, turn)
 
     # --- START GUI ---
@@ -474,4 +572,8 @@ class GUI(GuiElements):
         pygame.mixer.init()
         pygame.mixer.music.load("../GUI/main menu music.mp3")
         pygame.mixer.music.play(-1)
-        self.gui_start_main_menu()
+        try:
+            self.gui_start_main_menu()
+        finally:
+            # quitting the window ends here too, the game is saved as the save policy says
+            self.close()
@@ -1,12 +1,12 @@
 # ----- IMPORT ZONE -----
 import numpy as np
-import math
 import time
 import colorama
 from termcolor import colored
 
 from validator.playerValidator import validate_input, InvalidInputMode, validate_mode
 from start_game.start import Game
+from start_game.mcts import MonteCarloMode
 from start_game.minimax import EasyMode, MediumMode, HardMode
 
 
@@ -27,10 +27,11 @@ class UI(Game):
             self._ai = MediumMode()
         elif difficulty == "hard":
             self._ai = HardMode()
+        elif difficulty == "mcts":
+            self._ai = MonteCarloMode()
 
     # ----- READ COMMANDS -----
-    @staticmethod
-    def read_player_move(player):
+    def read_player_move(self, player):
         """
         --- Description
         Read the player's move
@@ -46,7 +47,7 @@ class UI(Game):
         elif player == 'player2':
             print(colored("\n --- PLAYER 2 ---", "red"))
 
-        print("> What column are you choosing? (0-6)")
+        print("> What column are you choosing? (0-" + str(self.columncount() - 1) + ")")
 
         column = input("\tcolumn:")
         return column
@@ -63,15 +64,11 @@ class UI(Game):
         :return: the column (type:str)
         """
         print(colored("\n --- COMPUTER ---", "red"))
-        print("> What column are you choosing? (0-6)")
-        op = ""
-        if self.difficulty() == "easy":
-            op = self._ai.calculate_move(board)
-        elif self.difficulty() == "medium":
-            op = self._ai.pick_best_move(board, 2)
-        elif self.difficulty() == "hard":
-            op, minimax_score = self._ai.minimax(board, 3, math.inf, -math.inf, True)
+        print("> What column are you choosing? (0-" + str(self.columncount() - 1) + ")")
+        op = self.find_computer_move(self._ai, board)
         print("\n> Computer chose column number " + colored(str(op), "green"))
+        if self.difficulty() == "hard" and self.show_search_stats():
+            print(colored("  " + self._ai.search_stats().summary(), "cyan"))
         return op
 
     # ----- CHOOSE MODES (MENU MODES) -----
@@ -126,13 +123,14 @@ class UI(Game):
         Choose difficulty
 
         --- Returns
-        :return: easy, medium or hard (type: <str>)
+        :return: easy, medium, hard or mcts (type: <str>)
         """
         try:
             print("\n Choose a difficulty:")
             print("\t 1.Easy")
             print("\t 2.Medium")
             print("\t 3.Hard")
+            print("\t 4.Monte Carlo")
             option = input(" >your option: ")
             option = validate_mode(option, "difficulty_mode")
             if option == 1:
@@ -141,6 +139,8 @@ class UI(Game):
                 return "medium"
             elif option == 3:
                 return "hard"
+            elif option == 4:
+                return "mcts"
         except InvalidInputMode as err:
             print(err)
 
@@ -152,7 +152,7 @@ class UI(Game):
         Colors the elements in the matrix
 
         --- Parameters
-        :param x: the element (type: <float>)
+        :param x: the element (type: <int>)
 
         -Returns
         :return: blue for the first player, red for second player/computer (type: <int>)
@@ -163,8 +163,8 @@ class UI(Game):
         return f'{c}{int(x)}'
 
     def print_board(self, board):
-        np.set_printoptions(formatter={'float': self.color_sign})
-        print(np.flip(board.boardmatrix(), 0))
+        np.set_printoptions(formatter={'int': self.color_sign})
+        print(np.flip(np.array(board.to_matrix()), 0))
 
     @staticmethod
     def win_players(turn):
@@ -196,7 +196,7 @@ class UI(Game):
             except ValueError as err:
                 print(err)
         self.win_players(turn)
-        board.create_board()
+        self.new_game()
 
     def main_menu_ui(self):
         """
@@ -205,7 +205,14 @@ class UI(Game):
             -Main Menu with new game/load game
             -Player menu with one player/two players
             -Difficulty menu with easy/medium/hard mode
+        The game is closed at the end, even if the program is stopped, so it is saved as the save policy says.
         """
+        try:
+            self._main_menu_loop()
+        finally:
+            self.close()
+
+    def _main_menu_loop(self):
         game_over = False
         while not game_over:
             mode = self.game_mode()
@@ -0,0 +1,432 @@
+# ----- IMPORT ZONE -----
+import random
+import numpy as np
+
+
+# ----- TABLES ZONE -----
+# The tables of a geometry, computed once for every (rows, columns, connect) and shared by all the positions:
+# the cells and the bit masks of all the windows of <connect> cells, the windows of every cell, and the shifts
+# and the win check
+_WINDOW_CELLS = {}
+_WINDOW_MASKS = {}
+_CELL_WINDOWS = {}
+_WIN_CHECKS = {}
+# The Zobrist keys: one random 64-bit number for every (piece, cell), for every board size.
+# The generator has a fixed seed, so a position has the same hash in every process and every run.
+_ZOBRIST_KEYS = {}
+
+
+def _zobrist_keys(rows, columns):
+    """
+    --- Return
+    :return: the Zobrist keys indexed by piece and then by bit (type: <list of lists>)
+    """
+    if (rows, columns) not in _ZOBRIST_KEYS:
+        generator = random.Random(rows * 1000 + columns)
+        bits = (rows + 1) * columns
+        _ZOBRIST_KEYS[(rows, columns)] = [[0] * bits] + \
+                                         [[generator.getrandbits(64) for _ in range(bits)] for _ in range(2)]
+    return _ZOBRIST_KEYS[(rows, columns)]
+
+
+# ----- FUNCTION ZONE -----
+def win_check(stride, connect):
+    """
+    --- Description
+    The function which checks if a bitboard has <connect> in a row, made once for every (stride, connect).
+    For every direction, the bitboard is and-ed with itself shifted by k steps: a bit that survives is the start
+    of a run k steps longer. k can be at most the length already found, so the runs grow 1, 2, 4, ... steps long
+    until they are <connect> long: four in a row takes two shifts (one step, then two steps), five takes three.
+    The shifts in bits are computed here, so the check itself only shifts and ands.
+
+    --- Parameters
+    :param stride: the number of bits of a column, rows + 1 (type: <int>)
+    :param connect: how many pieces in a row win (type: <int>)
+
+    --- Return
+    :return: the check, it takes a bitboard and returns true if it has <connect> in a row (type: <function>)
+    """
+    if (stride, connect) not in _WIN_CHECKS:
+        steps = []
+        length = 1
+        while length < connect:
+            step = min(length, connect - length)
+            steps.append(step)
+            length += step
+        # vertical, horizontal, diagonal (low left, rise to right), diagonal (up left, go down to right)
+        shifts = tuple(tuple(direction * step for step in steps) for direction in (1, stride, stride + 1, stride - 1))
+
+        if len(steps) == 2:
+            # connect 3 and 4, the usual game: the two shifts are unrolled
+            def check(bitboard):
+                for one, two in shifts:
+                    runs = bitboard & (bitboard >> one)
+                    if runs & (runs >> two):
+                        return True
+                return False
+        else:
+            def check(bitboard):
+                for direction in shifts:
+                    runs = bitboard
+                    for shift in direction:
+                        runs &= runs >> shift
+                    if runs:
+                        return True
+                return False
+        _WIN_CHECKS[(stride, connect)] = check
+    return _WIN_CHECKS[(stride, connect)]
+
+
+def matrix_bitboard(matrix, piece):
+    """
+    --- Description
+    Build the bitboard of one piece straight from a numpy matrix (row 0 is the bottom row), without a Python loop
+    over the cells: the cells are laid out column by column with an empty cell on top of every column and packed
+    into bytes.
+
+    --- Parameters
+    :param matrix: the matrix of the board (type: <numpy array>)
+    :param piece: 1 or 2 (type: <int>)
+
+    --- Return
+    :return: the bitboard (type: <int>)
+    """
+    rows, columns = matrix.shape
+    cells = np.zeros((columns, rows + 1), dtype=bool)
+    cells[:, :rows] = (matrix == piece).T
+    return int.from_bytes(np.packbits(cells.ravel(), bitorder='little').tobytes(), 'little')
+
+
+# ----- EXCEPTIONS ZONE -----
+class InvalidMove(Exception):
+    def __init__(self, msg):
+        super().__init__(msg)
+
+
+# ----- CLASS ZONE -----
+class Position:
+    """
+    --- Description
+    A compact Connect Four position used by the rules and the AI. The board can have any size and the game can be
+    won with any number of pieces in a row (connect), 6 rows, 7 columns and connect 4 by default.
+
+    Every player has one bitboard (an int). Column c owns the bits c * (rows + 1) ... c * (rows + 1) + rows - 1,
+    bit 0 of a column is the bottom row. The extra bit on top of every column always stays empty, so the shifts
+    used for finding <connect> in a row never wrap from one column into the next one.
+    A move is O(1): it sets one bit and increments the height of the column. Undoing it does the opposite.
+    The Zobrist hash of the position is updated with the move, so it never has to be computed from scratch.
+    """
+    __slots__ = ('_rows', '_columns', '_connect', '_stride', '_bitboards', '_heights', '_moves', '_zobrist', '_hash',
+                 '_win_check')
+
+    def __init__(self, rows=6, columns=7, connect=4):
+        self._rows = rows
+        self._columns = columns
+        self._connect = connect
+        self._stride = rows + 1
+        self._win_check = win_check(rows + 1, connect)
+        self._bitboards = [0, 0, 0]  # index 1 is player1, index 2 is player2/computer, index 0 is unused
+        self._heights = [0] * columns
+        self._moves = []
+        self._zobrist = _zobrist_keys(rows, columns)
+        self._hash = 0
+
+    # ----- CREATE -----
+    @classmethod
+    def from_matrix(cls, matrix, rows=6, columns=7, connect=4):
+        """
+        --- Description
+        Build a position from a matrix (row 0 is the bottom row)
+
+        --- Parameters
+        :param matrix: the matrix of the board (type: <list of lists> or <numpy array>)
+        :param rows: the number of rows (type: <int>)
+        :param columns: the number of columns (type: <int>)
+        :param connect: how many pieces in a row win (type: <int>)
+
+        --- Return
+        :return: the position (type: <class Position>)
+        """
+        position = cls(rows, columns, connect)
+        for col in range(columns):
+            for row in range(rows):
+                piece = int(matrix[row][col])
+                if piece != 0:
+                    bit = col * position._stride + row
+                    position._bitboards[piece] |= 1 << bit
+                    position._hash ^= position._zobrist[piece][bit]
+                    position._heights[col] = row + 1
+        return position
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        --- Description
+        Build a position from a board. If the board already is a position, it is returned as it is.
+
+        --- Parameters
+        :param board: a position, or a board with boardmatrix(), rowcount() and columncount() (type: <class>)
+
+        --- Return
+        :return: the position (type: <class Position>)
+        """
+        if isinstance(board, cls):
+            return board
+        return cls.from_matrix(board.boardmatrix(), board.rowcount(), board.columncount())
+
+    def copy(self):
+        """
+        --- Return
+        :return: an independent copy of the position (type: <class Position>)
+        """
+        position = Position(self._rows, self._columns, self._connect)
+        position._bitboards = list(self._bitboards)
+        position._heights = list(self._heights)
+        position._moves = list(self._moves)
+        position._hash = self._hash
+        return position
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        # the Zobrist keys are shared by all the positions of the same size, they are never copied
+        return self.copy()
+
+    def to_matrix(self):
+        """
+        --- Return
+        :return: the matrix of the board, row 0 is the bottom row (type: <list of lists>)
+        """
+        return [[self.piece_at(row, col) for col in range(self._columns)] for row in range(self._rows)]
+
+    # ----- GETTERS -----
+    def rowcount(self):
+        """
+        --- Return
+        :return: the number of rows (type: <int>)
+        """
+        return self._rows
+
+    def columncount(self):
+        """
+        --- Return
+        :return: the number of columns (type: <int>)
+        """
+        return self._columns
+
+    def connect(self):
+        """
+        --- Return
+        :return: how many pieces in a row win (type: <int>)
+        """
+        return self._connect
+
+    def bitboard(self, piece):
+        """
+        --- Return
+        :return: the bitboard of the given piece (type: <int>)
+        """
+        return self._bitboards[piece]
+
+    def key(self):
+        """
+        --- Return
+        :return: the Zobrist hash of the position (type: <int>)
+        """
+        return self._hash
+
+    def height(self, col):
+        """
+        --- Return
+        :return: how many pieces are in the column, which is also the row where the next piece drops (type: <int>)
+        """
+        return self._heights[col]
+
+    def move_count(self):
+        """
+        --- Return
+        :return: how many pieces are on the board (type: <int>)
+        """
+        return sum(self._heights)
+
+    def moves(self):
+        """
+        --- Return
+        :return: the (column, piece) moves played on this position object, oldest first (type: <list>)
+        """
+        return list(self._moves)
+
+    def piece_at(self, row, col):
+        """
+        --- Return
+        :return: 0 for an empty cell, otherwise the piece in the cell (type: <int>)
+        """
+        bit = 1 << (col * self._stride + row)
+        if self._bitboards[1] & bit:
+            return 1
+        if self._bitboards[2] & bit:
+            return 2
+        return 0
+
+    def can_play(self, col):
+        """
+        --- Return
+        :return: true if the column is not full (type: <bool>)
+        """
+        return self._heights[col] < self._rows
+
+    def valid_moves(self):
+        """
+        --- Return
+        :return: the columns that are not full, from left to right (type: <list>)
+        """
+        rows = self._rows
+        return [col for col, height in enumerate(self._heights) if height < rows]
+
+    def is_full(self):
+        """
+        --- Return
+        :return: true if there are no more valid moves (type: <bool>)
+        """
+        return self.move_count() == self._rows * self._columns
+
+    def column_mask(self, col):
+        """
+        --- Return
+        :return: the bit mask with all the cells of the column (type: <int>)
+        """
+        return ((1 << self._rows) - 1) << (col * self._stride)
+
+    def geometry(self):
+        """
+        --- Return
+        :return: the key of the tables of the board: rows, columns and connect (type: <tuple>)
+        """
+        return self._rows, self._columns, self._connect
+
+    def window_cells(self):
+        """
+        --- Description
+        The (row, column) cells of every window of <connect> cells, in the same order as the score is computed in
+        MediumMode: horizontal, vertical, diagonal (low left, rise to right), diagonal (up left, go down to right).
+        The windows are computed only once for every geometry (rows, columns, connect).
+
+        --- Return
+        :return: the windows (type: <tuple of tuples>)
+        """
+        key = self.geometry()
+        if key not in _WINDOW_CELLS:
+            rows, columns, n = key
+            cells = []
+            for r in range(rows):
+                for c in range(columns - n + 1):
+                    cells.append(tuple((r, c + i) for i in range(n)))
+            for c in range(columns):
+                for r in range(rows - n + 1):
+                    cells.append(tuple((r + i, c) for i in range(n)))
+            for r in range(rows - n + 1):
+                for c in range(columns - n + 1):
+                    cells.append(tuple((r + i, c + i) for i in range(n)))
+            for r in range(rows - n + 1):
+                for c in range(columns - n + 1):
+                    cells.append(tuple((r + n - 1 - i, c + i) for i in range(n)))
+            _WINDOW_CELLS[key] = tuple(cells)
+        return _WINDOW_CELLS[key]
+
+    def window_masks(self):
+        """
+        --- Return
+        :return: the bit masks of the windows from <window_cells>, in the same order (type: <tuple>)
+        """
+        key = self.geometry()
+        if key not in _WINDOW_MASKS:
+            stride = self._stride
+            _WINDOW_MASKS[key] = tuple(sum(1 << (c * stride + r) for r, c in window)
+                                       for window in self.window_cells())
+        return _WINDOW_MASKS[key]
+
+    def cell_windows(self):
+        """
+        --- Return
+        :return: for every cell (row * columns + column), the indices of the windows of <window_cells> which
+                 contain it (type: <tuple of tuples>)
+        """
+        key = self.geometry()
+        if key not in _CELL_WINDOWS:
+            columns = self._columns
+            cell_windows = [[] for _ in range(self._rows * columns)]
+            for index, window in enumerate(self.window_cells()):
+                for row, col in window:
+                    cell_windows[row * columns + col].append(index)
+            _CELL_WINDOWS[key] = tuple(tuple(windows) for windows in cell_windows)
+        return _CELL_WINDOWS[key]
+
+    # ----- MOVES -----
+    def play(self, col, piece):
+        """
+        --- Description
+        Drop a piece in the column
+
+        --- Parameters
+        :param col: the column (type: <int>)
+        :param piece: 1 or 2 (type: <int>)
+
+        --- Raises
+        InvalidMove - if the column is full
+
+        --- Return
+        :return: the row where the piece landed (type: <int>)
+        """
+        row = self._heights[col]
+        if row >= self._rows:
+            raise InvalidMove('The column is full!')
+        bit = col * self._stride + row
+        self._bitboards[piece] |= 1 << bit
+        self._hash ^= self._zobrist[piece][bit]
+        self._heights[col] = row + 1
+        self._moves.append((col, piece))
+        return row
+
+    def undo(self):
+        """
+        --- Description
+        Take back the last move played with <play>
+
+        --- Return
+        :return: the column and the piece of the move (type: <tuple>)
+        """
+        col, piece = self._moves.pop()
+        row = self._heights[col] - 1
+        bit = col * self._stride + row
+        self._bitboards[piece] &= ~(1 << bit)
+        self._hash ^= self._zobrist[piece][bit]
+        self._heights[col] = row
+        return col, piece
+
+    # ----- WINNING -----
+    def is_winning(self, piece):
+        """
+        --- Description
+        Check if the piece has <connect> in a row, with the shifts of <win_check>
+
+        --- Parameters
+        :param piece: 1 or 2 (type: <int>)
+
+        --- Return
+        :return: if the player is winning or not (type: <bool>)
+        """
+        return self._win_check(self._bitboards[piece])
+
+    # ----- DUNDER -----
+    def __eq__(self, other):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self._rows == other._rows and self._columns == other._columns and \
+            self._connect == other._connect and self._bitboards == other._bitboards
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return 'Position(' + str(self.to_matrix()) + ')'
@@ -0,0 +1,302 @@
+# ----- IMPORT ZONE -----
+import argparse
+import gzip
+import json
+import sys
+from domain.position import Position
+from domain.repository import GameRepository
+from validator.boardValidator import validate_column, validate_geometry, InvalidColumn, InvalidGeometry
+
+
+# ----- EXCEPTIONS ZONE -----
+class InvalidRecord(Exception):
+    def __init__(self, msg):
+        super().__init__(msg)
+
+
+# ----- FUNCTION ZONE -----
+# The board of the games which do not say their size
+DEFAULT_GEOMETRY = (6, 7, 4)
+
+
+def format_moves(columns, width=7):
+    """
+    --- Description
+    Write the moves in the usual notation of Connect Four: the columns numbered from 1, one digit for every move,
+    like 4453 (the first two moves in the center column). On boards with more than 9 columns the numbers are
+    separated by commas, like 6,6,12,1.
+
+    --- Parameters
+    :param columns: the columns of the moves, numbered from 0 like in the game (type: <list of int>)
+    :param width: the number of columns of the board (type: <int>)
+
+    --- Return
+    :return: the moves (type: <str>)
+    """
+    if width <= 9:
+        return ''.join(str(col + 1) for col in columns)
+    return ','.join(str(col + 1) for col in columns)
+
+
+def parse_moves(text, width=7):
+    """
+    --- Description
+    Read moves written with <format_moves>
+
+    --- Raises
+    InvalidRecord - if a move is not a column of the board
+
+    --- Return
+    :return: the columns, numbered from 0 (type: <list of int>)
+    """
+    words = text.split(',') if ',' in text or width > 9 else list(text)
+    columns = []
+    for word in filter(None, words):
+        if not word.isdigit() or not 1 <= int(word) <= width:
+            raise InvalidRecord('Not a column: ' + word)
+        columns.append(int(word) - 1)
+    return columns
+
+
+def game_result(position):
+    """
+    --- Return
+    :return: 1-0 if player1 won, 0-1 if player2 (or the computer) won, 1/2-1/2 for a draw and * if the game
+             is not over (type: <str>)
+    """
+    if position.is_winning(1):
+        return '1-0'
+    if position.is_winning(2):
+        return '0-1'
+    if position.is_full():
+        return '1/2-1/2'
+    return '*'
+
+
+def replay(columns, geometry=DEFAULT_GEOMETRY):
+    """
+    --- Description
+    Play the moves of a game on an empty board, with the rules of Game.run_game: player1 moves first, the players
+    take turns, a move must be in a column which is not full, and the game ends when somebody wins.
+    This is the fast path: nothing is saved and no journal is written, every move is one Position.play.
+
+    --- Parameters
+    :param columns: the columns of the moves, numbered from 0 (type: <list of int>)
+    :param geometry: the rows, the columns and how many pieces in a row win (type: <tuple>)
+
+    --- Raises
+    InvalidRecord - if a move is not valid
+
+    --- Return
+    :return: the position after the moves, it knows the moves (type: <class Position>)
+    """
+    position = Position(*geometry)
+    width = geometry[1]
+    piece = 1
+    for number, col in enumerate(columns, 1):
+        if not 0 <= col < width:
+            raise InvalidRecord('Move ' + str(number) + ': not a column: ' + str(col + 1))
+        if position.is_winning(3 - piece):
+            raise InvalidRecord('Move ' + str(number) + ': the game is already over')
+        try:
+            validate_column(position, col)
+        except InvalidColumn as err:
+            raise InvalidRecord('Move ' + str(number) + ': ' + str(err))
+        position.play(col, piece)
+        piece = 3 - piece
+    return position
+
+
+def write_record(position, metadata=None):
+    """
+    --- Description
+    One game as a line of text: the moves (see <format_moves>), then a tab and the metadata as JSON.
+    The metadata always gets the result of the game, and the size of the board if it is not the classic one.
+        4453	{"result": "*", "battle_mode": "player vs computer"}
+
+    --- Parameters
+    :param position: a game played from an empty board, so it knows its moves (type: <class Position>)
+    :param metadata: anything else about the game, for example the players or the date (type: <dict>)
+
+    --- Raises
+    InvalidRecord - if the position does not know all its moves
+
+    --- Return
+    :return: the line, without the newline (type: <str>)
+    """
+    moves = position.moves()
+    if len(moves) != position.move_count():
+        raise InvalidRecord('The moves of the game are not known')
+    geometry = position.geometry()
+    record = dict(metadata or {})
+    if geometry != DEFAULT_GEOMETRY:
+        record['rows'], record['columns'], record['connect'] = geometry
+    record['result'] = game_result(position)
+    return format_moves([col for col, piece in moves], geometry[1]) + '\t' + json.dumps(record)
+
+
+def read_record(line):
+    """
+    --- Description
+    Read one line written with <write_record> and replay the game with <replay>
+
+    --- Raises
+    InvalidRecord - if the line is not a valid game, or its result is not the one of the moves
+
+    --- Return
+    :return: the position after the moves (type: <class Position>) and the metadata (type: <dict>)
+    """
+    text, _, data = line.rstrip('\r\n').partition('\t')
+    try:
+        metadata = json.loads(data) if data.strip() else {}
+    except ValueError:
+        raise InvalidRecord('The metadata is not JSON')
+    if not isinstance(metadata, dict):
+        raise InvalidRecord('The metadata is not a JSON object')
+    geometry = (metadata.get('rows', DEFAULT_GEOMETRY[0]), metadata.get('columns', DEFAULT_GEOMETRY[1]),
+                metadata.get('connect', DEFAULT_GEOMETRY[2]))
+    try:
+        validate_geometry(*geometry)
+    except (InvalidGeometry, TypeError):
+        raise InvalidRecord('The size of the board is not valid')
+    position = replay(parse_moves(text.strip(), geometry[1]), geometry)
+    if metadata.get('result', game_result(position)) != game_result(position):
+        raise InvalidRecord('The result is ' + metadata['result'] + ', but the moves end in ' + game_result(position))
+    return position, metadata
+
+
+def read_records(lines, skip_invalid=False):
+    """
+    --- Description
+    Read the games of a file lazily, one line at a time, so an archive of any size can be streamed into the
+    analysis or into self-play without loading it. Empty lines and lines starting with # are skipped.
+
+    --- Parameters
+    :param lines: the lines of the file (type: iterable of <str>)
+    :param skip_invalid: skip the lines which are not valid games instead of stopping (type: <bool>)
+
+    --- Raises
+    InvalidRecord - if a line is not a valid game and <skip_invalid> is false, the message has the line number
+
+    --- Return
+    :return: the position and the metadata of every game (type: <generator>)
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip() or line.startswith('#'):
+            continue
+        try:
+            yield read_record(line)
+        except InvalidRecord as err:
+            if not skip_invalid:
+                raise InvalidRecord('Line ' + str(number) + ': ' + str(err))
+
+
+def write_records(games, f):
+    """
+    --- Description
+    Write games one by one as they come, see <write_record>
+
+    --- Parameters
+    :param games: the position and the metadata of every game (type: iterable of <tuple>)
+    :param f: the open text file (type: <file>)
+
+    --- Return
+    :return: how many games were written (type: <int>)
+    """
+    count = 0
+    for position, metadata in games:
+        f.write(write_record(position, metadata) + '\n')
+        count += 1
+    return count
+
+
+def open_records(path, mode='r'):
+    """
+    --- Return
+    :return: the file of games opened as text, compressed with gzip if the name ends with .gz,
+             the standard input or output for - (type: <file>)
+    """
+    if path == '-':
+        return sys.stdin if 'r' in mode else sys.stdout
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def import_games(path, skip_invalid=False):
+    """
+    --- Description
+    The games of a file, read lazily, see <read_records>
+
+    --- Return
+    :return: the position and the metadata of every game (type: <generator>)
+    """
+    f = open_records(path)
+    try:
+        yield from read_records(f, skip_invalid)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def export_games(path, games, append=False):
+    """
+    --- Description
+    Write games to a file, see <write_records>
+
+    --- Return
+    :return: how many games were written (type: <int>)
+    """
+    f = open_records(path, 'a' if append else 'w')
+    try:
+        return write_records(games, f)
+    finally:
+        if f is not sys.stdout:
+            f.close()
+
+
+# ----- COMMAND LINE ZONE -----
+def main(arguments=None):
+    """
+    --- Description
+    Work with files of games, one game on every line:
+        python -m domain.records export games.txt       (add the saved game to the file)
+        python -m domain.records check games.txt.gz     (replay every game and count the results)
+    """
+    parser = argparse.ArgumentParser(prog='python -m domain.records', description=main.__doc__.split('\n')[3])
+    commands = parser.add_subparsers(dest='command', required=True)
+    export_parser = commands.add_parser('export', help='add the saved game to a file of games')
+    export_parser.add_argument('path', help='the file of games, - for the standard output')
+    check_parser = commands.add_parser('check', help='replay every game of a file and count the results')
+    check_parser.add_argument('path', help='the file of games, - for the standard input')
+    check_parser.add_argument('--skip-invalid', action='store_true', help='skip the games which are not valid')
+    arguments = parser.parse_args(arguments)
+
+    if arguments.command == 'export':
+        saved = GameRepository().load()
+        if saved is None:
+            parser.error('there is no saved game')
+        position, turn, battle_mode, difficulty = saved
+        try:
+            export_games(arguments.path, [(position, {'battle_mode': battle_mode, 'difficulty': difficulty})],
+                         append=True)
+        except InvalidRecord as err:
+            parser.error(str(err))
+        return
+
+    results = {'1-0': 0, '0-1': 0, '1/2-1/2': 0, '*': 0}
+    moves = 0
+    try:
+        for position, metadata in import_games(arguments.path, arguments.skip_invalid):
+            results[game_result(position)] += 1
+            moves += position.move_count()
+    except InvalidRecord as err:
+        parser.error(str(err))
+    games = sum(results.values())
+    print(str(games) + ' games, ' + str(moves) + ' moves')
+    for result, count in results.items():
+        print('{:>8} {:>8}'.format(result, count))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+# ----- IMPORT ZONE -----
+import json
+import os
+import tempfile
+from domain.position import Position
+from start_game.settings import data_directory
+
+
+# ----- EXCEPTIONS ZONE -----
+class InvalidJSON(Exception):
+    def __init__(self, msg):
+        super().__init__(msg)
+
+
+# ----- FUNCTION ZONE -----
+SAVE_VERSION = 2  # version 1 had no move history
+
+# The saved games already loaded in this process, by the path of the save file. Every GameRepository of the same
+# file starts from this state instead of reading the file again, and it is updated on every save.
+_SAVED_GAMES = {}
+
+
+def board_to_string(position):
+    """
+    --- Description
+    Write the board as a string with one character for every cell, row by row, starting with the bottom row
+
+    --- Parameters
+    :param position: the board (type: <class Position>)
+
+    --- Return
+    :return: the board, for example 42 characters of 0, 1 and 2 (type: <str>)
+    """
+    return ''.join(str(position.piece_at(row, col))
+                   for row in range(position.rowcount()) for col in range(position.columncount()))
+
+
+def board_from_string(text, rows, columns, connect=4):
+    """
+    --- Description
+    Read a board written with <board_to_string>
+
+    --- Raises
+    InvalidJSON - if the string does not have one valid character for every cell, or a piece is above an empty cell
+
+    --- Return
+    :return: the board (type: <class Position>)
+    """
+    if len(text) != rows * columns or not set(text) <= {'0', '1', '2'}:
+        raise InvalidJSON('The saved board is not valid!')
+    for col in range(columns):
+        # the cells of the column from the bottom up: no piece may float above an empty cell
+        if '0' in text[col::columns].rstrip('0'):
+            raise InvalidJSON('The saved board has a piece above an empty cell!')
+    return Position.from_matrix([text[row * columns:(row + 1) * columns] for row in range(rows)], rows, columns,
+                                connect)
+
+
+def move_list(position):
+    """
+    --- Description
+    The moves of the position as [row, column, piece], the way they are saved.
+    They are known only if the position was played from an empty board, otherwise the list is empty.
+
+    --- Parameters
+    :param position: the board (type: <class Position>)
+
+    --- Return
+    :return: the moves, oldest first (type: <list>)
+    """
+    moves = position.moves()
+    if len(moves) != position.move_count():
+        return []
+    heights = [0] * position.columncount()
+    result = []
+    for col, piece in moves:
+        result.append([heights[col], col, piece])
+        heights[col] += 1
+    return result
+
+
+def write_atomic(path, text):
+    """
+    --- Description
+    Write a file so that it is either the old file or the whole new file, never a half written one:
+    the text goes to a temporary file in the same directory, which then replaces the file in one step.
+
+    --- Parameters
+    :param path: the path of the file (type: <str>)
+    :param text: the content (type: <str> or <bytes>)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(dir=directory, prefix='.save-', suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb' if isinstance(text, bytes) else 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+# ----- CLASS ZONE -----
+class GameRepository:
+    """
+    --- Description
+    Saves and loads the game: the board (a Position), whose turn it is, the battle mode and the difficulty.
+    The game itself knows nothing about files, it only hands its Position to the repository.
+    """
+
+    def __init__(self, data_dir=None):
+        """
+        Nothing is read here, the save is loaded only when a game is loaded.
+        :param data_dir: the directory of the save files, by default the one from settings.properties
+                         (type: <str>)
+        """
+        if data_dir is None:
+            data_dir = data_directory()
+        # the size of the board of the saves which do not have one, the old ones
+        self._ROWCOUNT = 6
+        self._COLUMNCOUNT = 7
+        self._CONNECT = 4
+        self._journal_length = 0
+        self._snapshot_interval = 16
+        self._save_path = os.path.join(data_dir, 'Game.json')
+        self._journal_path = os.path.join(data_dir, 'Game.journal')
+        # the layout of the old saves, with four files, which can still be loaded
+        self._file_path = os.path.join(data_dir, 'Board.json')
+        self._turn_path = os.path.join(data_dir, 'Turn.json')
+        self._battle_mode_path = os.path.join(data_dir, 'Battle mode.json')
+        self._difficulty_path = os.path.join(data_dir, 'Difficulty.json')
+
+    # ----- LOAD -----
+    def load(self):
+        """
+        --- Description
+        Load the saved game.
+        If the file was already loaded in this process, its shared state is copied instead of reading it again.
+
+        --- Return
+        :return: - the board (type: <class Position>)
+                 - whose turn it is (type: <str>)
+                 - the battle mode (type: <str>)
+                 - the difficulty (type: <str>)
+                 or None if there is no saved game
+        """
+        saved = _SAVED_GAMES.get(self._save_path)
+        if saved is None:
+            return self._load()
+        if saved['position'] is None:
+            return None
+        self._journal_length = saved['journal_length']
+        return saved['position'].copy(), saved['turn'], saved['battle_mode'], saved['difficulty']
+
+    # ----- SAVE -----
+    def record_move(self, position, row, col, piece, turn, battle_mode, difficulty):
+        """
+        --- Description
+        Save one move that was already played on the position.
+        The move is appended as one line to the journal, which costs the same for every move. Every
+        <snapshot_interval> moves a snapshot of the whole game is saved and the journal starts again empty.
+
+        --- Parameters
+        :param position: the board, with the move already played (type: <class Position>)
+        :param row: the row of the piece (type: <int>)
+        :param col: the column of the piece (type: <int>)
+        :param piece: the piece (type: <int>)
+        :param turn: whose turn it is after the move (type: <str>)
+        :param battle_mode: (type: <str>)
+        :param difficulty: (type: <str>)
+        """
+        count = position.move_count()
+        entry = {'n': count, 'move': [row, col, piece], 'turn': turn, 'battle_mode': battle_mode,
+                 'difficulty': difficulty}
+        with open(self._journal_path, 'a') as f:
+            f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self._journal_length += 1
+        if self._journal_length >= self._snapshot_interval:
+            self.save(position, turn, battle_mode, difficulty)
+            return
+        saved = _SAVED_GAMES.get(self._save_path)
+        if saved is not None and saved['position'] is not None and saved['position'].move_count() == count - 1:
+            # the shared state is the one before this move, only the move is added to it
+            saved['position'].play(col, piece)
+            saved.update(turn=turn, battle_mode=battle_mode, difficulty=difficulty,
+                         journal_length=self._journal_length)
+        else:
+            self._share(position, turn, battle_mode, difficulty)
+
+    def save(self, position, turn, battle_mode, difficulty):
+        """
+        --- Description
+        Save the file
+        This is a snapshot: everything goes in one small JSON document, written atomically,
+        {"version": 2, "rows": 6, "columns": 7, "connect": 4, "board": "<rows * columns characters>",
+         "moves": [[row, column, piece], ...], "turn": ..., "battle_mode": ..., "difficulty": ...}
+        then the journal of the moves is emptied, since the snapshot already has them.
+
+        --- Parameters
+        :param position: the board (type: <class Position>)
+        :param turn: (type: <str>)
+        :param battle_mode: (type: <str>)
+        :param difficulty: (type: <str>)
+        """
+        rows, columns, connect = position.geometry()
+        record = {'version': SAVE_VERSION, 'rows': rows, 'columns': columns, 'connect': connect,
+                  'board': board_to_string(position), 'moves': move_list(position), 'turn': turn,
+                  'battle_mode': battle_mode, 'difficulty': difficulty}
+        write_atomic(self._save_path, json.dumps(record, separators=(',', ':')))
+        # compact the journal: the moves in it are in the snapshot now
+        if os.path.exists(self._journal_path):
+            open(self._journal_path, 'w').close()
+        self._journal_length = 0
+        self._share(position, turn, battle_mode, difficulty)
+
+    def _share(self, position, turn, battle_mode, difficulty):
+        """
+        Make the game the shared state of its save file
+        """
+        _SAVED_GAMES[self._save_path] = {'position': None if position is None else position.copy(), 'turn': turn,
+                                         'battle_mode': battle_mode, 'difficulty': difficulty,
+                                         'journal_length': self._journal_length}
+
+    # ----- READ THE FILES -----
+    def _load(self):
+        """
+        Load data from file
+        The snapshot is loaded, then the moves of the journal which came after it are played again.
+        If there is no save file yet, the old layout with four files is imported and saved in the new format.
+        The file is always read again, and what was read becomes the shared state of the save file.
+        We assume file-saved data is valid
+        :return: the same as <load>
+        """
+        if os.path.exists(self._save_path):
+            with open(self._save_path) as f:
+                record = json.load(f)
+            if not isinstance(record, dict) or record.get('version') not in (1, SAVE_VERSION):
+                raise InvalidJSON('The save file has an unknown version!')
+            geometry = (record.get('rows', self._ROWCOUNT), record.get('columns', self._COLUMNCOUNT),
+                        record.get('connect', self._CONNECT))
+            position = board_from_string(record['board'], *geometry)
+            moves = record.get('moves', [])
+            if moves:
+                # play the moves again, so the position knows them, if they really make the saved board
+                played = Position(*geometry)
+                for row, col, piece in moves:
+                    played.play(col, piece)
+                if played == position:
+                    position = played
+            game = [position, record['turn'], record['battle_mode'], record['difficulty']]
+            self._replay_journal(game)
+            self._share(*game)
+        else:
+            game = self._load_legacy()
+            if game is None:
+                self._share(None, None, None, None)
+            else:
+                self.save(*game)
+        return self.load()
+
+    def _replay_journal(self, game):
+        """
+        Play again the moves of the journal that are not in the snapshot yet.
+        A last line which is not complete (the game stopped while it was written) is ignored.
+        :param game: the position, the turn, the battle mode and the difficulty, changed in place (type: <list>)
+        """
+        self._journal_length = 0
+        if not os.path.exists(self._journal_path):
+            return
+        with open(self._journal_path) as f:
+            lines = f.read().split('\n')
+        position = game[0]
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            self._journal_length += 1
+            if entry['n'] <= position.move_count():
+                continue  # the snapshot was saved, but the journal was not emptied yet
+            row, col, piece = entry['move']
+            position.play(col, piece)
+            game[1:] = entry['turn'], entry['battle_mode'], entry['difficulty']
+
+    def _load_legacy(self):
+        """
+        Load the old layout: the board, the turn, the battle mode and the difficulty in four JSON files,
+        the board as a dict of rows with the cells as strings like "0.0"
+        :return: the position, the turn, the battle mode and the difficulty, or None if there are no old files
+                 (type: <list>)
+        """
+        paths = [self._file_path, self._turn_path, self._battle_mode_path, self._difficulty_path]
+        if not all(os.path.exists(path) for path in paths):
+            return None
+        values = []
+        for path in paths:
+            with open(path) as f:
+                values.append(json.load(f))
+        data, turn, battle_mode, difficulty = values
+        matrix = [[0] * self._COLUMNCOUNT for _ in range(self._ROWCOUNT)]
+        for row in data.keys():
+            for col in data[row]:
+                matrix[int(row)][int(col)] = int(float(data[row][col]))
+        return [Position.from_matrix(matrix, self._ROWCOUNT, self._COLUMNCOUNT), turn, battle_mode, difficulty]
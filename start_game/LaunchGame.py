@@ -1,20 +1,19 @@
-import configparser
 import UI.UI
 import GUI.GUI
+from start_game.settings import load_settings
 
 
 if __name__ == '__main__':
     """
     Launch the game
     """
-    config = configparser.ConfigParser()
-    config.read("settings.properties")
+    settings = load_settings()
 
-    if str(config["Settings"]["interface"]) == 'ui':
+    if str(settings["interface"]) == 'ui':
         import pygame
         pygame.quit()
         user_interface = UI.UI.UI()
         user_interface.main_menu_ui()
-    elif str(config["Settings"]["interface"]) == 'gui':
+    elif str(settings["interface"]) == 'gui':
         graphical_user_interface = GUI.GUI.GUI()
         graphical_user_interface.start_gui()
@@ -0,0 +1,291 @@
+# ----- IMPORT ZONE -----
+import argparse
+import collections
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from domain.position import Position
+from domain.records import open_records, read_records, parse_moves, replay, InvalidRecord
+from domain.repository import board_to_string, board_from_string, InvalidJSON
+from start_game.minimax import HardMode
+from start_game.tournament import swap_pieces
+from validator.boardValidator import validate_geometry, InvalidGeometry
+
+
+# ----- EXCEPTIONS ZONE -----
+class InvalidPosition(Exception):
+    def __init__(self, msg):
+        super().__init__(msg)
+
+
+# ----- POSITIONS ZONE -----
+def parse_position(text, rows=6, columns=7, connect=4):
+    """
+    --- Description
+    Read a position written in one of two ways:
+    - the board, one character of 0, 1 or 2 for every cell, row by row from the bottom row, like the save file
+      (42 characters for the classic board)
+    - the moves, the columns played from an empty board, player1 first, in the notation of the game files
+      (see <domain.records.format_moves>): the columns start from 1, one digit for every move ('4453') or
+      separated by commas or spaces ('4,4,12,5') on wider boards
+
+    --- Raises
+    InvalidPosition - if the text is not a position of the board, for example a piece is above an empty cell
+
+    --- Return
+    :return: the position (type: <class Position>)
+    """
+    text = text.strip()
+    if len(text) == rows * columns and set(text) <= {'0', '1', '2'}:
+        try:
+            position = board_from_string(text, rows, columns, connect)
+        except InvalidJSON:
+            raise InvalidPosition('The board is not valid!')
+        if position.move_count() - 2 * position.bitboard(2).bit_count() not in (0, 1):
+            raise InvalidPosition('The players did not take turns on this board!')
+        return position
+
+    try:
+        return replay(parse_moves(','.join(text.replace(',', ' ').split()) if ' ' in text else text, columns),
+                      (rows, columns, connect))
+    except InvalidRecord as err:
+        raise InvalidPosition(str(err))
+
+
+def side_to_move(position):
+    """
+    --- Return
+    :return: the piece that moves next, player1 always starts (type: <int>)
+    """
+    return 1 if position.move_count() % 2 == 0 else 2
+
+
+def read_positions(lines, every_move=False, geometry=(6, 7, 4)):
+    """
+    --- Description
+    Read the positions of a file lazily, one by one. Empty lines and lines starting with # are skipped.
+
+    --- Parameters
+    :param lines: the lines of the file (type: iterable of <str>)
+    :param every_move: if true, a position written as moves is also given after each of its moves, from the
+                       empty board on, so every move of a game gets analysed (type: <bool>)
+    :param geometry: the rows, the columns and how many pieces in a row win (type: <tuple>)
+
+    --- Return
+    :return: (line number, text, ply, position) for every position. If the line is not a position, the ply is
+             None and the position is the error (type: <generator>)
+    """
+    for number, line in enumerate(lines, 1):
+        text = line.strip()
+        if not text or text.startswith('#'):
+            continue
+        try:
+            position = parse_position(text, *geometry)
+        except InvalidPosition as err:
+            yield number, text, None, str(err)
+            continue
+        for earlier in earlier_positions(position) if every_move else ():
+            yield number, text, earlier.move_count(), earlier
+        yield number, text, position.move_count(), position
+
+
+def earlier_positions(position):
+    """
+    --- Return
+    :return: the positions before each move of the position, from the empty board on, if it knows its moves
+             (type: <generator>)
+    """
+    if len(position.moves()) != position.move_count():
+        return
+    replayed = Position(*position.geometry())
+    for col, piece in position.moves():
+        yield replayed.copy()
+        replayed.play(col, piece)
+
+
+# ----- ANALYSIS ZONE -----
+# The hard mode of this process, made by <start_analyser>
+_analyser = None
+
+
+def start_analyser(options):
+    """
+    --- Description
+    Make the hard mode that analyses the positions of this process. It runs once in every worker process.
+
+    --- Parameters
+    :param options: depth, time, book and endgame, see <analyse_positions> (type: <dict>)
+    """
+    global _analyser
+    _analyser = HardMode(time_budget=options['time'], workers=1, opening_book=None if options['book'] else '',
+                         endgame_threshold=options['endgame'], search_log='')
+
+
+def analyse(position, depth=None, time_budget=None):
+    """
+    --- Description
+    Find the best move of the side to move with the hard mode of this process.
+    Everything the hard mode learned before is forgotten first, so the result is the same in every worker and
+    in any order.
+
+    --- Parameters
+    :param position: a position where nobody won yet (type: <class Position>)
+    :param depth: search exactly this deep, by default iterative deepening for <time_budget> seconds
+                  (type: <int>)
+    :param time_budget: the seconds for every position when there is no depth (type: <float>)
+
+    --- Return
+    :return: a dict with
+             move - the best column
+             score - the score for the side to move: more than 0 is good for it, +-10000000 minus the moves
+                     left is a forced win or loss
+             piece - the side to move
+             depth, nodes, pv, source - from the search stats of the move (see <SearchStats>)
+             seconds - the time the search took
+    """
+    piece = side_to_move(position)
+    # the hard mode always plays the piece 2
+    seen = position if piece == 2 else swap_pieces(position)
+    _analyser.clear()
+    start = time.perf_counter()
+    if depth:
+        column, score = _analyser.iterative_deepening(seen, time_budget=0, max_depth=depth)
+    else:
+        column, score = _analyser.iterative_deepening(seen, time_budget=time_budget)
+    stats = _analyser.search_stats()
+    return {'move': column, 'score': score, 'piece': piece, 'depth': stats.depth(), 'nodes': stats.nodes(),
+            'pv': list(stats.pv), 'source': stats.source, 'seconds': round(time.perf_counter() - start, 4)}
+
+
+def _analyse_job(job):
+    """
+    Runs in a worker process: the analysis of one position
+    """
+    number, text, ply, board, error, geometry, depth, time_budget = job
+    record = {'line': number, 'position': text, 'ply': ply}
+    if error is None:
+        position = board_from_string(board, *geometry)
+        if position.is_winning(1) or position.is_winning(2) or position.is_full():
+            error = 'The game is over'
+        else:
+            record.update(analyse(position, depth, time_budget))
+    if error is not None:
+        record['error'] = error
+    return record
+
+
+def analyse_positions(positions, depth=None, time_budget=1.0, workers=1, book=False, endgame=None,
+                      every_move=False, geometry=(6, 7, 4)):
+    """
+    --- Description
+    Analyse many positions with the hard mode, in <workers> processes.
+    The positions are read and the results are given one by one, in the order of the positions, and only a few
+    positions for every worker are in flight at a time, so a file of any size can be analysed in little memory.
+
+    --- Parameters
+    :param positions: the positions, as Position objects or as text (see <parse_position>), or the lines of a
+                      file (type: iterable)
+    :param depth: search every position exactly this deep, by default iterative deepening (type: <int>)
+    :param time_budget: the seconds for every position when there is no depth (type: <float>)
+    :param workers: how many processes analyse the positions (type: <int>)
+    :param book: use the opening book (type: <bool>)
+    :param endgame: the endgame threshold, the one from settings.properties by default, 0 for no exact solver
+                    (type: <int>)
+    :param every_move: analyse the positions which know their moves after each of their moves too (type: <bool>)
+    :param geometry: the rows, the columns and how many pieces in a row win of the positions written as text
+                     (type: <tuple>)
+
+    --- Return
+    :return: a dict for every position, see <analyse>, with the line of the position, the text and the ply.
+             A line which is not a position, or a position where the game is over, gets an error instead.
+             (type: <generator>)
+    """
+    options = {'time': time_budget, 'book': book, 'endgame': endgame}
+    jobs = _make_jobs(positions, every_move, geometry, depth, time_budget)
+    if workers <= 1:
+        start_analyser(options)
+        for job in jobs:
+            yield _analyse_job(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=start_analyser, initargs=(options,)) as pool:
+        pending = collections.deque()
+        for job in jobs:
+            pending.append(pool.submit(_analyse_job, job))
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _make_jobs(positions, every_move, geometry, depth, time_budget):
+    """
+    The jobs of the positions, lazily. The text and the board are sent to the workers as strings.
+    """
+    for number, item in enumerate(positions, 1):
+        if isinstance(item, Position):
+            text, geometry_of_item = board_to_string(item), item.geometry()
+            for position in list(earlier_positions(item) if every_move else ()) + [item]:
+                yield (number, text, position.move_count(), board_to_string(position), None, geometry_of_item, depth,
+                       time_budget)
+            continue
+        for _, text, ply, position in read_positions([item], every_move, geometry):
+            if isinstance(position, Position):
+                yield number, text, ply, board_to_string(position), None, geometry, depth, time_budget
+            else:
+                yield number, text, None, None, position, geometry, depth, time_budget
+
+
+# ----- COMMAND LINE ZONE -----
+def main(arguments=None):
+    """
+    --- Description
+    Analyse a file of positions, one on every line, and write one JSON line for every position:
+        python -m start_game.analysis games.txt --depth 8 --workers 4 > analysis.jsonl
+        python -m start_game.analysis games.txt --time 0.5 --every-move --output analysis.jsonl
+        python -m start_game.analysis archive.txt.gz --records --every-move --workers 4
+    """
+    parser = argparse.ArgumentParser(prog='python -m start_game.analysis', description=main.__doc__.split('\n')[3])
+    parser.add_argument('positions', help='the file of positions, - for the standard input')
+    parser.add_argument('--depth', type=int, help='search every position exactly this deep')
+    parser.add_argument('--time', type=float, default=1.0, help='the seconds for every position without --depth')
+    parser.add_argument('--workers', type=int, default=1, help='how many processes analyse the positions')
+    parser.add_argument('--book', action='store_true', help='use the opening book')
+    parser.add_argument('--endgame', type=int, help='the endgame threshold, 0 for no exact solver')
+    parser.add_argument('--every-move', action='store_true', help='analyse the games after each of their moves')
+    parser.add_argument('--rows', type=int, default=6, help='the number of rows of the board')
+    parser.add_argument('--columns', type=int, default=7, help='the number of columns of the board')
+    parser.add_argument('--connect', type=int, default=4, help='how many pieces in a row win')
+    parser.add_argument('--records', action='store_true',
+                        help='the file is a file of games (see domain.records), its games are analysed')
+    parser.add_argument('--output', help='the file of the results, the standard output by default')
+    arguments = parser.parse_args(arguments)
+    geometry = arguments.rows, arguments.columns, arguments.connect
+    try:
+        validate_geometry(*geometry)
+    except InvalidGeometry as err:
+        parser.error(str(err))
+
+    if arguments.records:
+        source = open_records(arguments.positions)
+        positions = (position for position, metadata in read_records(source, skip_invalid=True))
+    else:
+        source = sys.stdin if arguments.positions == '-' else open(arguments.positions)
+        positions = source
+    output = sys.stdout if arguments.output is None else open(arguments.output, 'w')
+    try:
+        # the lines are read lazily, every result is written as soon as it is known
+        for record in analyse_positions(positions, arguments.depth, arguments.time, arguments.workers, arguments.book,
+                                        arguments.endgame, arguments.every_move, geometry):
+            output.write(json.dumps(record) + '\n')
+            output.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
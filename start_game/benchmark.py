@@ -0,0 +1,287 @@
+# ----- IMPORT ZONE -----
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from domain.position import Position
+from domain.repository import GameRepository, write_atomic
+from start_game.minimax import MediumMode, HardMode
+from start_game.settings import SETTINGS_PATH
+
+
+# ----- POSITIONS ZONE -----
+# The fixed sets of positions: how many pieces are on the board and the seed of their random moves
+POSITION_SETS = {'opening': (4, 101), 'midgame': (16, 202), 'endgame': (30, 303)}
+
+# The depths the minimax is timed at
+MINIMAX_DEPTHS = (2, 4, 6)
+
+# The baseline the results are compared to, when nothing else is given. It is only right for the code it was
+# measured on: a commit which changes the position, the evaluation, the search or the save file has to write a new
+# one on the same machine, with: python -m start_game.benchmark --save-baseline
+BASELINE_PATH = os.path.join(os.path.dirname(SETTINGS_PATH), 'benchmark.json')
+
+
+def benchmark_positions(name, count=8):
+    """
+    --- Description
+    A fixed set of positions, the same every time: games of random moves which do not win, the player moving first
+
+    --- Parameters
+    :param name: opening, midgame or endgame, see <POSITION_SETS> (type: <str>)
+    :param count: how many positions (type: <int>)
+
+    --- Return
+    :return: the positions, the computer is to move in all of them (type: <list of Position>)
+    """
+    pieces, seed = POSITION_SETS[name]
+    generator = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        position = Position()
+        piece = 1
+        while position.move_count() < pieces:
+            columns = []
+            for col in position.valid_moves():
+                position.play(col, piece)
+                if not position.is_winning(piece):
+                    columns.append(col)
+                position.undo()
+            if not columns:
+                break
+            position.play(generator.choice(columns), piece)
+            piece = 3 - piece
+        # the computer (piece 2) is to move when an even number of pieces were played
+        if position.move_count() == pieces and pieces % 2 == 0:
+            positions.append(position)
+    return positions
+
+
+# ----- BENCHMARKS ZONE -----
+# Every benchmark is made by a function which prepares everything and returns the function that is timed.
+# The timed function does some operations and returns how many operations and how many search nodes it did.
+def _score_position(positions):
+    medium = MediumMode()
+
+    def run():
+        for position in positions:
+            medium.score_position(position, 2, 'hard')
+        return len(positions), 0
+    return run
+
+
+def _is_winning(positions):
+    def run():
+        for position in positions:
+            position.is_winning(1)
+            position.is_winning(2)
+        return 2 * len(positions), 0
+    return run
+
+
+def _get_valid_locations(positions):
+    def run():
+        for position in positions:
+            MediumMode.get_valid_locations(position)
+        return len(positions), 0
+    return run
+
+
+def _minimax(positions, depth):
+    hard = HardMode(workers=1, opening_book='', endgame_threshold=0)
+
+    def run():
+        nodes = 0
+        for position in positions:
+            # the table is emptied, so every run searches the same tree
+            hard.table().clear()
+            hard.minimax(position, depth)
+            nodes += hard.nodes()
+        return len(positions), nodes
+    return run
+
+
+def _repository(positions, directory, operation):
+    repository = GameRepository(directory)
+
+    def run():
+        for position in positions:
+            if operation == 'save':
+                repository.save(position, 'player1', 'player vs computer', 'hard')
+            else:
+                repository._load()
+        return len(positions), 0
+
+    if operation == '_load':
+        repository.save(positions[-1], 'player1', 'player vs computer', 'hard')
+    return run
+
+
+def benchmarks(directory):
+    """
+    --- Parameters
+    :param directory: a directory the repository benchmarks may save in (type: <str>)
+
+    --- Return
+    :return: the name and the maker of every benchmark, for example score_position/midgame (type: <list of tuple>)
+    """
+    cases = []
+    for name in POSITION_SETS:
+        cases.append(('score_position/' + name, lambda name=name: _score_position(benchmark_positions(name))))
+        cases.append(('is_winning/' + name, lambda name=name: _is_winning(benchmark_positions(name))))
+        cases.append(('get_valid_locations/' + name,
+                      lambda name=name: _get_valid_locations(benchmark_positions(name))))
+    for depth in MINIMAX_DEPTHS:
+        for name in POSITION_SETS:
+            cases.append(('minimax/depth{}/{}'.format(depth, name),
+                          lambda name=name, depth=depth: _minimax(benchmark_positions(name), depth)))
+    for operation in ('save', '_load'):
+        for name in POSITION_SETS:
+            cases.append(('repository.{}/{}'.format(operation, name),
+                          lambda name=name, operation=operation:
+                          _repository(benchmark_positions(name), directory, operation)))
+    return cases
+
+
+# ----- MEASURE ZONE -----
+def measure(run, min_time=0.2, rounds=3):
+    """
+    --- Description
+    Time a benchmark: every round calls it until <min_time> seconds pass, the fastest round counts.
+    Then it is called once more with tracemalloc on, for the memory, so tracing does not slow down the timed rounds.
+
+    --- Parameters
+    :param run: the timed function, see <benchmarks> (type: <function>)
+    :param min_time: the shortest time of a round, in seconds (type: <float>)
+    :param rounds: how many rounds (type: <int>)
+
+    --- Return
+    :return: ns_per_op, nodes_per_second, peak_bytes and ops (type: <dict>)
+    """
+    run()  # warm up the caches
+    best = None
+    for _ in range(rounds):
+        gc.collect()
+        ops = nodes = 0
+        start = time.perf_counter_ns()
+        elapsed = 0
+        while elapsed < min_time * 1e9 or not ops:
+            done, searched = run()
+            ops += done
+            nodes += searched
+            elapsed = time.perf_counter_ns() - start
+        if best is None or elapsed / ops < best[0] / best[1]:
+            best = elapsed, ops, nodes
+
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    elapsed, ops, nodes = best
+    return {'ns_per_op': elapsed / ops, 'nodes_per_second': nodes * 1e9 / elapsed if nodes else 0.0,
+            'peak_bytes': peak, 'ops': ops}
+
+
+def run_benchmarks(pattern=None, min_time=0.2, rounds=3, log=None):
+    """
+    --- Description
+    Run the benchmarks. The repository benchmarks save in a temporary directory, the real save is not touched.
+
+    --- Parameters
+    :param pattern: only the benchmarks with this text in the name, None for all (type: <str>)
+    :param min_time: see <measure> (type: <float>)
+    :param rounds: see <measure> (type: <int>)
+    :param log: called with the name and the result of every benchmark, None for silence (type: <function>)
+
+    --- Return
+    :return: the results, with the version of Python and the machine (type: <dict>)
+    """
+    results = {}
+    directory = tempfile.mkdtemp()
+    try:
+        for name, make in benchmarks(directory):
+            if pattern is not None and pattern not in name:
+                continue
+            results[name] = measure(make(), min_time, rounds)
+            if log is not None:
+                log(name, results[name])
+    finally:
+        shutil.rmtree(directory)
+    return {'python': sys.version.split()[0], 'machine': platform.machine(), 'results': results}
+
+
+def compare(results, baseline, threshold=0.2):
+    """
+    --- Description
+    Find the benchmarks which are slower than in the baseline
+
+    --- Parameters
+    :param results: the results of <run_benchmarks> (type: <dict>)
+    :param baseline: older results of <run_benchmarks> (type: <dict>)
+    :param threshold: a benchmark regressed if it takes more than (1 + threshold) times its baseline time
+                      (type: <float>)
+
+    --- Return
+    :return: the name, the baseline ns/op and the new ns/op of every regression (type: <list of tuple>)
+    """
+    regressions = []
+    for name, result in results['results'].items():
+        old = baseline['results'].get(name)
+        if old is not None and result['ns_per_op'] > old['ns_per_op'] * (1 + threshold):
+            regressions.append((name, old['ns_per_op'], result['ns_per_op']))
+    return regressions
+
+
+def main():
+    """
+    Run the benchmarks from the command line, for example:
+        python -m start_game.benchmark --filter minimax --output results.json
+    The exit code is 1 if a benchmark is slower than the baseline.
+    After a change of the code the benchmarks time, write the new baseline with --save-baseline.
+    """
+    parser = argparse.ArgumentParser(description='Time the search, the evaluation and the saving of the game.')
+    parser.add_argument('--filter', help='only the benchmarks with this text in the name')
+    parser.add_argument('--min-time', type=float, default=0.2, help='the shortest time of a round, in seconds')
+    parser.add_argument('--rounds', type=int, default=3, help='how many rounds, the fastest one counts')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='compare the results to this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='a benchmark regressed if it is this much slower than the baseline, 0.2 means 20%%')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results as the new baseline')
+    arguments = parser.parse_args()
+
+    def log(name, result):
+        print('{:<32} {:>14.0f} ns/op {:>12.0f} nodes/s {:>10} B peak'.format(
+            name, result['ns_per_op'], result['nodes_per_second'], result['peak_bytes']))
+
+    results = run_benchmarks(arguments.filter, arguments.min_time, arguments.rounds, log)
+    if arguments.output:
+        write_atomic(arguments.output, json.dumps(results, indent=2))
+    if arguments.save_baseline:
+        write_atomic(arguments.baseline, json.dumps(results, indent=2))
+        print('Baseline written to ' + arguments.baseline)
+        return
+    if not os.path.exists(arguments.baseline):
+        print('No baseline at ' + arguments.baseline)
+        return
+
+    with open(arguments.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, arguments.threshold)
+    for name, old, new in regressions:
+        print('REGRESSION {}: {:.0f} -> {:.0f} ns/op ({:+.0%})'.format(name, old, new, new / old - 1))
+    if regressions:
+        sys.exit(1)
+    print('No regression against ' + arguments.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+# ----- IMPORT ZONE -----
+import numpy as np
+from domain.position import Position
+
+
+# ----- TABLES ZONE -----
+# The flat cell indices (row * columns + column) of every window, an array of shape (windows, connect)
+# for every (rows, columns, connect)
+_WINDOW_INDICES = {}
+
+
+# ----- FUNCTION ZONE -----
+def window_score(piece_count, player_count, empty_count, difficulty, connect=4):
+    """
+    --- Description
+    The score of one window of <connect> cells, the same as MediumMode.evaluate_score, but from the counts
+
+    --- Parameters
+    :param piece_count: how many cells have the scored piece (type: <int>)
+    :param player_count: how many cells have the player's piece, which is 1 (type: <int>)
+    :param empty_count: how many cells are empty (type: <int>)
+    :param difficulty: can be either medium or hard (type: <str>)
+    :param connect: how many cells the window has (type: <int>)
+
+    --- Return
+    :return: the score of the window (type: <int>)
+    """
+    score = 0
+    if piece_count == connect:
+        score += 10000
+    elif piece_count == connect - 1 and empty_count == 1:
+        score += 5
+    elif piece_count == connect - 2 and empty_count == 2:
+        score += 2
+    if difficulty == "hard" and player_count == connect - 1 and empty_count == 1:
+        score -= 400
+    return score
+
+
+def window_indices(rows=6, columns=7, connect=4):
+    """
+    --- Return
+    :return: the flat cell indices of every window of <connect> cells, computed once for every geometry
+             (type: <numpy array> of shape (windows, connect))
+    """
+    if (rows, columns, connect) not in _WINDOW_INDICES:
+        windows = Position(rows, columns, connect).window_cells()
+        _WINDOW_INDICES[(rows, columns, connect)] = np.array([[row * columns + col for row, col in window]
+                                                              for window in windows], dtype=np.intp)
+    return _WINDOW_INDICES[(rows, columns, connect)]
+
+
+def score_batch(boards, piece, difficulty, connect=4):
+    """
+    --- Description
+    The score of MediumMode.score_position for many boards at once.
+    All the windows of all the boards are gathered with one fancy index and scored with array operations.
+
+    --- Parameters
+    :param boards: the boards, row 0 is the bottom row (type: <numpy array> of shape (N, rows, columns))
+    :param piece: the value of the piece. For computer the piece is 2 (type: <int>)
+    :param difficulty: can be either medium or hard (type: <str>)
+    :param connect: how many pieces in a row win (type: <int>)
+
+    --- Return
+    :return: the N scores (type: <numpy array> of int64)
+    """
+    boards = np.asarray(boards, dtype=np.int8)
+    count, rows, columns = boards.shape
+    cells = boards.reshape(count, rows * columns)[:, window_indices(rows, columns, connect)]
+    piece_count = np.count_nonzero(cells == piece, axis=2)
+    empty_count = np.count_nonzero(cells == 0, axis=2)
+
+    scores = np.where(piece_count == connect, 10000,
+                      np.where((piece_count == connect - 1) & (empty_count == 1), 5,
+                               np.where((piece_count == connect - 2) & (empty_count == 2), 2, 0)))
+    if difficulty == "hard":
+        player_count = np.count_nonzero(cells == 1, axis=2)
+        scores -= 400 * ((player_count == connect - 1) & (empty_count == 1))
+
+    center = np.count_nonzero(boards[:, :, columns // 2] == piece, axis=1)
+    return scores.sum(axis=1, dtype=np.int64) + 3 * center
+
+
+def child_boards(position, piece):
+    """
+    --- Description
+    The boards after every valid move of the piece, stacked for <score_batch>
+
+    --- Return
+    :return: the valid columns (type: <list>) and the boards (type: <numpy array> of shape (N, rows, columns))
+    """
+    columns = position.valid_moves()
+    boards = np.repeat(np.array(position.to_matrix(), dtype=np.int8)[np.newaxis], len(columns), axis=0)
+    for index, col in enumerate(columns):
+        boards[index, position.height(col), col] = piece
+    return columns, boards
+
+
+# ----- CLASS ZONE -----
+class IncrementalEvaluator:
+    """
+    --- Description
+    Keeps the score of a position (the one from MediumMode.score_position) up to date while moves are played
+    and undone, so a leaf of the search is scored in O(1).
+
+    For every window of <connect> cells it remembers how many pieces of each player are in it. A move changes
+    only the windows that contain its cell (at most 4 * connect, found with the cell -> windows index of the
+    geometry, which is shared by all the evaluators), so only their scores are taken out of the total and added
+    back with the new counts.
+    """
+
+    def __init__(self, piece=2, difficulty="hard", rows=6, columns=7, connect=4):
+        """
+        --- Parameters
+        :param piece: the piece the score is computed for (type: <int>)
+        :param difficulty: can be either medium or hard (type: <str>)
+        :param rows: the number of rows (type: <int>)
+        :param columns: the number of columns (type: <int>)
+        :param connect: how many pieces in a row win (type: <int>)
+        """
+        self._piece = piece
+        self._columns = columns
+        self._center = columns // 2
+        geometry = Position(rows, columns, connect)
+        self._cell_windows = geometry.cell_windows()
+        windows = len(geometry.window_cells())
+        self._counts = [None, [0] * windows, [0] * windows]
+        # the score of a window for every (count of 1, count of 2)
+        self._scores = [[window_score((ones, twos)[piece - 1], ones, connect - ones - twos, difficulty, connect)
+                         for twos in range(connect + 1)] for ones in range(connect + 1)]
+        self._score = 0
+
+    @classmethod
+    def from_position(cls, position, piece=2, difficulty="hard"):
+        """
+        --- Description
+        Build an evaluator with the pieces of the position already counted
+
+        --- Return
+        :return: the evaluator (type: <class IncrementalEvaluator>)
+        """
+        evaluator = cls(piece, difficulty, position.rowcount(), position.columncount(), position.connect())
+        for row in range(position.rowcount()):
+            for col in range(position.columncount()):
+                cell_piece = position.piece_at(row, col)
+                if cell_piece != 0:
+                    evaluator.play(row, col, cell_piece)
+        return evaluator
+
+    def score(self):
+        """
+        --- Return
+        :return: the score of the position (type: <int>)
+        """
+        return self._score
+
+    def play(self, row, col, piece):
+        """
+        --- Description
+        Count a piece that was dropped in the cell
+
+        --- Parameters
+        :param row: the row where the piece landed (type: <int>)
+        :param col: the column (type: <int>)
+        :param piece: 1 or 2 (type: <int>)
+        """
+        ones, twos = self._counts[1], self._counts[2]
+        counts = self._counts[piece]
+        scores = self._scores
+        score = self._score
+        for window in self._cell_windows[row * self._columns + col]:
+            score -= scores[ones[window]][twos[window]]
+            counts[window] += 1
+            score += scores[ones[window]][twos[window]]
+        if piece == self._piece and col == self._center:
+            score += 3
+        self._score = score
+
+    def undo(self, row, col, piece):
+        """
+        --- Description
+        Take back a piece counted with <play>
+
+        --- Parameters
+        :param row: the row of the piece (type: <int>)
+        :param col: the column (type: <int>)
+        :param piece: 1 or 2 (type: <int>)
+        """
+        ones, twos = self._counts[1], self._counts[2]
+        counts = self._counts[piece]
+        scores = self._scores
+        score = self._score
+        for window in self._cell_windows[row * self._columns + col]:
+            score -= scores[ones[window]][twos[window]]
+            counts[window] -= 1
+            score += scores[ones[window]][twos[window]]
+        if piece == self._piece and col == self._center:
+            score -= 3
+        self._score = score
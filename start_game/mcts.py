@@ -0,0 +1,460 @@
+# ----- IMPORT ZONE -----
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from domain.position import Position, win_check
+from start_game.settings import load_settings
+
+
+# ----- TABLES ZONE -----
+# The threat finder of every (rows, columns, connect), see <threat_finder>
+_THREAT_FINDERS = {}
+
+
+# ----- FUNCTION ZONE -----
+def threat_finder(rows, columns, connect):
+    """
+    --- Description
+    The function which finds the threats of a bitboard: the cells where one more piece makes <connect> in a row.
+    For every direction d, the runs of k pieces in a row are found like in win_check (the bitboard and-ed with
+    itself shifted). A cell x is a threat with the missing piece at place g of the line if a run of g pieces ends
+    at x - d and a run of connect - 1 - g pieces starts at x + d. The shifts are computed once for every geometry,
+    and for connect 4 the runs of 2 and 3 are shared by the four places of the gap.
+
+    --- Parameters
+    :param rows: the number of rows (type: <int>)
+    :param columns: the number of columns (type: <int>)
+    :param connect: how many pieces in a row win (type: <int>)
+
+    --- Return
+    :return: the finder, it takes a bitboard and returns the bitboard of its threats on the board, which may be
+             taken cells too (type: <function>),
+             the bitboard of the bottom cell of every column (type: <int>),
+             the bitboard of all the cells of the board (type: <int>)
+    """
+    if (rows, columns, connect) not in _THREAT_FINDERS:
+        stride = rows + 1
+        bottom = sum(1 << (col * stride) for col in range(columns))
+        cells = bottom * ((1 << rows) - 1)
+        directions = (1, stride, stride + 1, stride - 1)
+
+        if connect == 4:
+            shifts = tuple((d, 2 * d, 3 * d) for d in directions)
+
+            def threats(bitboard):
+                found = 0
+                for one, two, three in shifts:
+                    pairs = bitboard & (bitboard >> one)
+                    triples = pairs & (bitboard >> two)
+                    found |= (triples >> one) | (triples << three) | ((bitboard << one) & (pairs >> one)) | \
+                        ((pairs << two) & (bitboard >> one))
+                return found & cells
+        else:
+            def threats(bitboard):
+                found = 0
+                for d in directions:
+                    # runs[k]: the cells where a run of k pieces starts, runs[0] is all ones (-1)
+                    runs = [-1, bitboard]
+                    for length in range(2, connect):
+                        runs.append(runs[-1] & (bitboard >> ((length - 1) * d)))
+                    for gap in range(connect):
+                        found |= (runs[gap] << (gap * d)) & (runs[connect - 1 - gap] >> d)
+                return found & cells
+        _THREAT_FINDERS[(rows, columns, connect)] = threats, bottom, cells
+    return _THREAT_FINDERS[(rows, columns, connect)]
+
+
+# ----- CLASS ZONE -----
+class _Node:
+    """
+    --- Description
+    A node of the search tree: the position after <move> was played by <piece>.
+    wins counts the playouts through the node won by <piece> (a draw counts half), so the parent picks the child
+    which is best for the side that moves at the parent.
+    result is None until the node is known to end the game, then it is the winner, or 0 for a draw.
+    """
+    __slots__ = ('move', 'piece', 'parent', 'children', 'untried', 'visits', 'wins', 'result')
+
+    def __init__(self, move, piece, parent, untried, result=None):
+        self.move = move
+        self.piece = piece
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+        self.result = result
+
+
+class MonteCarloMode:
+    """
+    --- Description
+    Monte Carlo tree search with UCT: the AI plays many quick games (playouts) from the position and grows a tree
+    of the moves that look best. Every iteration goes down the tree choosing the child with the best upper
+    confidence bound (win rate + exploration * sqrt(ln(visits of the parent) / visits of the child)), adds one new
+    child, plays the rest of the game with a playout and counts the result in every node on the way back.
+    The move played is the child of the root with the most visits.
+
+    The search can be stopped after any number of iterations, so it plays better the longer it thinks.
+    The playouts run on the bitboards of the position (two ints and the heights of the columns), and a
+    heuristic playout wins at once when it can, blocks the opponent's win and does not give one away.
+    The tree is kept between the moves: if the new position is the old root after the computer's move and the
+    player's answer, that grandchild becomes the root, with all the playouts already done below it.
+    With several workers, every worker process searches a tree of its own (root parallelism) and the visits of
+    the root moves are added up.
+    """
+
+    def __init__(self, iterations=None, time_budget=None, exploration=None, playouts=None, workers=None):
+        """
+        The arguments which are None are taken from settings.properties.
+        :param iterations: how many playouts a move gets, 0 for as many as fit in the time budget (type: <int>)
+        :param time_budget: how many seconds a move may take when there is no number of iterations (type: <float>)
+        :param exploration: the exploration constant of UCT, higher tries more moves (type: <float>)
+        :param playouts: heuristic or random (type: <str>)
+        :param workers: how many processes search, 1 means no parallel search (type: <int>)
+        """
+        settings = load_settings()
+        if iterations is None:
+            iterations = settings.getint('mcts_iterations', fallback=0)
+        if time_budget is None:
+            time_budget = settings.getfloat('mcts_time_budget', fallback=1.0)
+        if exploration is None:
+            exploration = settings.getfloat('mcts_exploration', fallback=1.4)
+        if playouts is None:
+            playouts = settings.get('mcts_playouts', fallback='heuristic')
+        if workers is None:
+            workers = settings.getint('mcts_workers', fallback=1)
+        self._computer_piece = 2
+        self._iterations = iterations
+        self._time_budget = time_budget
+        self._exploration = exploration
+        self._heuristic = playouts == 'heuristic'
+        self._workers = max(1, workers)
+        self._pool = None
+        self._random = random.Random()
+        # the tree of the last search and the bitboards, the heights and the geometry of its root
+        self._root = None
+        self._root_state = None
+        self._played = 0
+        self._reused = 0
+        self._threat_finder = None
+
+    def __getstate__(self):
+        """
+        The copy sent to a worker process: the same settings, no tree and no workers of its own
+        """
+        state = self.__dict__.copy()
+        state['_pool'] = None
+        state['_workers'] = 1
+        state['_root'] = None
+        state['_root_state'] = None
+        state['_threat_finder'] = None
+        return state
+
+    # ----- GETTERS -----
+    def iterations(self):
+        """
+        --- Return
+        :return: how many playouts a move gets, 0 if the time budget decides (type: <int>)
+        """
+        return self._iterations
+
+    def time_budget(self):
+        """
+        --- Return
+        :return: how many seconds a move may take when there is no number of iterations (type: <float>)
+        """
+        return self._time_budget
+
+    def exploration(self):
+        """
+        --- Return
+        :return: the exploration constant of UCT (type: <float>)
+        """
+        return self._exploration
+
+    def playouts(self):
+        """
+        --- Return
+        :return: heuristic or random (type: <str>)
+        """
+        return 'heuristic' if self._heuristic else 'random'
+
+    def workers(self):
+        """
+        --- Return
+        :return: how many processes search (type: <int>)
+        """
+        return self._workers
+
+    def played(self):
+        """
+        --- Return
+        :return: how many playouts the last search made, in all the processes (type: <int>)
+        """
+        return self._played
+
+    def reused(self):
+        """
+        --- Return
+        :return: how many visits of the last search came from the tree of the move before (type: <int>)
+        """
+        return self._reused
+
+    def root_moves(self):
+        """
+        --- Return
+        :return: the visits and the win rate of every move of the root of the main process (type: <dict>)
+        """
+        if self._root is None:
+            return {}
+        return {child.move: (child.visits, child.wins / child.visits) for child in self._root.children
+                if child.visits}
+
+    def close(self):
+        """
+        Stop the worker processes, if they were started
+        """
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    # ----- SEARCH -----
+    def best_move(self, board):
+        """
+        --- Description
+        Find the move of the computer (the piece 2) with the budget of the mode
+
+        --- Parameters
+        :param board: a position where nobody won yet (type: <class Position>)
+
+        --- Return
+        :return: the best column and its win rate for the computer, between 0 and 1 (type: <tuple>)
+        """
+        position = Position.from_board(board)
+        # the seed comes from the random module, so a profiled move with a number of iterations can be replayed
+        seed = random.getrandbits(64)
+        self._random.seed(seed)
+        self._reuse_tree(position)
+        self._reused = self._root.visits
+
+        jobs = []
+        iterations = self._iterations
+        if self._workers > 1:
+            iterations = -(-iterations // self._workers)
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self._workers - 1, initializer=_start_worker,
+                                                 initargs=(self,))
+            matrix = position.to_matrix()
+            jobs = [self._pool.submit(_search_worker, matrix, position.geometry(), iterations, seed + worker)
+                    for worker in range(1, self._workers)]
+
+        self._played = self._search(iterations)
+        moves = {move: [visits, visits * rate] for move, (visits, rate) in self.root_moves().items()}
+        for job in jobs:
+            worker_moves, played = job.result()
+            self._played += played
+            for move, (visits, rate) in worker_moves.items():
+                total = moves.setdefault(move, [0, 0.0])
+                total[0] += visits
+                total[1] += visits * rate
+
+        # the most visited move, the one in the middle if several have the same visits
+        center = (position.columncount() - 1) / 2
+        column = max(moves, key=lambda move: (moves[move][0], -abs(move - center)))
+        return column, moves[column][1] / moves[column][0]
+
+    def _reuse_tree(self, position):
+        """
+        --- Description
+        Make the root of the tree the position. The old tree is kept if the position is its root, or the root after
+        one move of the computer and one of the player, otherwise the tree starts again from one node.
+
+        --- Parameters
+        :param position: the position, the computer is to move (type: <class Position>)
+        """
+        rows, columns, connect = position.geometry()
+        stride = rows + 1
+        ones, twos = position.bitboard(1), position.bitboard(2)
+        state = ([0, ones, twos], [position.height(col) for col in range(columns)], (rows, columns, connect))
+        node = None
+        if self._root is not None and self._root_state[2] == state[2]:
+            old = self._root_state[0]
+            new_twos, new_ones = twos & ~old[2], ones & ~old[1]
+            if old[1] & ~ones == 0 and old[2] & ~twos == 0:
+                if new_ones == 0 and new_twos == 0:
+                    node = self._root
+                elif new_ones.bit_count() == 1 and new_twos.bit_count() == 1:
+                    node = self._child(self._root, (new_twos.bit_length() - 1) // stride)
+                    if node is not None:
+                        node = self._child(node, (new_ones.bit_length() - 1) // stride)
+        if node is None:
+            node = _Node(None, 3 - self._computer_piece, None, self._moves(state[1], rows))
+        node.parent = None
+        self._root = node
+        self._root_state = state
+        self._threat_finder = threat_finder(rows, columns, connect)
+
+    @staticmethod
+    def _child(node, move):
+        """
+        --- Return
+        :return: the child of the node after the move, None if it is not in the tree yet (type: <class _Node>)
+        """
+        for child in node.children:
+            if child.move == move:
+                return child
+        return None
+
+    def _moves(self, heights, rows):
+        """
+        --- Return
+        :return: the columns which are not full, in a random order (type: <list>)
+        """
+        moves = [col for col, height in enumerate(heights) if height < rows]
+        self._random.shuffle(moves)
+        return moves
+
+    def _search(self, iterations):
+        """
+        --- Description
+        Grow the tree of the root: <iterations> playouts, or as many as fit in the time budget if it is 0
+
+        --- Return
+        :return: how many playouts were made (type: <int>)
+        """
+        root = self._root
+        root_boards, root_heights, (rows, columns, connect) = self._root_state
+        stride = rows + 1
+        check = win_check(stride, connect)
+        exploration = self._exploration
+        log = math.log
+        sqrt = math.sqrt
+        deadline = None if iterations else time.perf_counter() + self._time_budget
+        played = 0
+        while (played < iterations) if iterations else (played == 0 or time.perf_counter() < deadline):
+            played += 1
+            node = root
+            boards = root_boards[:]
+            heights = root_heights[:]
+            piece = 3 - root.piece
+
+            # select: go down while every move of the node has a child
+            while node.result is None and not node.untried:
+                factor = exploration * sqrt(log(node.visits))
+                best = None
+                best_value = -1.0
+                for child in node.children:
+                    value = child.wins / child.visits + factor / sqrt(child.visits)
+                    if value > best_value:
+                        best, best_value = child, value
+                node = best
+                col = node.move
+                boards[piece] |= 1 << (col * stride + heights[col])
+                heights[col] += 1
+                piece = 3 - piece
+
+            # expand: one new child
+            if node.result is None:
+                col = node.untried.pop()
+                boards[piece] |= 1 << (col * stride + heights[col])
+                heights[col] += 1
+                untried = self._moves(heights, rows)
+                result = piece if check(boards[piece]) else (0 if not untried else None)
+                child = _Node(col, piece, node, untried, result)
+                node.children.append(child)
+                node = child
+                piece = 3 - piece
+
+            # simulate
+            result = node.result
+            if result is None:
+                result = self._playout(boards, heights, piece, rows, columns, stride, check)
+
+            # back up the result
+            while node is not None:
+                node.visits += 1
+                if result == node.piece:
+                    node.wins += 1.0
+                elif result == 0:
+                    node.wins += 0.5
+                node = node.parent
+        return played
+
+    def _playout(self, boards, heights, piece, rows, columns, stride, check):
+        """
+        --- Description
+        Play the game until the end with quick moves, on the bitboards (changed in place).
+        A random playout plays random moves. A heuristic one wins at once if it can, blocks the opponent's win if
+        the opponent could win with the next move, does not play right under a cell where the opponent would win,
+        and otherwise plays a random move. The threats of a player only change when the player moves, so only
+        the threats of the one who just moved are found again.
+
+        --- Parameters
+        :param boards: the bitboards, index 1 and 2 (type: <list>)
+        :param heights: the heights of the columns (type: <list>)
+        :param piece: the piece to move (type: <int>)
+
+        --- Return
+        :return: the winner, 0 for a draw (type: <int>)
+        """
+        choice = self._random.choice
+        moves = [col for col in range(columns) if heights[col] < rows]
+        if not self._heuristic:
+            while moves:
+                col = choice(moves)
+                boards[piece] |= 1 << (col * stride + heights[col])
+                heights[col] += 1
+                if check(boards[piece]):
+                    return piece
+                if heights[col] == rows:
+                    moves.remove(col)
+                piece = 3 - piece
+            return 0
+
+        threats, bottom, cells = self._threat_finder
+        found = [0, threats(boards[1]), threats(boards[2])]
+        while moves:
+            playable = ((boards[1] | boards[2]) + bottom) & cells
+            if found[piece] & playable:
+                return piece
+            block = found[3 - piece] & playable
+            if block:
+                col = (block.bit_length() - 1) // stride
+            else:
+                # a cell right under an opponent's threat is given away
+                safe = playable & ~(found[3 - piece] >> 1)
+                safe_moves = [move for move in moves if safe >> (move * stride + heights[move]) & 1]
+                col = choice(safe_moves or moves)
+            boards[piece] |= 1 << (col * stride + heights[col])
+            heights[col] += 1
+            found[piece] = threats(boards[piece])
+            if heights[col] == rows:
+                moves.remove(col)
+            piece = 3 - piece
+        return 0
+
+
+# ----- PARALLEL SEARCH ZONE -----
+# The Monte Carlo mode of a worker process, a copy of the one that started the workers
+_worker_ai = None
+
+
+def _start_worker(monte_carlo_mode):
+    """
+    Runs once in every worker process of MonteCarloMode.best_move
+    """
+    global _worker_ai
+    _worker_ai = monte_carlo_mode
+
+
+def _search_worker(matrix, geometry, iterations, seed):
+    """
+    Runs in a worker process of MonteCarloMode.best_move: a search of a new tree of the position
+    """
+    _worker_ai._random.seed(seed)
+    _worker_ai._root = None
+    _worker_ai._reuse_tree(Position.from_matrix(matrix, *geometry))
+    played = _worker_ai._search(iterations)
+    return _worker_ai.root_moves(), played
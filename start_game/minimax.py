@@ -1,8 +1,20 @@
 import math
-from validator.boardValidator import validate_column, InvalidColumn
+import os
 import random
-import copy
-from start_game.start import Game
+import time
+from concurrent.futures import ProcessPoolExecutor
+from domain.position import Position
+from start_game.evaluation import IncrementalEvaluator, child_boards, score_batch, window_score
+from start_game.opening_book import OpeningBook
+from start_game.search_stats import SearchStats, append_log
+from start_game.settings import SETTINGS_PATH, load_settings, data_directory
+from start_game.solver import EndgameSolver
+from start_game.transposition import TranspositionTable
+
+
+class SearchTimeout(Exception):
+    def __init__(self, msg):
+        super().__init__(msg)
 
 
 class EasyMode:
@@ -20,23 +32,17 @@ class EasyMode:
         Pick a random valid column
 
         --- Parameters
-        :param board: (type: <class>)
+        :param board: (type: <class Position>)
 
         --- Return
         :return: the final column (type: <int>)
         """
-        valid_columns = []
-        for col in range(board.columncount()):
-            try:
-                _ok = validate_column(board, col)
-                valid_columns.append(col)
-            except InvalidColumn:
-                pass
+        valid_columns = Position.from_board(board).valid_moves()
         final_col = int(random.choice(valid_columns))
         return final_col
 
 
-class MediumMode(EasyMode, Game):
+class MediumMode(EasyMode):
     """
     --- Description
     Medium mode means:
@@ -45,7 +51,8 @@ class MediumMode(EasyMode, Game):
     """
 
     def __init__(self):
-        super().__init__()
+        self._player1_piece = 1
+        self._computer_piece = 2
 
     @staticmethod
     def evaluate_score(mini_list, piece, difficulty):
@@ -55,7 +62,7 @@ class MediumMode(EasyMode, Game):
         It subtracts from the score if the function finds a combination with pieces for the player.(for hard mode)
 
         --- Parameters
-        :param mini_list: the list of the four pieces (type: <list>)
+        :param mini_list: the pieces of one window, four for connect 4 (type: <list>)
         :param piece: the value of the piece. For computer the piece is 2 (type: <int>)
         :param difficulty: can be either medium or hard (type: <str>)
 
@@ -64,21 +71,22 @@ class MediumMode(EasyMode, Game):
         """
         score = 0
         opponent_piece = 1
+        connect = len(mini_list)
 
         # Add to the score for computer
-        if mini_list.count(piece) == 4:
+        if mini_list.count(piece) == connect:
             # we found 4 in a row
             score += 10000
-        elif mini_list.count(piece) == 3 and mini_list.count(0) == 1:
+        elif mini_list.count(piece) == connect - 1 and mini_list.count(0) == 1:
             # we found 3 in a row (3 computer pieces and an empty slot)
             score += 5
-        elif mini_list.count(piece) == 2 and mini_list.count(0) == 2:
+        elif mini_list.count(piece) == connect - 2 and mini_list.count(0) == 2:
             # we found 2 in a row (2 computer pieces and 2 empty slots)
             score += 2
 
         if difficulty == "hard":
             # Subtract from the score for the player
-            if mini_list.count(opponent_piece) == 3 and mini_list.count(0) == 1:
+            if mini_list.count(opponent_piece) == connect - 1 and mini_list.count(0) == 1:
                 # we found 3 in a row (3 player pieces and an empty slot)
                 score -= 400
 
@@ -88,70 +96,46 @@ class MediumMode(EasyMode, Game):
         """
         --- Description
         Calculates the score of the given board.
+        Every window of four cells is read from the bitboards with a precomputed mask, so no lists are built.
 
         --- Parameters
-        :param board: (type: <class>)
+        :param board: (type: <class Position>)
         :param piece: the value of the piece. For computer the piece is 2 (type: <int>)
         :param difficulty: can be either medium or hard (type: <str>)
 
         --- Return
         :return: returns the score (type: <int>)
         """
-        score = 0
+        position = Position.from_board(board)
+        pieces = position.bitboard(piece)
+        player_pieces = position.bitboard(self._player1_piece)
+        occupied = position.bitboard(1) | position.bitboard(2)
 
         # Make the center column a priority since it gives a lot more chances to win
-        center_array = [int(i) for i in list(board[:, self.columncount() // 2])]
-        center_count = center_array.count(piece)
-        score += center_count * 3
-
-        # Score Horizontal
-        for r in range(self._ROWCOUNT):
-            row_array = [int(i) for i in list(board[r, :])]
-            for c in range(board.columncount() - 3):
-                mini_row_list = row_array[c:(c + 4)]
-                score += self.evaluate_score(mini_row_list, piece, difficulty)
-
-        # Score Vertical
-        for c in range(self._COLUMNCOUNT):
-            col_array = [int(i) for i in list(board[:, c])]
-            for r in range(board.rowcount() - 3):
-                mini_col_list = col_array[r:(r + 4)]
-                score += self.evaluate_score(mini_col_list, piece, difficulty)
-
-        # Score Diagonal (low left, rise to right)
-        for r in range(self.rowcount() - 3):
-            for c in range(self.columncount() - 3):
-                mini_diag_list = [board[r + i][c + i] for i in range(4)]
-                score += self.evaluate_score(mini_diag_list, piece, difficulty)
-
-        # Score Diagonal (up left, go down to right)
-        for r in range(self.rowcount() - 3):
-            for c in range(self.columncount() - 3):
-                mini_diag_list = [board[r + 3 - i][c + i] for i in range(4)]
-                score += self.evaluate_score(mini_diag_list, piece, difficulty)
+        score = (pieces & position.column_mask(position.columncount() // 2)).bit_count() * 3
+
+        # Score Horizontal, Vertical and both Diagonals
+        connect = position.connect()
+        for window in position.window_masks():
+            score += window_score((pieces & window).bit_count(), (player_pieces & window).bit_count(),
+                                  connect - (occupied & window).bit_count(), difficulty, connect)
 
         return score
 
-    def get_valid_locations(self, board):
+    @staticmethod
+    def get_valid_locations(board):
         """
         --- Description
         Makes a list with all the valid locations where the piece can be dropped.
         If a column is full, it means it is not valid.
 
         --- Parameters
-        :param board: (type: <class>)
+        :param board: (type: <class Position>)
 
         --- Return
         :return: the valid locations (type: <list>)
         """
-        valid_locations = []
-        for col in range(self._COLUMNCOUNT):
-            try:
-                if validate_column(board, col):
-                    valid_locations.append(col)
-            except InvalidColumn:
-                pass
-        return valid_locations
+        return Position.from_board(board).valid_moves()
 
     def pick_best_move(self, board, piece):
         """
@@ -160,21 +144,19 @@ class MediumMode(EasyMode, Game):
         Finds the best score associated with the best column and returns the column.
 
         --- Parameters
-        :param board: (type: <class>)
+        :param board: (type: <class Position>)
         :param piece: the value of the piece. For computer the piece is 2 (type: <int>)
 
         --- Return
         :return: returns the best column (type: <int>)
         """
-        valid_locations = self.get_valid_locations(board)
+        position = Position.from_board(board)
+        valid_locations, boards = child_boards(position, piece)
         best_score = -8000  # start with something very low so it doesn't mess up the "evaluate score" function
         best_column = random.choice(valid_locations)  # random column in case the scores are all equal
 
-        for col in valid_locations:
-            row = self.get_available_row(board, col)
-            temp_board = copy.deepcopy(board)
-            self.drop_piece(temp_board, row, col, piece)
-            score = self.score_position(temp_board, piece, "medium")
+        # all the boards after one move are scored together
+        for col, score in zip(valid_locations, score_batch(boards, piece, "medium", position.connect())):
             if score > best_score:
                 best_score = score
                 best_column = col
@@ -183,10 +165,155 @@ class MediumMode(EasyMode, Game):
 
 
 class HardMode(MediumMode):
-    def __init__(self):
+    def __init__(self, table_memory_mb=None, time_budget=None, workers=None, opening_book=None,
+                 endgame_threshold=None, search_log=None):
+        """
+        The arguments which are None are taken from settings.properties.
+        :param opening_book: the path of the opening book, relative to settings.properties, '' for no book
+                             (type: <str>)
+        :param endgame_threshold: the positions with at most this many empty cells are solved exactly
+                                  (type: <int>)
+        :param search_log: the JSON-lines log of the search stats of every move, relative to the data directory,
+                           '' for no log (type: <str>)
+        """
         super().__init__()
+        settings = load_settings()
+        if table_memory_mb is None:
+            table_memory_mb = settings.getfloat('table_memory_mb', fallback=16)
+        if time_budget is None:
+            time_budget = settings.getfloat('time_budget', fallback=1.0)
+        if workers is None:
+            workers = settings.getint('search_workers', fallback=1)
+        if opening_book is None:
+            opening_book = settings.get('opening_book', fallback='opening.book')
+        if endgame_threshold is None:
+            endgame_threshold = settings.getint('endgame_threshold', fallback=16)
+        if search_log is None:
+            search_log = settings.get('search_log', fallback='')
         self._player_piece = 1
         self._computer_piece = 2
+        self._win_score = 10000000
+        self._time_budget = time_budget
+        self._deadline = None
+        self._nodes = 0
+        self._killers = []
+        self._history = []
+        self._pv = []
+        self._evaluator = None
+        self._table_memory_mb = table_memory_mb
+        self._table = TranspositionTable(table_memory_mb)
+        self._workers = max(1, workers)
+        self._pool = None
+        # only the header of the book is read here, the moves are read from the mapped file when they are needed
+        book_path = os.path.join(os.path.dirname(SETTINGS_PATH), opening_book)
+        self._book = OpeningBook(book_path) if opening_book and os.path.isfile(book_path) else None
+        self._endgame_threshold = endgame_threshold
+        self._solver = EndgameSolver(table_memory_mb)
+        self._stats = SearchStats()
+        self._search_log = os.path.join(data_directory(), search_log) if search_log else None
+
+    def __getstate__(self):
+        """
+        The copy sent to a worker process: the same settings, an empty transposition table and no workers of its own
+        """
+        state = self.__dict__.copy()
+        state['_table'] = TranspositionTable(self._table_memory_mb)
+        state['_pool'] = None
+        state['_workers'] = 1
+        state['_book'] = None
+        state['_solver'] = EndgameSolver(self._table_memory_mb)
+        state['_search_log'] = None
+        return state
+
+    # ----- GETTERS -----
+    def nodes(self):
+        """
+        --- Return
+        :return: how many nodes the last search visited (type: <int>)
+        """
+        return self._nodes
+
+    def time_budget(self):
+        """
+        --- Return
+        :return: how many seconds the computer may think about a move (type: <float>)
+        """
+        return self._time_budget
+
+    def principal_variation(self):
+        """
+        --- Return
+        :return: the best line of moves found by the last search, starting with the best move (type: <list>)
+        """
+        return list(self._pv)
+
+    def table(self):
+        """
+        --- Return
+        :return: the transposition table, it is kept between searches (type: <class TranspositionTable>)
+        """
+        return self._table
+
+    def table_memory_mb(self):
+        """
+        --- Return
+        :return: how much memory the transposition table may use, in megabytes (type: <float>)
+        """
+        return self._table_memory_mb
+
+    def search_stats(self):
+        """
+        --- Return
+        :return: what the last search did: nodes, cutoffs, reads of the table, time of every depth, ...
+                 (type: <class SearchStats>)
+        """
+        return self._stats
+
+    def search_log(self):
+        """
+        --- Return
+        :return: the path of the log of the search stats, None if there is no log (type: <str>)
+        """
+        return self._search_log
+
+    def opening_book(self):
+        """
+        --- Return
+        :return: the opening book, None if there is no book (type: <class OpeningBook>)
+        """
+        return self._book
+
+    def endgame_threshold(self):
+        """
+        --- Return
+        :return: the positions with at most this many empty cells are solved exactly (type: <int>)
+        """
+        return self._endgame_threshold
+
+    def workers(self):
+        """
+        --- Return
+        :return: how many processes search the root moves, 1 means no parallel search (type: <int>)
+        """
+        return self._workers
+
+    def close(self):
+        """
+        Stop the worker processes of the parallel search, if they were started
+        """
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def clear(self):
+        """
+        Forget what the earlier searches learned: the transposition table, the killer moves and the history,
+        so the next search does not depend on the positions searched before it
+        """
+        self._table.clear()
+        self._killers = []
+        self._history = []
+        self._pv = []
 
     def is_terminal_node(self, board):
         """
@@ -194,13 +321,14 @@ class HardMode(MediumMode):
             -the player wins
             -the computer wins
             -the board if full
-        :param board: (type: <class)
+        :param board: (type: <class Position>)
         :return: true if it's terminal, false if it isn't (type: <bool>)
         """
-        return self.winning(board, self._player_piece) or self.winning(board, self._computer_piece) or \
-            len(self.get_valid_locations(board)) == 0
+        position = Position.from_board(board)
+        return position.is_winning(self._player_piece) or position.is_winning(self._computer_piece) or \
+            position.is_full()
 
-    def minimax(self, board, depth, alpha, beta, maximizing_player):
+    def minimax(self, board, depth, alpha=-math.inf, beta=math.inf, maximizing_player=True):
         """
         --- Description:
         Hard mode means:
@@ -212,57 +340,493 @@ class HardMode(MediumMode):
         When it is the computer's turn, it'll want to choose the best possible move that will maximize its score.
         But next turn the opponent will try himself to maximize his score, thus minimizing the computer's.
 
+        The search is written in the negamax form with alpha-beta pruning: a node is scored from the point of view
+        of the one who moves, so the score of a child is the negated score for the parent.
+        Alpha is the score the side to move is already sure of, beta is the score the opponent allows, so a branch
+        is cut as soon as alpha >= beta. The moves are tried center first, then the killer moves (moves which caused
+        a cut at the same depth) and the moves with a good history go first, which makes the cuts come early.
+        If several columns have the same best score, the leftmost one is returned, like the plain minimax does.
+
         --- Parameters:
-        :param board: (type: <class>)
+        :param board: (type: <class Position>)
         :param depth: how many branches deep into the algorithm (type: <int>)
-        :param alpha:
-        :param beta:
+        :param alpha: the lowest score the computer is sure of, -inf for a full search (type: <int> or <float>)
+        :param beta: the highest score the player allows, inf for a full search (type: <int> or <float>)
         :param maximizing_player: true for maximizing the computer, false for minimizing the player (type: <bool>)
         :return: the best column and the score
         """
-        valid_locations = self.get_valid_locations(board)
-        is_terminal = self.is_terminal_node(board)
+        position = Position.from_board(board)
+        start = time.perf_counter()
+        self._stats = SearchStats()
+        self._stats.reach(depth)
+        self._nodes = 0
+        self._killers = [[None, None] for _ in range(depth + 1)]
+        self._history = [[0] * position.columncount() for _ in range(3)]
+        self._pv = []
+        color = 1 if maximizing_player else -1
+        if maximizing_player:
+            column, value = self._search_root(position, depth, alpha, beta, color)
+        else:
+            column, value = self._search_root(position, depth, -beta, -alpha, color)
+        self._pv = self._read_principal_variation(position, color, depth)
+        self._stats.add_iteration(depth, self._nodes, time.perf_counter() - start, column, color * value)
+        self._finish_stats(position, (column, color * value), start)
+        return column, color * value
+
+    def iterative_deepening(self, board, time_budget=None, max_depth=None):
+        """
+        --- Description
+        Search at depth 1, 2, 3, ... until the time budget runs out, then return the best move of the last search
+        that was completed. The search of a new depth tries the principal variation of the previous depth first
+        and gets the best moves of the other positions from the transposition table, so the deeper search cuts
+        a lot more and the earlier depths cost little.
+        Depth 1 is always completed, so there is always a move to play.
+        If the position is in the opening book, its move is played without any search.
+        If at most <endgame_threshold> cells are empty, the position is solved exactly instead, see <solve>.
+
+        --- Parameters
+        :param board: (type: <class Position>)
+        :param time_budget: how many seconds the search may take, the one from settings.properties by default,
+                            None or 0 for no limit if max_depth is given (type: <float>)
+        :param max_depth: the deepest depth to search, by default until the board is full (type: <int>)
 
-        if depth == 0 or is_terminal:
-            if is_terminal:
-                # which case of the three conditions are respected
-                if self.winning(board, self._computer_piece):
-                    return None, 10000000  # very high score
-                elif self.winning(board, self._player_piece):
-                    return None, -10000000  # very low score
+        --- Return
+        :return: the best column and the score (type: <tuple>)
+        """
+        position = Position.from_board(board)
+        start = time.perf_counter()
+        if self._book is not None:
+            move = self._book.lookup(position)
+            if move is not None:
+                self._pv = [move[0]]
+                self._nodes = 0
+                self._stats = SearchStats('book')
+                self._finish_stats(position, move, start)
+                return move
+        if not self.is_terminal_node(position) and \
+                position.rowcount() * position.columncount() - position.move_count() <= self._endgame_threshold:
+            move = self.solve(position)
+            self._finish_stats(position, move, start)
+            return move
+        if time_budget is None and max_depth is None:
+            time_budget = self._time_budget
+        empty_cells = position.rowcount() * position.columncount() - position.move_count()
+        if max_depth is None or max_depth > empty_cells:
+            max_depth = max(1, empty_cells)
+        stats = self._stats = SearchStats()
+        played_moves = len(position.moves())
+        best = None
+        pv = []
+        total_nodes = 0
+
+        for depth in range(1, max_depth + 1):
+            self._pv = pv
+            self._deadline = start + time_budget if time_budget and depth > 1 else None
+            parallel = self._workers > 1 and depth > 1
+            iteration_start = time.perf_counter()
+            stats.reach(depth)
+            try:
+                if parallel:
+                    stats.source = 'parallel'
+                    # one deadline for every worker, on the clock which all the processes share
+                    deadline = time.time() + self._deadline - time.perf_counter() if self._deadline is not None \
+                        else None
+                    best = self.parallel_minimax(position, depth, deadline)
                 else:
-                    return None, 0  # Game is over, no more valid moves
+                    best = self._search(position, depth)
+            except SearchTimeout:
+                # put back the moves of the search that was stopped
+                while len(position.moves()) > played_moves:
+                    position.undo()
+                stats.add_iteration(depth, self._nodes, time.perf_counter() - iteration_start, None, None, False)
+                break
+            finally:
+                self._deadline = None
+                total_nodes += self._nodes
+            stats.add_iteration(depth, self._nodes, time.perf_counter() - iteration_start, best[0], best[1])
+            pv = self._pv if parallel else self._read_principal_variation(position, 1, depth)
+            if abs(best[1]) == self._win_score:
+                break  # somebody wins for sure, a deeper search does not change the move
+
+        self._pv = pv
+        self._nodes = total_nodes
+        self._finish_stats(position, best, start)
+        return best
+
+    def solve(self, board):
+        """
+        --- Description
+        Find the best move of the computer with the exact endgame solver, searching until the end of the game.
+        A win scores win_score minus the number of moves until it, a loss the opposite and a draw 0, so a faster
+        win (or a slower loss) scores more.
+
+        --- Parameters
+        :param board: a position where nobody won yet (type: <class Position>)
+
+        --- Return
+        :return: the best column and the score (type: <tuple>)
+        """
+        position = Position.from_board(board)
+        start = time.perf_counter()
+        column, score = self._solver.best_move(position, self._computer_piece)
+        self._pv = [column]
+        self._nodes = self._solver.nodes()
+        self._stats = SearchStats('solver')
+        self._stats.solver_nodes = self._nodes
+        self._stats.seconds = time.perf_counter() - start
+        if score != 0:
+            distance = EndgameSolver.distance(position, score)
+            score = (self._win_score - distance) * (1 if score > 0 else -1)
+        self._stats.column, self._stats.score, self._stats.pv = column, score, [column]
+        return column, score
+
+    def parallel_minimax(self, board, depth, deadline=None):
+        """
+        --- Description
+        Root split search: every move of the computer at the root is searched by a worker process with the full
+        window, so every worker returns the exact score of its move. The leftmost best column is chosen, which
+        gives the same column and score as <minimax> at the same depth with a new transposition table.
+        The workers are started on the first call and kept for the next moves, until <close>.
+
+        --- Parameters
+        :param board: (type: <class Position>)
+        :param depth: how many branches deep into the algorithm (type: <int>)
+        :param deadline: the time.time() when every worker stops, also the ones whose move was waiting for a free
+                         worker, None for no limit (type: <float>)
+
+        --- Raises
+        SearchTimeout - if the time ran out before every move was searched, the moves not started yet are
+                        cancelled
+
+        --- Return
+        :return: the best column and the score (type: <tuple>)
+        """
+        position = Position.from_board(board)
+        terminal_value = self._terminal_value(position, 1, depth)
+        if terminal_value is not None:
+            return None, terminal_value
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self._workers, initializer=_start_worker, initargs=(self,))
+
+        stats = self._stats
+        stats.reach(depth)
+        stats.nodes_by_ply[0] += 1
+        stats.expanded += 1
+        matrix = position.to_matrix()
+        columns = sorted(position.valid_moves(), key=lambda col: abs(col - position.columncount() // 2))
+        futures = [(col, self._pool.submit(_search_move_worker, matrix, position.connect(), col, depth, deadline))
+                   for col in columns]
+        self._nodes = 1
+        scores = {}
+        try:
+            for col, future in futures:
+                scores[col], nodes, worker_stats = future.result()
+                self._nodes += nodes
+                stats.merge(worker_stats)
+        finally:
+            for _, future in futures:
+                future.cancel()
+
+        best_column = min(scores, key=lambda col: (-scores[col], col))
+        self._pv = [best_column]
+        return best_column, scores[best_column]
+
+    def search_move(self, position, col, depth, deadline=None):
+        """
+        --- Description
+        The exact score of one move of the computer at the root, with a new transposition table,
+        this is the job of one worker of <parallel_minimax>. It stops at <deadline>, a time.time(), even when the
+        move waited for a free worker.
+
+        --- Raises
+        SearchTimeout - if the deadline passed
+
+        --- Return
+        :return: the score and how many nodes were searched (type: <tuple>)
+        """
+        self._table.clear()
+        self._nodes = 1
+        self._stats = SearchStats()
+        self._stats.reach(depth)
+        self._killers = [[None, None] for _ in range(depth + 1)]
+        self._history = [[0] * position.columncount() for _ in range(3)]
+        self._pv = []
+        if deadline is not None:
+            time_left = deadline - time.time()
+            if time_left <= 0:
+                raise SearchTimeout('The time budget of the search ran out!')
+            self._deadline = time.perf_counter() + time_left
+        try:
+            position.play(col, self._computer_piece)
+            self._evaluator = IncrementalEvaluator.from_position(position, self._computer_piece, "hard")
+            value = -self._negamax(position, depth - 1, -math.inf, math.inf, -1, 1)
+        finally:
+            self._deadline = None
+        position.undo()
+        return value, self._nodes
+
+    def _search(self, position, depth):
+        """
+        --- Description
+        One search of the iterative deepening, the killer moves and the history are kept from the previous depth
+
+        --- Return
+        :return: the best column and the score (type: <tuple>)
+        """
+        self._nodes = 0
+        if len(self._killers) < depth + 1:
+            self._killers += [[None, None] for _ in range(depth + 1 - len(self._killers))]
+        if not self._history or len(self._history[0]) != position.columncount():
+            self._history = [[0] * position.columncount() for _ in range(3)]
+        return self._search_root(position, depth, -math.inf, math.inf, 1)
+
+    def _read_principal_variation(self, position, color, depth):
+        """
+        --- Description
+        Follow the best moves stored in the transposition table, starting from the position
+
+        --- Return
+        :return: the moves of the principal variation (type: <list>)
+        """
+        pv = []
+        for _ in range(depth):
+            entry = self._table.probe(self._table_key(position, color))
+            if entry is None or entry[3] is None or not position.can_play(entry[3]):
+                break
+            pv.append(entry[3])
+            position.play(entry[3], self._computer_piece if color == 1 else self._player_piece)
+            color = -color
+        for _ in pv:
+            position.undo()
+        return pv
+
+    def _search_root(self, position, depth, alpha, beta, color):
+        """
+        --- Description
+        Search the moves of the root. Unlike the other nodes, a column left of the best one is searched with a
+        window that can see a tie, so the leftmost best column is the one returned.
+
+        --- Return
+        :return: the best column and the score for the side to move (type: <tuple>)
+        """
+        self._nodes += 1
+        stats = self._stats
+        stats.nodes_by_ply[0] += 1
+        terminal_value = self._terminal_value(position, color, depth)
+        if terminal_value is not None:
+            return None, terminal_value
+
+        # the score of the leaves is kept up to date while the moves are played, instead of computed at every leaf
+        evaluator = self._evaluator = IncrementalEvaluator.from_position(position, self._computer_piece, "hard")
+        piece = self._computer_piece if color == 1 else self._player_piece
+        entry = self._table.probe(self._table_key(position, color))
+        stats.tt_probes += 1
+        stats.tt_hits += entry is not None
+        stats.expanded += 1
+        best_column = None
+        value = -math.inf
+        pv = self._pv
+        first_move = pv[0] if pv else (entry[3] if entry is not None else None)
+        for index, col in enumerate(self._order_moves(position, 0, piece, first_move)):
+            # a column left of the best one wins a tie, the others must be strictly better
+            if best_column is not None and col < best_column:
+                window_alpha = max(alpha, value - 1)
             else:
-                # Depth is zero => find the heuristic value of node
-                return None, self.score_position(board, self._computer_piece, "hard")
-
-        if maximizing_player:  # max the computer (take the bigger value)
-            value = -math.inf
-            column = random.choice(valid_locations)
-            for col in valid_locations:
-                row = self.get_available_row(board, col)
-                board_copy = copy.deepcopy(board)
-                self.drop_piece(board_copy, row, col, self._computer_piece)
-                new_score = self.minimax(board_copy, depth - 1, alpha, beta, False)[1]
-                if new_score > value:
-                    value = new_score
-                    column = col
-                # alpha = max(value, alpha)
-                # if alpha >= beta:
-                #     break
-            return column, value
-        else:  # minimizing player (take the lowest value)
-            value = math.inf
-            column = random.choice(valid_locations)
-            for col in valid_locations:
-                row = self.get_available_row(board, col)
-                board_copy = copy.deepcopy(board)
-                self.drop_piece(board_copy, row, col, self._player_piece)
-                new_score = self.minimax(board_copy, depth - 1, alpha, beta, True)[1]
-                if new_score < value:
-                    value = new_score
-                    column = col
-                    # beta = min(value, beta)
-                    # if alpha >= beta:
-                    #     break
-            return column, value
+                window_alpha = max(alpha, value)
+            row = position.play(col, piece)
+            evaluator.play(row, col, piece)
+            new_score = -self._negamax(position, depth - 1, -beta, -window_alpha, -color, 1,
+                                       bool(pv) and col == pv[0])
+            position.undo()
+            evaluator.undo(row, col, piece)
+            if best_column is None or new_score > value or (new_score == value and col < best_column):
+                value = new_score
+                best_column = col
+            if value >= beta:
+                stats.cutoffs += 1
+                stats.first_move_cutoffs += index == 0
+                break
+        self._store(position, color, depth, value, alpha, beta, best_column)
+        return best_column, value
+
+    def _negamax(self, position, depth, alpha, beta, color, ply, on_pv=False):
+        """
+        --- Description
+        Alpha-beta search of one node in the negamax form
+
+        --- Parameters
+        :param position: (type: <class Position>)
+        :param depth: how many branches deep are left (type: <int>)
+        :param alpha: (type: <int> or <float>)
+        :param beta: (type: <int> or <float>)
+        :param color: 1 if the computer moves, -1 if the player moves (type: <int>)
+        :param ply: how far the node is from the root (type: <int>)
+        :param on_pv: true if the moves so far are the principal variation of the previous search (type: <bool>)
+
+        --- Raises
+        SearchTimeout - if the time budget of the search ran out
+
+        --- Return
+        :return: the score for the side to move (type: <int>)
+        """
+        self._nodes += 1
+        if self._deadline is not None and self._nodes & 1023 == 0 and time.perf_counter() > self._deadline:
+            raise SearchTimeout('The time budget of the search ran out!')
+        stats = self._stats
+        stats.nodes_by_ply[ply] += 1
+        # The parent was not terminal, so only the side which just moved can have four in a row
+        if position.is_winning(self._player_piece if color == 1 else self._computer_piece):
+            stats.terminal_hits += 1
+            return -self._win_score
+        if position.is_full():
+            stats.terminal_hits += 1
+            return 0  # Game is over, no more valid moves
+
+        # A position already searched at least as deep can give the score (or a bound of it) directly
+        table = self._table
+        key = self._table_key(position, color)
+        entry = table.probe(key)
+        stats.tt_probes += 1
+        table_move = None
+        if entry is not None:
+            stats.tt_hits += 1
+            entry_depth, entry_score, entry_bound, table_move = entry
+            if entry_depth >= depth:
+                if entry_bound == TranspositionTable.EXACT or \
+                        (entry_bound == TranspositionTable.LOWER and entry_score >= beta) or \
+                        (entry_bound == TranspositionTable.UPPER and entry_score <= alpha):
+                    stats.tt_cutoffs += 1
+                    return entry_score
+
+        if depth == 0:
+            # Depth is zero => find the heuristic value of node
+            stats.leaf_evaluations += 1
+            value = color * self._evaluator.score()
+            table.store(key, 0, value, TranspositionTable.EXACT, None)
+            return value
+
+        piece = self._computer_piece if color == 1 else self._player_piece
+        evaluator = self._evaluator
+        pv_move = self._pv[ply] if on_pv and ply < len(self._pv) else None
+        original_alpha = alpha
+        value = -math.inf
+        best_column = None
+        first_move = table_move if pv_move is None else pv_move
+        stats.expanded += 1
+        for index, col in enumerate(self._order_moves(position, ply, piece, first_move)):
+            row = position.play(col, piece)
+            evaluator.play(row, col, piece)
+            new_score = -self._negamax(position, depth - 1, -beta, -alpha, -color, ply + 1, col == pv_move)
+            position.undo()
+            evaluator.undo(row, col, piece)
+            if new_score > value:
+                value = new_score
+                best_column = col
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        stats.cutoffs += 1
+                        stats.first_move_cutoffs += index == 0
+                        self._remember_cut(ply, col, piece, depth)
+                        break
+        self._store(position, color, depth, value, original_alpha, beta, best_column)
+        return value
+
+    def _terminal_value(self, position, color, depth):
+        """
+        --- Return
+        :return: the score of the root for the side to move if it is terminal or at depth zero,
+                 None if the root must be searched (type: <int> or None)
+        """
+        if position.is_winning(self._computer_piece):
+            self._stats.terminal_hits += 1
+            return color * self._win_score  # very high score
+        if position.is_winning(self._player_piece):
+            self._stats.terminal_hits += 1
+            return -color * self._win_score  # very low score
+        if position.is_full():
+            self._stats.terminal_hits += 1
+            return 0  # Game is over, no more valid moves
+        if depth == 0:
+            # Depth is zero => find the heuristic value of node
+            self._stats.leaf_evaluations += 1
+            return color * self.score_position(position, self._computer_piece, "hard")
+        return None
+
+    def _finish_stats(self, position, move, start):
+        """
+        Write the result of a move in its stats and add them to the search log, if there is one
+        """
+        stats = self._stats
+        stats.column, stats.score = move
+        stats.pv = list(self._pv)
+        stats.seconds = time.perf_counter() - start
+        if self._search_log is not None:
+            append_log(self._search_log, stats, position.move_count())
+
+    @staticmethod
+    def _table_key(position, color):
+        """
+        --- Return
+        :return: the key of the position in the transposition table, the side to move is part of it (type: <int>)
+        """
+        return (position.key() << 1) | (color == 1)
+
+    def _store(self, position, color, depth, value, alpha, beta, best_column):
+        """
+        Store the result of a search in the transposition table, with the bound type given by the window
+        """
+        if value <= alpha:
+            bound = TranspositionTable.UPPER
+        elif value >= beta:
+            bound = TranspositionTable.LOWER
+        else:
+            bound = TranspositionTable.EXACT
+        self._table.store(self._table_key(position, color), depth, value, bound, best_column)
+
+    def _order_moves(self, position, ply, piece, first_move=None):
+        """
+        --- Description
+        Order the valid moves: the best move from the transposition table first, then the killer moves,
+        then by history score, then the columns closer to the center
+
+        --- Return
+        :return: the ordered columns (type: <list>)
+        """
+        center = position.columncount() // 2
+        killers = self._killers[ply] if ply < len(self._killers) else (None, None)
+        history = self._history[piece]
+        return sorted(position.valid_moves(),
+                      key=lambda col: (col != first_move, col not in killers, -history[col], abs(col - center), col))
+
+    def _remember_cut(self, ply, col, piece, depth):
+        """
+        Remember a move which caused a cut, as a killer move for the ply and in the history table
+        """
+        killers = self._killers[ply]
+        if killers[0] != col:
+            killers[1] = killers[0]
+            killers[0] = col
+        self._history[piece][col] += depth * depth
+
+
+# ----- PARALLEL SEARCH ZONE -----
+# The hard mode of a worker process, a copy of the one that started the workers
+_worker_ai = None
+
+
+def _start_worker(hard_mode):
+    """
+    Runs once in every worker process of HardMode.parallel_minimax
+    """
+    global _worker_ai
+    _worker_ai = hard_mode
+
+
+def _search_move_worker(matrix, connect, col, depth, deadline):
+    """
+    Runs in a worker process of HardMode.parallel_minimax: the exact score of one root move
+    """
+    position = Position.from_matrix(matrix, len(matrix), len(matrix[0]), connect)
+    score, nodes = _worker_ai.search_move(position, col, depth, deadline)
+    return score, nodes, _worker_ai.search_stats()
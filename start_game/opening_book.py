@@ -0,0 +1,205 @@
+# ----- IMPORT ZONE -----
+import argparse
+import mmap
+import os
+import struct
+import time
+from domain.position import Position
+from domain.repository import write_atomic
+from start_game.settings import SETTINGS_PATH
+
+
+# ----- EXCEPTIONS ZONE -----
+class InvalidBook(Exception):
+    def __init__(self, msg):
+        super().__init__(msg)
+
+
+# ----- FORMAT ZONE -----
+# The file is a header, then the records sorted by the Zobrist key of the position:
+#   header: magic, version, rows, columns, plies, search depth
+#   record: Zobrist key of the position (computer to move), best column, score of the computer
+_MAGIC = b'C4OB'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHHHHH')
+_RECORD = struct.Struct('<Qib3x')
+_KEY = struct.Struct('<Q')
+
+
+# ----- CLASS ZONE -----
+class OpeningBook:
+    """
+    --- Description
+    The best moves of the computer in the first positions of the game, searched deeply once and read from a file.
+    The file is mapped in memory and only the header is read when it is opened. A position is found with a binary
+    search over the sorted keys, which touches about log2(records) records of the file.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: the path of the book (type: <str>)
+
+        --- Raises
+        InvalidBook - if the file is not an opening book
+        """
+        self._path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            raise InvalidBook('The opening book is too short!')
+        magic, version, self._rows, self._columns, self._plies, self._depth = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION or (len(self._map) - _HEADER.size) % _RECORD.size:
+            raise InvalidBook('The file is not a valid opening book!')
+        self._count = (len(self._map) - _HEADER.size) // _RECORD.size
+
+    # ----- GETTERS -----
+    def path(self):
+        """
+        --- Return
+        :return: the path of the book (type: <str>)
+        """
+        return self._path
+
+    def plies(self):
+        """
+        --- Return
+        :return: the book has the positions with at most this many pieces (type: <int>)
+        """
+        return self._plies
+
+    def depth(self):
+        """
+        --- Return
+        :return: the depth of the searches of the book (type: <int>)
+        """
+        return self._depth
+
+    def __len__(self):
+        return self._count
+
+    # ----- LOOKUP -----
+    def lookup(self, position):
+        """
+        --- Description
+        Find the move of the computer in the position, with a binary search over the keys
+
+        --- Parameters
+        :param position: the position, the computer is to move (type: <class Position>)
+
+        --- Return
+        :return: the best column and the score (type: <tuple>), None if the position is not in the book
+        """
+        # the book is searched for connect 4 only
+        if position.move_count() > self._plies or position.rowcount() != self._rows or \
+                position.columncount() != self._columns or position.connect() != 4:
+            return None
+        key = position.key()
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if _KEY.unpack_from(self._map, _HEADER.size + middle * _RECORD.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self._count:
+            return None
+        record_key, score, column = _RECORD.unpack_from(self._map, _HEADER.size + low * _RECORD.size)
+        if record_key != key or not position.can_play(column):
+            return None
+        return column, score
+
+    def close(self):
+        """
+        Unmap the file
+        """
+        self._map.close()
+
+
+# ----- FUNCTION ZONE -----
+def book_positions(plies, rows=6, columns=7, player_piece=1, computer_piece=2):
+    """
+    --- Description
+    All the positions with at most <plies> pieces where the computer is to move, the player moving first.
+    The positions where somebody already won are left out, and every position is given only once, even if it is
+    reached by different orders of the moves.
+
+    --- Return
+    :return: the positions (type: <list of Position>)
+    """
+    positions = {}
+    visited = set()
+
+    def visit(position, piece):
+        if position.move_count() > plies or position.key() in visited:
+            return
+        visited.add(position.key())
+        if piece == computer_piece:
+            positions[position.key()] = position.copy()
+        for col in position.valid_moves():
+            position.play(col, piece)
+            if not position.is_winning(piece):
+                visit(position, player_piece if piece == computer_piece else computer_piece)
+            position.undo()
+
+    visit(Position(rows, columns), player_piece)
+    return list(positions.values())
+
+
+def build_book(path, plies, depth, log=None):
+    """
+    --- Description
+    Search every position of <book_positions> to the given depth and write the book, sorted by the key.
+    This is slow and meant to be run offline, the game only reads the result.
+
+    --- Parameters
+    :param path: where the book is written (type: <str>)
+    :param plies: the positions with at most this many pieces are searched (type: <int>)
+    :param depth: the depth of every search (type: <int>)
+    :param log: called with (done, total) after every search, None for silence (type: <function>)
+
+    --- Return
+    :return: how many positions are in the book (type: <int>)
+    """
+    # imported here, the hard mode itself reads the books
+    from start_game.minimax import HardMode
+
+    hard = HardMode(time_budget=0, workers=1, opening_book='')
+    positions = book_positions(plies)
+    records = []
+    for done, position in enumerate(positions, 1):
+        # a new table for every position, so the move does not depend on the order of the searches
+        hard.table().clear()
+        column, score = hard.minimax(position, depth)
+        records.append((position.key(), score, column))
+        if log is not None:
+            log(done, len(positions))
+    records.sort()
+    header = _HEADER.pack(_MAGIC, _VERSION, positions[0].rowcount(), positions[0].columncount(), plies, depth)
+    data = header + b''.join(_RECORD.pack(*record) for record in records)
+    write_atomic(path, data)
+    return len(records)
+
+
+def main():
+    """
+    Build the opening book from the command line, for example:
+        python -m start_game.opening_book --plies 3 --depth 10
+    """
+    parser = argparse.ArgumentParser(description='Build the opening book of the hard mode.')
+    parser.add_argument('--plies', type=int, default=3, help='the positions with at most this many pieces')
+    parser.add_argument('--depth', type=int, default=10, help='the depth of the search of every position')
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(SETTINGS_PATH), 'opening.book'),
+                        help='the path of the book')
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def log(done, total):
+        print('\r{}/{} positions, {:.0f}s'.format(done, total, time.perf_counter() - start), end='', flush=True)
+
+    count = build_book(arguments.output, arguments.plies, arguments.depth, log)
+    print('\n{} positions written to {}'.format(count, arguments.output))
+
+
+if __name__ == '__main__':
+    main()
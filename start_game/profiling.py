@@ -0,0 +1,250 @@
+# ----- IMPORT ZONE -----
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import random
+import time
+import tracemalloc
+from domain.position import Position
+from domain.repository import board_to_string, board_from_string, move_list, write_atomic
+from start_game.mcts import MonteCarloMode
+from start_game.minimax import EasyMode, MediumMode, HardMode
+from start_game.settings import load_settings, data_directory
+
+
+# ----- TABLES ZONE -----
+# The generator of the seeds of the profiled moves, apart from the random module so profiling does not change
+# the random moves of the game
+_SEEDS = random.Random()
+
+
+# ----- CLASS ZONE -----
+class MoveProfiler:
+    """
+    --- Description
+    Profiles the moves of the computer: every move is run under cProfile and tracemalloc, then three files are
+    written in the profile directory, with the same name:
+        <name>.json - the position, the AI and its parameters, the seed of the random moves and the result,
+                      everything <replay> needs to run the same search again
+        <name>.pstats - the cProfile stats, read them with pstats or: python -m start_game.profiling show
+        <name>.tracemalloc - the tracemalloc snapshot taken at the end of the move, read it with
+                             tracemalloc.Snapshot.load
+    tracemalloc makes the search a few times slower, so a profiled move searches less deeply in the same time.
+    The game only makes a profiler if profile_moves is on in settings.properties, otherwise nothing is profiled
+    and nothing is paid for it.
+    """
+
+    def __init__(self, directory):
+        """
+        :param directory: where the profiles are written, it is made if it does not exist (type: <str>)
+        """
+        self._directory = directory
+        self._count = 0
+
+    def directory(self):
+        """
+        --- Return
+        :return: where the profiles are written (type: <str>)
+        """
+        return self._directory
+
+    def run(self, ai, difficulty, position):
+        """
+        --- Description
+        Find the move of the computer with the profilers on, then write the profile
+
+        --- Parameters
+        :param ai: the AI of the computer (type: <class EasyMode>, <class MediumMode>, <class HardMode>
+                   or <class MonteCarloMode>)
+        :param difficulty: easy, medium, hard or mcts (type: <str>)
+        :param position: the board, the computer is to move (type: <class Position>)
+
+        --- Return
+        :return: the column and the path of the JSON file of the profile (type: <tuple>)
+        """
+        record = describe_search(ai, difficulty, position)
+        # the move runs with the seed of the profile, then the random module goes on as if it was not profiled
+        state = random.getstate()
+        random.seed(record['seed'])
+        profile = cProfile.Profile()
+        tracemalloc.start()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            column = computer_move(ai, difficulty, position)
+        finally:
+            profile.disable()
+            random.setstate(state)
+            seconds = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        record.update({'column': column, 'seconds': seconds, 'peak_bytes': peak})
+        if difficulty == 'hard':
+            record['search_stats'] = ai.search_stats().to_dict()
+        os.makedirs(self._directory, exist_ok=True)
+        self._count += 1
+        name = os.path.join(self._directory, 'move-{}-{}-{}'.format(
+            time.strftime('%Y%m%d-%H%M%S'), os.getpid(), self._count))
+        profile.dump_stats(name + '.pstats')
+        snapshot.dump(name + '.tracemalloc')
+        write_atomic(name + '.json', json.dumps(record, indent=2))
+        return column, name + '.json'
+
+
+# ----- FUNCTION ZONE -----
+def make_profiler():
+    """
+    --- Return
+    :return: a profiler writing in profile_dir (relative to the data directory) if profile_moves is on
+             in settings.properties, otherwise None (type: <class MoveProfiler>)
+    """
+    settings = load_settings()
+    if not settings.getboolean('profile_moves', fallback=False):
+        return None
+    return MoveProfiler(os.path.join(data_directory(), settings.get('profile_dir', fallback='profiles')))
+
+
+def computer_move(ai, difficulty, position):
+    """
+    --- Description
+    The move of the computer, the way the UI and the GUI ask every AI for it
+
+    --- Return
+    :return: the column (type: <int>)
+    """
+    if difficulty == 'easy':
+        return ai.calculate_move(position)
+    if difficulty == 'medium':
+        return ai.pick_best_move(position, 2)
+    if difficulty == 'mcts':
+        return ai.best_move(position)[0]
+    return ai.iterative_deepening(position)[0]
+
+
+def describe_search(ai, difficulty, position):
+    """
+    --- Description
+    Everything needed to run the search of a move again: the position, its moves if they are known, the AI and
+    its parameters, and a new seed for the random moves of the easy and medium modes
+
+    --- Return
+    :return: the description, ready for JSON (type: <dict>)
+    """
+    rows, columns, connect = position.geometry()
+    record = {'difficulty': difficulty, 'rows': rows, 'columns': columns, 'connect': connect,
+              'board': board_to_string(position), 'moves': move_list(position), 'seed': _SEEDS.randrange(2 ** 32)}
+    if difficulty == 'hard':
+        book = ai.opening_book()
+        record['hard_mode'] = {'table_memory_mb': ai.table_memory_mb(), 'time_budget': ai.time_budget(),
+                               'workers': ai.workers(), 'opening_book': book.path() if book is not None else '',
+                               'endgame_threshold': ai.endgame_threshold()}
+    if difficulty == 'mcts':
+        record['mcts_mode'] = {'iterations': ai.iterations(), 'time_budget': ai.time_budget(),
+                               'exploration': ai.exploration(), 'playouts': ai.playouts(), 'workers': ai.workers()}
+    return record
+
+
+def read_position(record):
+    """
+    --- Return
+    :return: the position of a profile, played move by move if its moves are known (type: <class Position>)
+    """
+    geometry = record['rows'], record['columns'], record['connect']
+    position = board_from_string(record['board'], *geometry)
+    if record['moves']:
+        played = Position(*geometry)
+        for row, col, piece in record['moves']:
+            played.play(col, piece)
+        if played == position:
+            return played
+    return position
+
+
+def replay(path, exact=True):
+    """
+    --- Description
+    Run the search of a profiled move again, with the same position, AI, parameters and seed.
+    The transposition table starts empty, the one of the game had the searches of the earlier moves in it.
+    The Monte Carlo mode starts with a new tree, so it finds the same move only with a number of iterations and
+    if the profiled move did not reuse the tree of the move before.
+
+    --- Parameters
+    :param path: the JSON file of the profile (type: <str>)
+    :param exact: for the hard mode, search exactly the depth the profiled move reached instead of searching for
+                  the same time, so the same move is found even on a faster or slower machine (type: <bool>)
+
+    --- Return
+    :return: the column, the AI after the search and the description of the profile (type: <tuple>)
+    """
+    with open(path) as f:
+        record = json.load(f)
+    position = read_position(record)
+    difficulty = record['difficulty']
+    state = random.getstate()
+    random.seed(record['seed'])
+    if difficulty == 'easy':
+        ai = EasyMode()
+    elif difficulty == 'medium':
+        ai = MediumMode()
+    elif difficulty == 'mcts':
+        ai = MonteCarloMode(**record['mcts_mode'])
+    else:
+        ai = HardMode(search_log='', **record['hard_mode'])
+    stats = record.get('search_stats')
+    try:
+        if difficulty == 'hard' and exact and stats is not None and stats['source'] in ('search', 'parallel'):
+            column = ai.iterative_deepening(position, time_budget=0, max_depth=max(1, stats['depth']))[0]
+        else:
+            column = computer_move(ai, difficulty, position)
+    finally:
+        random.setstate(state)
+        if difficulty in ('hard', 'mcts'):
+            ai.close()
+    return column, ai, record
+
+
+def main():
+    """
+    Replay a profiled move, or show a profile, from the command line, for example:
+        python -m start_game.profiling replay profiles/move-20240101-120000-1234-1.json --profile
+        python -m start_game.profiling show profiles/move-20240101-120000-1234-1.pstats
+    """
+    parser = argparse.ArgumentParser(description='Replay and read the profiles of the moves of the computer.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    replay_parser = commands.add_parser('replay', help='run the search of a profiled move again')
+    replay_parser.add_argument('path', help='the JSON file of the profile')
+    replay_parser.add_argument('--same-time', action='store_true',
+                               help='search for the time budget instead of the depth the profiled move reached')
+    replay_parser.add_argument('--profile', action='store_true', help='show where the time of the replay went')
+    show_parser = commands.add_parser('show', help='show a cProfile profile')
+    show_parser.add_argument('path', help='the .pstats file of the profile')
+    for command in (replay_parser, show_parser):
+        command.add_argument('--sort', default='cumulative', help='the pstats sort key')
+        command.add_argument('--limit', type=int, default=25, help='how many functions to show')
+    arguments = parser.parse_args()
+
+    if arguments.command == 'show':
+        pstats.Stats(arguments.path).sort_stats(arguments.sort).print_stats(arguments.limit)
+        return
+    profile = cProfile.Profile() if arguments.profile else None
+    start = time.perf_counter()
+    if profile is not None:
+        profile.enable()
+    column, ai, record = replay(arguments.path, not arguments.same_time)
+    if profile is not None:
+        profile.disable()
+    seconds = time.perf_counter() - start
+    print('column {} in {:.3f}s (profiled move: column {} in {:.3f}s)'.format(
+        column, seconds, record['column'], record['seconds']))
+    if record['difficulty'] == 'hard':
+        print(ai.search_stats().summary())
+    if profile is not None:
+        pstats.Stats(profile).sort_stats(arguments.sort).print_stats(arguments.limit)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+# ----- IMPORT ZONE -----
+import json
+import os
+import time
+
+
+# ----- CLASS ZONE -----
+class SearchStats:
+    """
+    --- Description
+    What one move of the hard mode cost and why: it is filled in while the search runs and read after it.
+        source - how the move was found: search, parallel (root split search), book (opening book) or solver
+        nodes_by_ply - how many nodes were visited at every distance from the root, the root is ply 0
+        leaf_evaluations - how many nodes were scored by the evaluation, at depth zero
+        terminal_hits - how many nodes were the end of the game (a win or a full board)
+        expanded - how many nodes had their moves searched
+        cutoffs - how many nodes were cut by alpha-beta, first_move_cutoffs - how many by their first move
+        tt_probes, tt_hits - how many times the transposition table was read and had the position
+        tt_cutoffs - how many nodes got their score from the transposition table, without a search
+        solver_nodes - the nodes of the exact endgame solver
+        iterations - one dict for every depth of the iterative deepening: depth, nodes, seconds, column, score and
+                     completed (false if the time ran out during it)
+        column, score, pv, seconds - the result of the search, the principal variation and the wall time
+    """
+    __slots__ = ('source', 'nodes_by_ply', 'leaf_evaluations', 'terminal_hits', 'expanded', 'cutoffs',
+                 'first_move_cutoffs', 'tt_probes', 'tt_hits', 'tt_cutoffs', 'solver_nodes', 'iterations',
+                 'column', 'score', 'pv', 'seconds')
+
+    def __init__(self, source='search'):
+        self.source = source
+        self.nodes_by_ply = []
+        self.leaf_evaluations = 0
+        self.terminal_hits = 0
+        self.expanded = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_cutoffs = 0
+        self.solver_nodes = 0
+        self.iterations = []
+        self.column = None
+        self.score = None
+        self.pv = []
+        self.seconds = 0.0
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    # ----- COUNTING -----
+    def reach(self, depth):
+        """
+        Make room for the nodes of a search <depth> plies deep
+        """
+        if len(self.nodes_by_ply) < depth + 1:
+            self.nodes_by_ply += [0] * (depth + 1 - len(self.nodes_by_ply))
+
+    def add_iteration(self, depth, nodes, seconds, column, score, completed=True):
+        """
+        Record one depth of the iterative deepening
+        """
+        self.iterations.append({'depth': depth, 'nodes': nodes, 'seconds': seconds, 'column': column,
+                                'score': score, 'completed': completed})
+
+    def merge(self, other):
+        """
+        --- Description
+        Add the counters of another search to these ones, for the searches of the workers of the parallel search
+
+        --- Parameters
+        :param other: (type: <class SearchStats>)
+        """
+        self.reach(len(other.nodes_by_ply) - 1)
+        for ply, nodes in enumerate(other.nodes_by_ply):
+            self.nodes_by_ply[ply] += nodes
+        for name in ('leaf_evaluations', 'terminal_hits', 'expanded', 'cutoffs', 'first_move_cutoffs',
+                     'tt_probes', 'tt_hits', 'tt_cutoffs', 'solver_nodes'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    # ----- RESULTS -----
+    def nodes(self):
+        """
+        --- Return
+        :return: all the nodes visited, by the search and by the solver (type: <int>)
+        """
+        return sum(self.nodes_by_ply) + self.solver_nodes
+
+    def depth(self):
+        """
+        --- Return
+        :return: the deepest depth that was completed, 0 if there was no search (type: <int>)
+        """
+        return max((iteration['depth'] for iteration in self.iterations if iteration['completed']), default=0)
+
+    def branching_factor(self):
+        """
+        --- Description
+        The average number of moves searched in a node which was expanded, every node except the roots is a
+        move of an expanded node. Good move ordering keeps it low: a cut after the first move searches only one.
+
+        --- Return
+        :return: the branching factor, 0 if no node was expanded (type: <float>)
+        """
+        if not self.expanded:
+            return 0.0
+        roots = self.nodes_by_ply[0] if self.nodes_by_ply else 0
+        return (sum(self.nodes_by_ply) - roots) / self.expanded
+
+    def tt_hit_rate(self):
+        """
+        --- Return
+        :return: the part of the reads of the transposition table which found the position (type: <float>)
+        """
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def nodes_per_second(self):
+        """
+        --- Return
+        :return: the speed of the search (type: <float>)
+        """
+        return self.nodes() / self.seconds if self.seconds else 0.0
+
+    def to_dict(self):
+        """
+        --- Return
+        :return: all the stats and the derived ones, ready for JSON (type: <dict>)
+        """
+        stats = self.__getstate__()
+        stats['nodes'] = self.nodes()
+        stats['depth'] = self.depth()
+        stats['branching_factor'] = self.branching_factor()
+        stats['tt_hit_rate'] = self.tt_hit_rate()
+        stats['nodes_per_second'] = self.nodes_per_second()
+        return stats
+
+    def summary(self):
+        """
+        --- Return
+        :return: the stats in one short line, to be shown by the UI and the GUI (type: <str>)
+        """
+        pv = ' '.join(str(col) for col in self.pv)
+        if self.source == 'book':
+            return 'opening book | pv ' + pv
+        parts = [self.source if self.source == 'solver' else 'depth {}'.format(self.depth()),
+                 '{:,} nodes'.format(self.nodes()), '{:,.0f} nodes/s'.format(self.nodes_per_second())]
+        if self.expanded:
+            first = self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+            parts += ['bf {:.2f}'.format(self.branching_factor()),
+                      'cuts {:,} ({:.0%} first)'.format(self.cutoffs, first),
+                      'TT {:.0%} hits'.format(self.tt_hit_rate())]
+        parts += ['{:.2f}s'.format(self.seconds), 'pv ' + pv]
+        return ' | '.join(parts)
+
+
+# ----- FUNCTION ZONE -----
+def append_log(path, stats, moves):
+    """
+    --- Description
+    Add the stats of a move to a JSON-lines log, one JSON object on every line
+
+    --- Parameters
+    :param path: the path of the log (type: <str>)
+    :param stats: (type: <class SearchStats>)
+    :param moves: how many pieces were on the board when the search started (type: <int>)
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    record = {'time': time.time(), 'moves': moves}
+    record.update(stats.to_dict())
+    with open(path, 'a') as f:
+        f.write(json.dumps(record, separators=(',', ':')) + '\n')
@@ -0,0 +1,48 @@
+# ----- IMPORT ZONE -----
+import configparser
+import os
+
+
+# ----- FUNCTION ZONE -----
+SETTINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'settings.properties')
+DATA_DIR_VARIABLE = 'CONNECT_FOUR_DATA_DIR'
+
+# The settings already read, so the file is read only once for every path
+_SETTINGS = {}
+
+
+def load_settings(path=SETTINGS_PATH):
+    """
+    --- Description
+    Read the [Settings] section of settings.properties.
+    The path is taken relative to this file, so it does not depend on the directory the game is started from.
+    The file is read only the first time, the next calls get the same settings.
+
+    --- Parameters
+    :param path: the path of the settings file (type: <str>)
+
+    --- Return
+    :return: the settings, use getint/getfloat/getboolean with a fallback (type: <configparser.SectionProxy>)
+    """
+    if path not in _SETTINGS:
+        config = configparser.ConfigParser()
+        config.read(path)
+        if not config.has_section('Settings'):
+            config.add_section('Settings')
+        _SETTINGS[path] = config['Settings']
+    return _SETTINGS[path]
+
+
+def data_directory():
+    """
+    --- Description
+    The directory of the save files. It is, in this order:
+        - the CONNECT_FOUR_DATA_DIR environment variable
+        - data_dir from settings.properties (relative to the directory of settings.properties)
+        - the start_game directory
+
+    --- Return
+    :return: the path of the directory (type: <str>)
+    """
+    directory = os.environ.get(DATA_DIR_VARIABLE) or load_settings().get('data_dir', fallback='')
+    return os.path.join(os.path.dirname(SETTINGS_PATH), directory)
@@ -0,0 +1,208 @@
+# ----- IMPORT ZONE -----
+from start_game.transposition import TranspositionTable
+
+
+# ----- CLASS ZONE -----
+class EndgameSolver:
+    """
+    --- Description
+    Finds the exact result of a position (win, draw or loss with perfect play), by searching until the end of the
+    game. It is meant for the end of the game, when few cells are empty and the tree is small.
+
+    The score of a position is for the side to move and it tells how soon the game ends:
+        - a win with the k-th piece of the board scores cells + 1 - k, so a faster win scores more
+        - a loss with the k-th piece of the board scores -(cells + 1 - k)
+        - a draw scores 0
+    It depends only on the position, not on how far it is from the searched one, so the transposition table
+    keeps it from one search to the next.
+
+    The exact score is found with null-window searches: every search only answers "is the score above x?",
+    which cuts a lot more than a search with a wide window, and the possible scores are halved every time.
+    """
+
+    def __init__(self, table_memory_mb=16):
+        """
+        --- Parameters
+        :param table_memory_mb: how much memory the transposition table may use, in megabytes (type: <float>)
+        """
+        self._table = TranspositionTable(table_memory_mb)
+        self._nodes = 0
+
+    # ----- GETTERS -----
+    def nodes(self):
+        """
+        --- Return
+        :return: how many nodes the last call searched (type: <int>)
+        """
+        return self._nodes
+
+    def table(self):
+        """
+        --- Return
+        :return: the transposition table, it is kept between searches (type: <class TranspositionTable>)
+        """
+        return self._table
+
+    @staticmethod
+    def result(score):
+        """
+        --- Return
+        :return: win, draw or loss, for the side the score is for (type: <str>)
+        """
+        if score > 0:
+            return 'win'
+        if score < 0:
+            return 'loss'
+        return 'draw'
+
+    @staticmethod
+    def distance(position, score):
+        """
+        --- Description
+        How many moves are left until the game ends, from the position, with perfect play
+
+        --- Parameters
+        :param position: the position the score is for (type: <class Position>)
+        :param score: a score of <solve> (type: <int>)
+
+        --- Return
+        :return: the number of moves, both sides counted (type: <int>)
+        """
+        cells = position.rowcount() * position.columncount()
+        if score == 0:
+            return cells - position.move_count()
+        return cells + 1 - abs(score) - position.move_count()
+
+    # ----- SOLVE -----
+    def solve(self, position, piece):
+        """
+        --- Description
+        The exact score of the position, with null-window searches
+
+        --- Parameters
+        :param position: the position, nobody won yet, it is the same after the search (type: <class Position>)
+        :param piece: the piece that moves, 1 or 2 (type: <int>)
+
+        --- Return
+        :return: the score for the piece (type: <int>)
+        """
+        self._nodes = 0
+        if position.is_full():
+            return 0
+        cells = position.rowcount() * position.columncount()
+        moves = position.move_count()
+        # the opponent wins with its next piece at the worst, the piece wins with its next piece at the best
+        low = -(cells - 1 - moves)
+        high = cells - moves
+        while low < high:
+            middle = low + (high - low) // 2
+            value = self._negamax(position, piece, middle, middle + 1)
+            if value <= middle:
+                high = value
+            else:
+                low = value
+        return low
+
+    def best_move(self, position, piece):
+        """
+        --- Description
+        The best column of the position: the one with the best score, the leftmost one if several are the best.
+        Every move is solved, the transposition table makes the positions already seen cheap.
+
+        --- Parameters
+        :param position: the position, it is the same after the search (type: <class Position>)
+        :param piece: the piece that moves, 1 or 2 (type: <int>)
+
+        --- Return
+        :return: the best column and its score for the piece (type: <tuple>)
+        """
+        cells = position.rowcount() * position.columncount()
+        # a move that wins at once has the best possible score
+        for col in position.valid_moves():
+            position.play(col, piece)
+            won = position.is_winning(piece)
+            position.undo()
+            if won:
+                self._nodes = 1
+                return col, cells - position.move_count()
+
+        best_column, best_score = None, None
+        nodes = 0
+        for col in position.valid_moves():
+            position.play(col, piece)
+            score = -self.solve(position, 3 - piece)
+            nodes += self._nodes
+            position.undo()
+            if best_score is None or score > best_score:
+                best_column, best_score = col, score
+        self._nodes = nodes
+        return best_column, best_score
+
+    def _negamax(self, position, piece, alpha, beta):
+        """
+        --- Description
+        Alpha-beta search until the end of the game. The opponent did not win with the last move.
+
+        --- Return
+        :return: the score for the piece to move, exact if it is inside the window, otherwise a bound of it
+                 (type: <int>)
+        """
+        self._nodes += 1
+        cells = position.rowcount() * position.columncount()
+        moves = position.move_count()
+        valid_moves = position.valid_moves()
+
+        # the side to move wins at once if it can
+        for col in valid_moves:
+            position.play(col, piece)
+            won = position.is_winning(piece)
+            position.undo()
+            if won:
+                return cells - moves
+        if moves >= cells - 1:
+            return 0  # the last piece does not win, it is a draw
+
+        # the side to move cannot win before its next move, the opponent cannot win before its next one
+        high = cells - 2 - moves
+        low = -(cells - 1 - moves)
+        key = (position.key() << 1) | (piece == 2)
+        entry = self._table.probe(key)
+        if entry is not None:
+            bound, score = entry[2], entry[1]
+            if bound == TranspositionTable.EXACT:
+                return score
+            if bound == TranspositionTable.UPPER:
+                high = min(high, score)
+            else:
+                low = max(low, score)
+        if beta > high:
+            beta = high
+            if alpha >= beta:
+                return beta
+        if alpha < low:
+            alpha = low
+            if alpha >= beta:
+                return alpha
+
+        center = position.columncount() // 2
+        original_alpha = alpha
+        value = -cells
+        for col in sorted(valid_moves, key=lambda c: abs(c - center)):
+            position.play(col, piece)
+            score = -self._negamax(position, 3 - piece, -beta, -alpha)
+            position.undo()
+            if score > value:
+                value = score
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                break
+
+        if value <= original_alpha:
+            bound = TranspositionTable.UPPER
+        elif value >= beta:
+            bound = TranspositionTable.LOWER
+        else:
+            bound = TranspositionTable.EXACT
+        self._table.store(key, cells - moves, value, bound, None)
+        return value
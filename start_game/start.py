@@ -1,16 +1,131 @@
 # ----- IMPORT ZONE -----
-from domain.boardJSON import BoardJSON
-from validator.boardValidator import validate_column, InvalidColumn
+from domain.position import Position
+from domain.repository import GameRepository
+from start_game.profiling import make_profiler, computer_move
+from start_game.settings import load_settings
+from start_game.solver import EndgameSolver
+from validator.boardValidator import validate_column, validate_geometry, validate_save_policy, InvalidColumn
 from validator.playerValidator import InvalidInput
 
 
 # ----- FUNCTION ZONE -----
-class Game(BoardJSON):
-    def __init__(self):
-        super().__init__()
+class Game:
+    def __init__(self, repository=None, rows=None, columns=None, connect=None, save_policy=None):
+        """
+        The arguments which are None are taken from settings.properties.
+        :param repository: where the game is saved, by default the save of settings.properties
+                           (type: <class GameRepository>)
+        :param rows: the number of rows of a new board (type: <int>)
+        :param columns: the number of columns of a new board (type: <int>)
+        :param connect: how many pieces in a row win a new game (type: <int>)
+        :param save_policy: when the game is saved: move (after every move), exit (when the game is closed),
+                            a number N (after every N moves and when the game is closed) or never
+                            (type: <str> or <int>)
+
+        -- Raises:
+        InvalidGeometry - if no game can be played on such a board
+        InvalidSavePolicy - if the save policy is not one of the above
+        """
+        settings = load_settings()
+        self._repository = GameRepository() if repository is None else repository
+        self._ROWCOUNT = settings.getint('rows', fallback=6) if rows is None else rows
+        self._COLUMNCOUNT = settings.getint('columns', fallback=7) if columns is None else columns
+        self._CONNECT = settings.getint('connect', fallback=4) if connect is None else connect
+        validate_geometry(self._ROWCOUNT, self._COLUMNCOUNT, self._CONNECT)
+        self._save_policy = validate_save_policy(settings.get('save_policy', fallback='move')
+                                                 if save_policy is None else save_policy)
+        # the board and the turn which are not saved yet, and how many moves were played since the last save
+        self._unsaved = None
+        self._unsaved_moves = 0
+        self._battle_mode = None
+        self._difficulty = None
         self._player1_piece = 1
         self._player2_piece = 2
         self._computer_piece = 2
+        self._endgame_threshold = settings.getint('endgame_threshold', fallback=16)
+        self._show_search_stats = settings.getboolean('show_search_stats', fallback=False)
+        # None unless profile_moves is on, then every move of the computer is profiled
+        self._profiler = make_profiler()
+        self._solver = None
+
+    # ----- SETTERS -----
+    def set_dif(self, dif):
+        """
+        Set the difficulty
+        :param dif: easy, medium or hard (type: <str>)
+        """
+        self._difficulty = dif
+
+    def set_battle_mode(self, bm):
+        """
+        Set the battle_mode
+        :param bm: player vs player or computer vs player (type: <str>)
+        """
+        self._battle_mode = bm
+
+    # ----- GETTERS -----
+    def rowcount(self):
+        """
+        --- Return
+        :return: the number of rows of a new board (type: int)
+        """
+        return self._ROWCOUNT
+
+    def columncount(self):
+        """
+        --- Return
+        :return: the number of columns of a new board (type: int)
+        """
+        return self._COLUMNCOUNT
+
+    def connect(self):
+        """
+        --- Return
+        :return: how many pieces in a row win a new game (type: int)
+        """
+        return self._CONNECT
+
+    def save_policy(self):
+        """
+        --- Return
+        :return: move, exit, never or the number of moves between the saves (type: <str> or <int>)
+        """
+        return self._save_policy
+
+    def has_unsaved_moves(self):
+        """
+        --- Return
+        :return: true if the game changed since it was last saved (type: <bool>)
+        """
+        return self._unsaved is not None
+
+    def battle_mode(self):
+        """
+        --- Return
+        :return: player bs player or player vs computer (type: <str>)
+        """
+        return self._battle_mode
+
+    def difficulty(self):
+        """
+        --- Return
+        :return: the difficulty, easy, medium or hard (type: <str>)
+        """
+        return self._difficulty
+
+    def repository(self):
+        """
+        --- Return
+        :return: where the game is saved (type: <class GameRepository>)
+        """
+        return self._repository
+
+    def show_search_stats(self):
+        """
+        --- Return
+        :return: true if the search stats of the hard mode are shown after every move of the computer (type: <bool>)
+        """
+        return self._show_search_stats
 
     def next_turn(self, turn):
         """
@@ -41,48 +156,139 @@ class Game(BoardJSON):
         Plays a turn in the game
 
         --- Parameters
-        :param board: (type: <class>)
+        :param board: (type: <class Position>)
         :param turn: whose turn is next (type: <str>)
         :param col: the chosen column (type: <int>)
         :param piece: 1 for player1, 2 for player2 and computer (type: <int>)
 
         --- Return
         :return: - if it is game over or not (type: <bool>)
-                 - the board (type: <class>)
+                 - the board (type: <class Position>)
                  - the turn (type: <str>)
         """
         try:
             game_over = False
             if validate_column(board, col):
                 # drop the piece in the available row
-                row = self.get_available_row(board, col)
-                self.drop_piece(board, row, col, piece)
-                # check for a win
-                if self.winning(board, piece):
+                row = board.play(col, piece)
+                # check for a win: the shifts of the whole bitboard cost less than walking the lines through the
+                # piece that was just dropped
+                if board.is_winning(piece):
                     game_over = True
                 # it's the opponent's turn
                 else:
                     turn = self.next_turn(turn)
-                # save
-                board.save(turn, self.battle_mode(), self.difficulty())
+                self._save_move(board, row, col, piece, turn)
                 return game_over, board, turn
 
         except (InvalidInput, InvalidColumn) as err:
             print(err)
 
+    # ----- SAVE -----
+    def _save_move(self, board, row, col, piece, turn):
+        """
+        --- Description
+        Save a move that was just played, as the save policy says: with the policy move it is added to the journal
+        right away, otherwise the game only remembers that it is not saved (see <flush>)
+
+        --- Parameters
+        :param board: the board, with the move already played (type: <class Position>)
+        :param row: the row of the piece (type: <int>)
+        :param col: the column (type: <int>)
+        :param piece: the piece (type: <int>)
+        :param turn: whose turn it is after the move (type: <str>)
+        """
+        if self._save_policy == 'move':
+            self._repository.record_move(board, row, col, piece, turn, self.battle_mode(), self.difficulty())
+        else:
+            self._unsaved = board, turn
+            self._unsaved_moves += 1
+            if isinstance(self._save_policy, int) and self._unsaved_moves >= self._save_policy:
+                self.flush()
+
+    def flush(self):
+        """
+        --- Description
+        Save the game now if it changed since the last save, whatever the save policy is.
+        The whole game is saved at once, as one snapshot.
+
+        --- Return
+        :return: true if something was saved (type: <bool>)
+        """
+        if self._unsaved is None:
+            return False
+        board, turn = self._unsaved
+        self._repository.save(board, turn, self.battle_mode(), self.difficulty())
+        self._unsaved = None
+        self._unsaved_moves = 0
+        return True
+
+    def close(self):
+        """
+        --- Description
+        The game is closed (the UI or the GUI stops): the moves not saved yet are saved, unless the policy is never
+        """
+        if self._save_policy != 'never':
+            self.flush()
+
+    def find_computer_move(self, ai, board):
+        """
+        --- Description
+        Ask the AI for the move of the computer. If profile_moves is on, the move is profiled, see <MoveProfiler>.
+
+        --- Parameters
+        :param ai: the AI of the difficulty (type: <class EasyMode>, <class MediumMode> or <class HardMode>)
+        :param board: (type: <class Position>)
+
+        --- Return
+        :return: the column (type: <int>)
+        """
+        if self._profiler is None:
+            return computer_move(ai, self.difficulty(), board)
+        return self._profiler.run(ai, self.difficulty(), board)[0]
+
+    def solve_position(self, board, piece):
+        """
+        --- Description
+        Is this position solved? A position with at most <endgame_threshold> empty cells is solved exactly:
+        the result with perfect play of both sides is known, and how many moves it takes.
+
+        --- Parameters
+        :param board: (type: <class Position>)
+        :param piece: the piece that moves (type: <int>)
+
+        --- Return
+        :return: None if the position has too many empty cells to be solved, otherwise
+                 - the best column, None if the game is over (type: <int>)
+                 - win, draw or loss for the piece (type: <str>)
+                 - how many moves are left until the game ends (type: <int>)
+        """
+        if board.is_winning(piece):
+            return None, 'win', 0
+        if board.is_winning(3 - piece):
+            return None, 'loss', 0
+        if board.is_full():
+            return None, 'draw', 0
+        if board.rowcount() * board.columncount() - board.move_count() > self._endgame_threshold:
+            return None
+        if self._solver is None:
+            self._solver = EndgameSolver()
+        column, score = self._solver.best_move(board, piece)
+        return column, EndgameSolver.result(score), EndgameSolver.distance(board, score)
+
     def run_game(self, board, turn, col):
         """
         --- Description
         The main program for running the game
 
         --- Parameters
-        :param board: (type: <class>)
+        :param board: (type: <class Position>)
         :param turn: whose turn is next (type: <str>)
         :param col: the chosen column (type: <int>)
 
         --- Return
         :return: - if it is game over or not (type: <bool>)
-                 - the board (type: <class>)
+                 - the board (type: <class Position>)
                  - the turn (type: <str>)
         """
         game_over = False
@@ -97,38 +303,51 @@ class Game(BoardJSON):
 
         return game_over, board, turn
 
-    @staticmethod
-    def new_game():
+    def new_game(self):
         """
         --- Description
         Create a new board and make player1 play first
 
         --- Return
-        :return: - the board (type: <class>)
+        :return: - the board (type: <class Position>)
                  - the turn (type: <str>)
         """
         # create board
-        board = BoardJSON()
-        board.create_board()
+        board = Position(self._ROWCOUNT, self._COLUMNCOUNT, self._CONNECT)
         turn = 'player1'
+        if self._save_policy == 'move':
+            self._repository.save(board, turn, self.battle_mode(), self.difficulty())
+        else:
+            self._unsaved = board, turn
+            self._unsaved_moves = 0
         return board, turn
 
-    @staticmethod
-    def load_game():
+    def load_game(self):
         """
         --- Description
         Load the board and find whose turn it is and find the battle_mode
+        The save is read here, the first time a game is loaded, and then shared by every repository of the same file.
+        The battle mode, the difficulty and the size of the board of the game become the saved ones.
+        The moves which are not saved yet are saved first (with the policy never they are lost).
 
         --- Return
-        :return: - the board (type: <class>)
+        :return: - the board (type: <class Position>)
                  - the turn (type: <str>)
+                 - the battle mode (type: <str>)
         """
-        # create board
-        board = BoardJSON()
-        if board.boardmatrix() is None:
-            board.create_board()
-        turn = board.turn()
-        battle_mode = board.battle_mode()
+        self.close()
+        self._unsaved = None
+        self._unsaved_moves = 0
+        saved = self._repository.load()
+        if saved is None:
+            # there is no saved game, so a new one is created
+            self.set_battle_mode('player vs player')
+            board, turn = self.new_game()
+            return board, turn, self.battle_mode()
+        board, turn, battle_mode, difficulty = saved
+        self.set_battle_mode(battle_mode)
+        self.set_dif(difficulty)
+        self._ROWCOUNT, self._COLUMNCOUNT, self._CONNECT = board.geometry()
         return board, turn, battle_mode
 
 
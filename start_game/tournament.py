@@ -0,0 +1,372 @@
+# ----- IMPORT ZONE -----
+import argparse
+import itertools
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from domain.position import Position
+from domain.records import export_games, replay
+from start_game.mcts import MonteCarloMode
+from start_game.minimax import EasyMode, MediumMode, HardMode
+from validator.boardValidator import validate_geometry, InvalidGeometry
+
+
+# ----- EXCEPTIONS ZONE -----
+class InvalidEngine(Exception):
+    def __init__(self, msg):
+        super().__init__(msg)
+
+
+# ----- ENGINES ZONE -----
+# The options an engine accepts after its name, for example hard:depth=4 or hard:time=0.2,book=0
+_ENGINE_OPTIONS = {'easy': (), 'medium': (), 'hard': ('depth', 'time', 'book', 'endgame'),
+                   'mcts': ('iterations', 'time', 'exploration', 'random')}
+
+# The engines already made in this process, by their spec, so a worker makes every engine only once
+_ENGINES = {}
+
+
+def parse_engine(spec):
+    """
+    --- Description
+    Read an engine spec: the difficulty, then optionally ':' and comma separated options, for example
+        easy, medium, hard, hard:depth=4, hard:time=0.2, hard:time=0.5,book=0,endgame=0
+    depth - the hard mode searches exactly this deep with minimax
+    time - the hard mode searches with iterative deepening for this many seconds
+    book - 0 turns off the opening book
+    endgame - the endgame threshold, 0 turns off the exact solver
+    and for mcts, for example mcts:iterations=2000 or mcts:time=0.2,exploration=1.0:
+    iterations - the Monte Carlo mode makes exactly this many playouts
+    time - the Monte Carlo mode makes playouts for this many seconds
+    exploration - the exploration constant of UCT
+    random - 1 for random playouts instead of the heuristic ones
+
+    --- Raises
+    InvalidEngine - if the spec has an unknown difficulty or option
+
+    --- Return
+    :return: the difficulty and the options (type: <tuple>)
+    """
+    name, _, text = spec.partition(':')
+    if name not in _ENGINE_OPTIONS:
+        raise InvalidEngine('Unknown engine: ' + name)
+    options = {}
+    for option in filter(None, text.split(',')):
+        key, _, value = option.partition('=')
+        if key not in _ENGINE_OPTIONS[name] or not value:
+            raise InvalidEngine('Unknown option of ' + name + ': ' + option)
+        try:
+            options[key] = float(value) if key in ('time', 'exploration') else int(value)
+        except ValueError:
+            raise InvalidEngine('The option ' + key + ' should be a number')
+    return name, options
+
+
+def make_engine(spec):
+    """
+    --- Return
+    :return: the AI of the spec, made only once in every process (type: <class EasyMode>, <class MediumMode>,
+             <class HardMode> or <class MonteCarloMode>)
+    """
+    if spec not in _ENGINES:
+        name, options = parse_engine(spec)
+        if name == 'easy':
+            _ENGINES[spec] = EasyMode()
+        elif name == 'medium':
+            _ENGINES[spec] = MediumMode()
+        elif name == 'mcts':
+            _ENGINES[spec] = MonteCarloMode(options.get('iterations', 0), options.get('time'),
+                                            options.get('exploration'),
+                                            'random' if options.get('random') else 'heuristic', workers=1)
+        else:
+            _ENGINES[spec] = HardMode(workers=1, opening_book=None if options.get('book', 1) else '',
+                                      endgame_threshold=options.get('endgame'))
+    return _ENGINES[spec]
+
+
+def engine_move(spec, position):
+    """
+    --- Description
+    Let the engine choose a move. The AI always plays the piece 2, so the position is given as it is seen by it.
+
+    --- Parameters
+    :param spec: the engine (type: <str>)
+    :param position: the position as the engine sees it, the engine moves with the piece 2 (type: <class Position>)
+
+    --- Return
+    :return: the column and how many nodes were searched (type: <tuple>)
+    """
+    name, options = parse_engine(spec)
+    engine = make_engine(spec)
+    if name == 'easy':
+        return engine.calculate_move(position), 0
+    if name == 'medium':
+        return engine.pick_best_move(position, 2), len(position.valid_moves())
+    if name == 'mcts':
+        return engine.best_move(position)[0], engine.played()
+    if 'depth' in options:
+        column, score = engine.minimax(position, options['depth'])
+    else:
+        column, score = engine.iterative_deepening(position, time_budget=options.get('time'))
+    return column, engine.nodes()
+
+
+def swap_pieces(position):
+    """
+    --- Return
+    :return: the same board with the pieces of the two players swapped (type: <class Position>)
+    """
+    matrix = [[3 - piece if piece else 0 for piece in row] for row in position.to_matrix()]
+    return Position.from_matrix(matrix, *position.geometry())
+
+
+# ----- GAMES ZONE -----
+def play_game(first, second, opening=(), geometry=(6, 7, 4)):
+    """
+    --- Description
+    Play one game between two engines, without the UI and without saving anything
+
+    --- Parameters
+    :param first: the engine which plays the piece 1 and moves first (type: <str>)
+    :param second: the engine which plays the piece 2 (type: <str>)
+    :param opening: columns played before the engines start, both sides taking turns (type: <list>)
+    :param geometry: the rows, the columns and how many pieces in a row win (type: <tuple>)
+
+    --- Return
+    :return: a dict with
+             result - 1 if the first engine won, -1 if the second one won, 0 for a draw
+             moves - how many pieces were played
+             columns - the columns of all the moves, the opening too
+             time, nodes, turns - for both engines, the seconds spent thinking, the nodes searched and the moves made
+    """
+    position = Position(*geometry)
+    piece = 1
+    for col in opening:
+        position.play(col, piece)
+        piece = 3 - piece
+    engines = {1: first, 2: second}
+    spent = {1: 0.0, 2: 0.0}
+    nodes = {1: 0, 2: 0}
+    turns = {1: 0, 2: 0}
+    result = 0
+    while not position.is_full():
+        view = position if piece == 2 else swap_pieces(position)
+        start = time.perf_counter()
+        col, searched = engine_move(engines[piece], view)
+        spent[piece] += time.perf_counter() - start
+        nodes[piece] += searched
+        turns[piece] += 1
+        position.play(col, piece)
+        if position.is_winning(piece):
+            result = 1 if piece == 1 else -1
+            break
+        piece = 3 - piece
+    return {'result': result, 'moves': position.move_count(), 'columns': [col for col, _ in position.moves()],
+            'time': [spent[1], spent[2]],
+            'nodes': [nodes[1], nodes[2]], 'turns': [turns[1], turns[2]]}
+
+
+def random_opening(plies, seed, geometry=(6, 7, 4)):
+    """
+    --- Return
+    :return: random columns which do not win, the same for the same seed (type: <list>)
+    """
+    generator = random.Random(seed)
+    position = Position(*geometry)
+    piece = 1
+    opening = []
+    while len(opening) < plies:
+        col = generator.choice(position.valid_moves())
+        position.play(col, piece)
+        if position.is_winning(piece):
+            position.undo()
+            continue
+        opening.append(col)
+        piece = 3 - piece
+    return opening
+
+
+def _play_job(job):
+    """
+    Runs in a worker process: one game of the tournament
+    """
+    first, second, opening, geometry = job
+    return first, second, play_game(first, second, opening, geometry)
+
+
+# ----- RESULTS ZONE -----
+def elo_ratings(engines, games):
+    """
+    --- Description
+    Estimate the Elo rating of every engine from the results of all the games, with the first engine at 0.
+    The ratings are fitted with the same update as the Elo system, repeated until they settle. Every pair of
+    engines also gets one virtual draw, so an engine which won every game still has a finite rating.
+
+    --- Parameters
+    :param engines: the engines (type: <list of str>)
+    :param games: (first engine, second engine, points of the first engine) for every game (type: <list>)
+
+    --- Return
+    :return: the rating of every engine (type: <dict>)
+    """
+    results = list(games) + [(a, b, 0.5) for a, b in itertools.combinations(engines, 2)]
+    ratings = {engine: 0.0 for engine in engines}
+    counts = {engine: 0 for engine in engines}
+    for first, second, points in results:
+        counts[first] += 1
+        counts[second] += 1
+    for _ in range(1000):
+        change = {engine: 0.0 for engine in engines}
+        for first, second, points in results:
+            expected = 1 / (1 + 10 ** ((ratings[second] - ratings[first]) / 400))
+            change[first] += points - expected
+            change[second] -= points - expected
+        for engine in engines:
+            if counts[engine]:
+                ratings[engine] += 400 * change[engine] / counts[engine]
+        if max(abs(value) for value in change.values()) < 1e-6:
+            break
+    anchor = ratings[engines[0]]
+    return {engine: ratings[engine] - anchor for engine in engines}
+
+
+def run_tournament(engines, games=100, workers=1, random_plies=2, seed=0, geometry=(6, 7, 4), games_path=None):
+    """
+    --- Description
+    Every engine plays every other one. Every pair plays <games> games: the openings are random, and every
+    opening is played twice, with the engines changing the colors, so moving first is not an advantage.
+    The games run in <workers> processes. Nothing is saved, the save files are never touched, but the games can
+    be written to a file of games (see domain.records), for example to train on them.
+
+    --- Parameters
+    :param engines: the engine specs, see <parse_engine> (type: <list of str>)
+    :param games: how many games every pair plays (type: <int>)
+    :param workers: how many processes play the games (type: <int>)
+    :param random_plies: how many random moves start every game (type: <int>)
+    :param seed: the seed of the openings (type: <int>)
+    :param geometry: the rows, the columns and how many pieces in a row win, for example (10, 12, 5)
+                     (type: <tuple>)
+    :param games_path: write all the games to this file of games, .gz to compress it (type: <str>)
+
+    --- Return
+    :return: the report, a dict with the stats of every engine (see <tournament_report>)
+    """
+    for spec in engines:
+        parse_engine(spec)
+    jobs = []
+    for index, (a, b) in enumerate(itertools.combinations(engines, 2)):
+        for game in range(games):
+            opening = random_opening(random_plies, seed * 1000003 + index * 10007 + game // 2, geometry)
+            jobs.append((a, b, opening, geometry) if game % 2 == 0 else (b, a, opening, geometry))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_play_job, jobs, chunksize=max(1, len(jobs) // (workers * 8))))
+    else:
+        results = [_play_job(job) for job in jobs]
+    if games_path is not None:
+        export_games(games_path, ((replay(game['columns'], geometry), {'first': first, 'second': second})
+                                  for first, second, game in results))
+    return tournament_report(engines, results)
+
+
+def tournament_report(engines, results):
+    """
+    --- Description
+    Sum up the games of a tournament
+
+    --- Parameters
+    :param engines: the engine specs (type: <list of str>)
+    :param results: (first engine, second engine, game from <play_game>) for every game (type: <list>)
+
+    --- Return
+    :return: for every engine: games, wins, draws, losses, their rates, the average move latency in milliseconds,
+             the nodes per second and the Elo estimate (type: <dict>)
+    """
+    stats = {engine: {'games': 0, 'wins': 0, 'draws': 0, 'losses': 0, 'time': 0.0, 'nodes': 0, 'turns': 0}
+             for engine in engines}
+    scores = []
+    for first, second, game in results:
+        for index, engine in enumerate((first, second)):
+            sign = 1 if index == 0 else -1
+            engine_stats = stats[engine]
+            engine_stats['games'] += 1
+            if game['result'] * sign > 0:
+                engine_stats['wins'] += 1
+            elif game['result'] == 0:
+                engine_stats['draws'] += 1
+            else:
+                engine_stats['losses'] += 1
+            engine_stats['time'] += game['time'][index]
+            engine_stats['nodes'] += game['nodes'][index]
+            engine_stats['turns'] += game['turns'][index]
+        scores.append((first, second, (game['result'] + 1) / 2))
+    ratings = elo_ratings(engines, scores)
+
+    report = {}
+    for engine in engines:
+        engine_stats = stats[engine]
+        games = max(1, engine_stats['games'])
+        report[engine] = {
+            'games': engine_stats['games'], 'wins': engine_stats['wins'], 'draws': engine_stats['draws'],
+            'losses': engine_stats['losses'], 'win_rate': engine_stats['wins'] / games,
+            'draw_rate': engine_stats['draws'] / games, 'loss_rate': engine_stats['losses'] / games,
+            'move_ms': 1000 * engine_stats['time'] / max(1, engine_stats['turns']),
+            'nodes_per_second': engine_stats['nodes'] / engine_stats['time'] if engine_stats['time'] else 0.0,
+            'elo': ratings[engine]}
+    return report
+
+
+def format_report(report):
+    """
+    --- Return
+    :return: the report as a table, one engine on every line (type: <str>)
+    """
+    width = max(len('engine'), *(len(engine) for engine in report))
+    lines = ['{:<{}}  {:>6}  {:>6}  {:>6}  {:>6}  {:>9}  {:>10}  {:>7}'.format(
+        'engine', width, 'games', 'win', 'draw', 'loss', 'move ms', 'nodes/s', 'elo')]
+    for engine, stats in sorted(report.items(), key=lambda item: -item[1]['elo']):
+        lines.append('{:<{}}  {:>6}  {:>6.1%}  {:>6.1%}  {:>6.1%}  {:>9.2f}  {:>10.0f}  {:>+7.0f}'.format(
+            engine, width, stats['games'], stats['win_rate'], stats['draw_rate'], stats['loss_rate'],
+            stats['move_ms'], stats['nodes_per_second'], stats['elo']))
+    return '\n'.join(lines)
+
+
+def main():
+    """
+    Run a tournament from the command line, for example:
+        python -m start_game.tournament easy medium hard:depth=4 hard:time=0.2 --games 200 --workers 4
+        python -m start_game.tournament hard:depth=2 hard:depth=4 --rows 10 --columns 12 --connect 5
+    """
+    parser = argparse.ArgumentParser(description='Let the AI modes play against each other, without the UI.')
+    parser.add_argument('engines', nargs='+', help='easy, medium, hard, hard:depth=N, hard:time=SECONDS, '
+                                                   'with book=0 or endgame=N after a comma, mcts, '
+                                                   'mcts:iterations=N, mcts:time=SECONDS')
+    parser.add_argument('--games', type=int, default=100, help='how many games every pair of engines plays')
+    parser.add_argument('--workers', type=int, default=1, help='how many processes play the games')
+    parser.add_argument('--random-plies', type=int, default=2, help='how many random moves start every game')
+    parser.add_argument('--seed', type=int, default=0, help='the seed of the random openings')
+    parser.add_argument('--rows', type=int, default=6, help='the number of rows of the board')
+    parser.add_argument('--columns', type=int, default=7, help='the number of columns of the board')
+    parser.add_argument('--connect', type=int, default=4, help='how many pieces in a row win')
+    parser.add_argument('--json', help='also write the report to this JSON file')
+    parser.add_argument('--games-file', help='also write every game to this file of games, one game on every line')
+    arguments = parser.parse_args()
+    if len(arguments.engines) < 2:
+        parser.error('at least two engines are needed')
+
+    try:
+        validate_geometry(arguments.rows, arguments.columns, arguments.connect)
+        report = run_tournament(arguments.engines, arguments.games, arguments.workers, arguments.random_plies,
+                                arguments.seed, (arguments.rows, arguments.columns, arguments.connect),
+                                arguments.games_file)
+    except (InvalidEngine, InvalidGeometry) as err:
+        parser.error(str(err))
+    print(format_report(report))
+    if arguments.json:
+        with open(arguments.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# ----- IMPORT ZONE -----
+from collections import OrderedDict
+
+
+# ----- CLASS ZONE -----
+class TranspositionTable:
+    """
+    --- Description
+    Remembers the positions that were already searched, so a position reached again through another order of
+    the moves is not searched (and scored) one more time.
+
+    Every entry keeps the depth of the search, the score, the bound type of the score and the best move.
+    The table holds a bounded number of entries. When it is full, the least recently used entry is evicted.
+    An entry is replaced by a new search of the same position only if the new search is at least as deep.
+    """
+    EXACT = 0  # the score is the real score of the position
+    LOWER = 1  # the search failed high, the real score is at least the stored score
+    UPPER = 2  # the search failed low, the real score is at most the stored score
+
+    # An approximation of the bytes one entry uses (the key, the tuple and the place in the ordered dict)
+    ENTRY_SIZE = 200
+
+    def __init__(self, memory_mb=16):
+        """
+        --- Parameters
+        :param memory_mb: how much memory the table may use, in megabytes (type: <int> or <float>)
+        """
+        self._capacity = max(1, int(memory_mb * 1024 * 1024 // self.ENTRY_SIZE))
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+
+    # ----- GETTERS -----
+    def capacity(self):
+        """
+        --- Return
+        :return: the maximum number of entries (type: <int>)
+        """
+        return self._capacity
+
+    def stats(self):
+        """
+        --- Return
+        :return: the counters of the table (type: <dict>)
+        """
+        return {'entries': len(self._entries), 'capacity': self._capacity, 'probes': self._hits + self._misses,
+                'hits': self._hits, 'misses': self._misses, 'stores': self._stores, 'evictions': self._evictions}
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ----- PROBE & STORE -----
+    def probe(self, key):
+        """
+        --- Description
+        Look for a position in the table
+
+        --- Parameters
+        :param key: the hash of the position (type: <int>)
+
+        --- Return
+        :return: (depth, score, bound type, best move) or None if the position is not in the table (type: <tuple>)
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key, depth, score, bound, move):
+        """
+        --- Description
+        Store the result of a search
+
+        --- Parameters
+        :param key: the hash of the position (type: <int>)
+        :param depth: the depth of the search (type: <int>)
+        :param score: the score (type: <int>)
+        :param bound: EXACT, LOWER or UPPER (type: <int>)
+        :param move: the best move, None if there is none (type: <int>)
+        """
+        entries = self._entries
+        old_entry = entries.get(key)
+        if old_entry is not None:
+            entries.move_to_end(key)
+            if old_entry[0] > depth:
+                return
+        elif len(entries) >= self._capacity:
+            entries.popitem(last=False)
+            self._evictions += 1
+        entries[key] = (depth, score, bound, move)
+        self._stores += 1
+
+    def clear(self):
+        """
+        Remove all the entries and reset the counters
+        """
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
@@ -0,0 +1,73 @@
+import io
+import json
+from unittest import TestCase, mock
+from domain.position import Position
+from domain.records import read_record
+from domain.repository import board_to_string
+from start_game.analysis import InvalidPosition, parse_position, read_positions, analyse_positions, main
+from start_game.minimax import HardMode
+from testing.test_minimax import random_position
+from testing.test_repository import use_temporary_data_dir
+
+
+class TestAnalysis(TestCase):
+    def setUp(self):
+        use_temporary_data_dir(self)
+
+    def test_parse_position(self):
+        position = parse_position('4453')
+        self.assertEqual(position.moves(), [(3, 1), (3, 2), (4, 1), (2, 2)])
+        self.assertEqual(parse_position('4,4 5,3'), position)
+        self.assertEqual(parse_position(board_to_string(position)), position)
+        self.assertEqual(parse_position('12,1', 10, 12, 5).geometry(), (10, 12, 5))
+        self.assertRaises(InvalidPosition, parse_position, '8')
+        self.assertRaises(InvalidPosition, parse_position, '0')
+        self.assertRaises(InvalidPosition, parse_position, '4444444')
+        self.assertRaises(InvalidPosition, parse_position, '01010101')
+        self.assertRaises(InvalidPosition, parse_position, '1' * 42)
+        # a piece above an empty cell
+        self.assertRaises(InvalidPosition, parse_position, '0' * 7 + '1' + '0' * 34)
+        self.assertRaises(InvalidPosition, parse_position, '1000000' + '0' * 7 + '2' + '0' * 27)
+
+    def test_same_moves_as_records(self):
+        # a move string is the same game in a file of positions and in a file of games
+        position, metadata = read_record('4453')
+        self.assertEqual(parse_position('4453'), position)
+        self.assertEqual(parse_position('4453').moves(), position.moves())
+        position, metadata = read_record('4,4,12,5\t{"rows": 10, "columns": 12, "connect": 5}')
+        self.assertEqual(parse_position('4,4,12,5', 10, 12, 5), position)
+        self.assertEqual(parse_position('4,4,12,5', 10, 12, 5).moves(), position.moves())
+
+    def test_read_positions(self):
+        lines = ['# games', '', '45', 'x']
+        self.assertEqual([(number, text, ply) for number, text, ply, _ in read_positions(lines)],
+                         [(3, '45', 2), (4, 'x', None)])
+        plies = [(ply, position.moves()) for _, _, ply, position in read_positions(lines[:3], every_move=True)]
+        self.assertEqual(plies, [(0, []), (1, [(3, 1)]), (2, [(3, 1), (4, 2)])])
+
+    def test_analyse_positions(self):
+        positions = [board_to_string(random_position(seed * 3 + 1, seed)) for seed in range(6)] + ['9', '4242424']
+        results = list(analyse_positions(positions, depth=4, endgame=0))
+        parallel = list(analyse_positions(iter(positions), depth=4, endgame=0, workers=2))
+        for result in results + parallel:
+            result.pop('seconds', None)
+        self.assertEqual(results, parallel)
+        self.assertEqual([result['line'] for result in results], list(range(1, 9)))
+        self.assertIn('error', results[6])
+        self.assertEqual(results[7]['error'], 'The game is over')
+
+        # the move of the hard mode for the side to move, from the side to move's point of view
+        hard = HardMode(opening_book='', endgame_threshold=0, search_log='')
+        for text, result in zip(positions[:6], results):
+            position = parse_position(text)
+            if result['piece'] == 1:
+                position = Position.from_matrix([[3 - cell if cell else 0 for cell in row]
+                                                 for row in position.to_matrix()])
+            hard.clear()
+            self.assertEqual((result['move'], result['score']), hard.iterative_deepening(position, 0, 4))
+            self.assertIn(result['depth'], range(1, 5))
+
+        output = io.StringIO()
+        with mock.patch('sys.stdin', io.StringIO('4\n')), mock.patch('sys.stdout', output):
+            main(['-', '--depth', '2', '--every-move'])
+        self.assertEqual([json.loads(line)['ply'] for line in output.getvalue().splitlines()], [0, 1])
@@ -0,0 +1,32 @@
+from unittest import TestCase
+from start_game.benchmark import POSITION_SETS, benchmark_positions, run_benchmarks, compare
+from testing.test_repository import use_temporary_data_dir
+
+
+class TestBenchmark(TestCase):
+    def setUp(self):
+        use_temporary_data_dir(self)
+
+    def test_benchmark_positions(self):
+        for name, (pieces, seed) in POSITION_SETS.items():
+            positions = benchmark_positions(name)
+            self.assertEqual(len(positions), 8)
+            self.assertEqual(positions, benchmark_positions(name))
+            for position in positions:
+                self.assertEqual(position.move_count(), pieces)
+                self.assertFalse(position.is_winning(1) or position.is_winning(2))
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks('opening', min_time=0, rounds=1)
+        self.assertIn('minimax/depth2/opening', results['results'])
+        self.assertIn('repository.save/opening', results['results'])
+        for name, result in results['results'].items():
+            self.assertIn('opening', name)
+            self.assertGreater(result['ns_per_op'], 0)
+        self.assertGreater(results['results']['minimax/depth4/opening']['nodes_per_second'], 0)
+
+    def test_compare(self):
+        baseline = {'results': {'a': {'ns_per_op': 100}, 'b': {'ns_per_op': 100}}}
+        results = {'results': {'a': {'ns_per_op': 110}, 'b': {'ns_per_op': 130}, 'c': {'ns_per_op': 1}}}
+        self.assertEqual(compare(results, baseline, 0.2), [('b', 100, 130)])
+        self.assertEqual(compare(results, baseline, 0.05), [('a', 100, 110), ('b', 100, 130)])
@@ -1,12 +1,12 @@
 from unittest import TestCase
 from validator.playerValidator import validate_mode, InvalidInputMode
-from domain.boardJSON import BoardJSON
+from domain.position import Position
 from validator.playerValidator import validate_input, InvalidInput
 
 
 class Test(TestCase):
     def test_validate_input(self):
-        board = BoardJSON()
+        board = Position()
         self.assertRaises(InvalidInput, validate_input, board, "33")
         self.assertRaises(InvalidInput, validate_input, board, "casvcas")
 
@@ -14,9 +14,11 @@ class Test(TestCase):
         self.assertEqual(col, 4)
 
     def test_validate_mode(self):
-        board = BoardJSON()
+        board = Position()
         self.assertRaises(InvalidInputMode, validate_mode, "4", "game_mode")
-        self.assertRaises(InvalidInputMode, validate_mode, "4", "difficulty_mode")
+        self.assertRaises(InvalidInputMode, validate_mode, "4", "player_mode")
+        self.assertRaises(InvalidInputMode, validate_mode, "5", "difficulty_mode")
+        self.assertEqual(validate_mode("4", "difficulty_mode"), 4)
 
         op = validate_mode("2", "game_mode")
         op2 = validate_mode("2", "difficulty_mode")
@@ -0,0 +1,84 @@
+import random
+from unittest import TestCase
+from domain.position import Position
+import numpy as np
+from start_game.evaluation import IncrementalEvaluator, score_batch, child_boards
+from testing.test_minimax import list_score, random_position
+
+
+class TestIncrementalEvaluator(TestCase):
+    def test_same_score_as_score_position(self):
+        # random games, every position along the way is checked for both pieces and both difficulties
+        generator = random.Random(2021)
+        for _ in range(60):
+            position = Position()
+            evaluators = {(piece, difficulty): IncrementalEvaluator(piece, difficulty)
+                          for piece in (1, 2) for difficulty in ("medium", "hard")}
+            piece = 1
+            while position.valid_moves():
+                col = generator.choice(position.valid_moves())
+                row = position.play(col, piece)
+                for evaluator in evaluators.values():
+                    evaluator.play(row, col, piece)
+                for (score_piece, difficulty), evaluator in evaluators.items():
+                    self.assertEqual(evaluator.score(), list_score(position, score_piece, difficulty))
+                if position.is_winning(piece) or generator.random() < 0.05:
+                    break
+                piece = 3 - piece
+
+            # undoing every move gets back to the empty board
+            while position.moves():
+                col, piece = position.undo()
+                for evaluator in evaluators.values():
+                    evaluator.undo(position.height(col), col, piece)
+                for (score_piece, difficulty), evaluator in evaluators.items():
+                    self.assertEqual(evaluator.score(), list_score(position, score_piece, difficulty))
+
+    def test_from_position(self):
+        generator = random.Random(7)
+        for _ in range(30):
+            position = Position()
+            for _ in range(generator.randrange(30)):
+                position.play(generator.choice(position.valid_moves()), generator.choice((1, 2)))
+            for piece in (1, 2):
+                for difficulty in ("medium", "hard"):
+                    evaluator = IncrementalEvaluator.from_position(position, piece, difficulty)
+                    self.assertEqual(evaluator.score(), list_score(position, piece, difficulty))
+
+    def test_connect_n(self):
+        for rows, columns, connect in ((8, 9, 5), (10, 12, 5), (5, 5, 3)):
+            for seed in range(10):
+                position = random_position(seed * 7, seed, rows, columns, connect)
+                for piece in (1, 2):
+                    for difficulty in ("medium", "hard"):
+                        evaluator = IncrementalEvaluator.from_position(position, piece, difficulty)
+                        self.assertEqual(evaluator.score(), list_score(position, piece, difficulty))
+
+
+class TestScoreBatch(TestCase):
+    def test_same_score_as_score_position(self):
+        positions = [random_position(seed % 35, seed) for seed in range(100)]
+        boards = np.array([position.to_matrix() for position in positions], dtype=np.int8)
+        for piece in (1, 2):
+            for difficulty in ("medium", "hard"):
+                scores = score_batch(boards, piece, difficulty)
+                self.assertEqual(scores.shape, (100,))
+                for position, score in zip(positions, scores):
+                    self.assertEqual(int(score), list_score(position, piece, difficulty))
+
+    def test_connect_n(self):
+        positions = [random_position(seed * 3, seed, 10, 12, 5) for seed in range(20)]
+        boards = np.array([position.to_matrix() for position in positions], dtype=np.int8)
+        for difficulty in ("medium", "hard"):
+            scores = score_batch(boards, 2, difficulty, 5)
+            for position, score in zip(positions, scores):
+                self.assertEqual(int(score), list_score(position, 2, difficulty))
+
+    def test_child_boards(self):
+        position = random_position(8, 3)
+        columns, boards = child_boards(position, 2)
+        self.assertEqual(columns, position.valid_moves())
+        for col, board in zip(columns, boards):
+            position.play(col, 2)
+            self.assertEqual(board.tolist(), position.to_matrix())
+            position.undo()
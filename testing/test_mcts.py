@@ -0,0 +1,98 @@
+import random
+from unittest import TestCase
+from domain.position import Position, win_check
+from start_game.mcts import MonteCarloMode, threat_finder
+from start_game.profiling import MoveProfiler, computer_move, replay
+from start_game.tournament import parse_engine, engine_move
+from testing.test_minimax import random_position
+from testing.test_repository import use_temporary_data_dir
+
+
+class TestMonteCarloMode(TestCase):
+    def setUp(self):
+        self.directory = use_temporary_data_dir(self)
+
+    def test_threat_finder(self):
+        # the threats are the empty cells where one more piece wins
+        for rows, columns, connect in ((6, 7, 4), (8, 9, 5), (5, 5, 3)):
+            threats, bottom, cells = threat_finder(rows, columns, connect)
+            check = win_check(rows + 1, connect)
+            for seed in range(40):
+                position = random_position(seed, seed, rows, columns, connect)
+                occupied = position.bitboard(1) | position.bitboard(2)
+                for piece in (1, 2):
+                    bitboard = position.bitboard(piece)
+                    expected = 0
+                    for col in range(columns):
+                        for row in range(rows):
+                            bit = 1 << (col * (rows + 1) + row)
+                            if not occupied & bit and check(bitboard | bit):
+                                expected |= bit
+                    self.assertEqual(threats(bitboard) & ~occupied, expected)
+
+    def test_best_move(self):
+        for playouts in ('heuristic', 'random'):
+            mcts = MonteCarloMode(iterations=500, playouts=playouts, workers=1)
+            # the computer wins at once
+            position = Position()
+            for col, piece in ((0, 1), (1, 2), (0, 1), (1, 2), (6, 1), (1, 2), (5, 1)):
+                position.play(col, piece)
+            self.assertEqual(mcts.best_move(position)[0], 1)
+            # the computer blocks the player
+            position = Position()
+            for col, piece in ((0, 1), (6, 2), (1, 1), (6, 2), (2, 1)):
+                position.play(col, piece)
+            self.assertEqual(mcts.best_move(position)[0], 3)
+            self.assertEqual(mcts.played(), 500)
+
+        # the same seed and iterations give the same move, on any board
+        for geometry in ((6, 7, 4), (8, 9, 5)):
+            position = random_position(6, 2, *geometry)
+            moves = []
+            for _ in range(2):
+                random.seed(11)
+                moves.append(MonteCarloMode(iterations=300, workers=1).best_move(position))
+            self.assertEqual(moves[0], moves[1])
+            self.assertIn(moves[0][0], position.valid_moves())
+
+    def test_tree_reuse(self):
+        mcts = MonteCarloMode(iterations=400, workers=1)
+        position = Position()
+        position.play(3, 1)
+        column, rate = mcts.best_move(position)
+        self.assertEqual(mcts.reused(), 0)
+        visits = mcts.root_moves()
+        position.play(column, 2)
+        position.play(3, 1)
+        mcts.best_move(position)
+        self.assertGreater(mcts.reused(), 0)
+        self.assertLess(mcts.reused(), visits[column][0])
+
+        # a position which does not follow from the tree starts a new one
+        mcts.best_move(random_position(10, 4))
+        self.assertEqual(mcts.reused(), 0)
+
+    def test_workers(self):
+        mcts = MonteCarloMode(iterations=400, workers=2)
+        try:
+            position = random_position(8, 3)
+            column, rate = mcts.best_move(position)
+            self.assertIn(column, position.valid_moves())
+            self.assertEqual(mcts.played(), 400)
+            self.assertTrue(0 <= rate <= 1)
+        finally:
+            mcts.close()
+
+    def test_dispatch(self):
+        position = random_position(6, 5)
+        self.assertEqual(parse_engine('mcts:iterations=50,exploration=0.7'),
+                         ('mcts', {'iterations': 50, 'exploration': 0.7}))
+        column, played = engine_move('mcts:iterations=50', position)
+        self.assertIn(column, position.valid_moves())
+        self.assertEqual(played, 50)
+        self.assertIn(computer_move(MonteCarloMode(iterations=50, workers=1), 'mcts', position),
+                      position.valid_moves())
+
+        # a profiled move with a number of iterations is found again by the replay
+        column, path = MoveProfiler(self.directory).run(MonteCarloMode(iterations=200, workers=1), 'mcts', position)
+        self.assertEqual(replay(path)[0], column)
@@ -0,0 +1,171 @@
+import random
+import time
+from unittest import TestCase
+from domain.position import Position
+from start_game.minimax import MediumMode, HardMode, SearchTimeout
+
+
+def random_position(moves, seed, rows=6, columns=7, connect=4):
+    """
+    Play random moves on an empty board, stopping before anybody wins
+    """
+    generator = random.Random(seed)
+    position = Position(rows, columns, connect)
+    piece = 1
+    for _ in range(moves):
+        col = generator.choice(position.valid_moves())
+        position.play(col, piece)
+        if position.is_winning(piece):
+            position.undo()
+            break
+        piece = 3 - piece
+    return position
+
+
+def list_score(position, piece, difficulty):
+    """
+    The score computed the old way, with lists of <connect> cells
+    """
+    matrix = position.to_matrix()
+    rows, columns, connect = position.geometry()
+    windows = []
+    for r in range(rows):
+        for c in range(columns):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+                cells = [(r + dr * i, c + dc * i) for i in range(connect)]
+                if all(0 <= row < rows and 0 <= col < columns for row, col in cells):
+                    windows.append([matrix[row][col] for row, col in cells])
+    score = [matrix[r][columns // 2] for r in range(rows)].count(piece) * 3
+    for window in windows:
+        score += MediumMode.evaluate_score(window, piece, difficulty)
+    return score
+
+
+def plain_minimax(hard, position, depth, maximizing_player):
+    """
+    Minimax without any pruning, the leftmost best column is chosen
+    """
+    if position.is_winning(2):
+        return None, 10000000
+    if position.is_winning(1):
+        return None, -10000000
+    if position.is_full():
+        return None, 0
+    if depth == 0:
+        return None, hard.score_position(position, 2, "hard")
+    column, value = None, None
+    for col in position.valid_moves():
+        position.play(col, 2 if maximizing_player else 1)
+        new_score = plain_minimax(hard, position, depth - 1, not maximizing_player)[1]
+        position.undo()
+        if value is None or (maximizing_player and new_score > value) or \
+                (not maximizing_player and new_score < value):
+            column, value = col, new_score
+    return column, value
+
+
+class TestMediumMode(TestCase):
+    def test_score_position(self):
+        medium = MediumMode()
+        for seed in range(50):
+            position = random_position(seed % 30, seed)
+            for piece in (1, 2):
+                for difficulty in ("medium", "hard"):
+                    self.assertEqual(medium.score_position(position, piece, difficulty),
+                                     list_score(position, piece, difficulty))
+
+    def test_pick_best_move(self):
+        medium = MediumMode()
+        position = Position()
+        for col in (0, 1, 2):
+            position.play(col, 2)
+        self.assertEqual(medium.pick_best_move(position, 2), 3)
+        self.assertEqual(position.move_count(), 3)
+
+
+class TestHardMode(TestCase):
+    def test_minimax(self):
+        hard = HardMode()
+        position = Position()
+        for col in (0, 1, 2):
+            position.play(col, 1)
+        column, score = hard.minimax(position, 3, -10 ** 9, 10 ** 9, True)
+        self.assertEqual(column, 3)
+        self.assertEqual(position.move_count(), 3)
+
+        position = Position()
+        for col in (0, 1, 2):
+            position.play(col, 2)
+        column, score = hard.minimax(position, 1, -10 ** 9, 10 ** 9, True)
+        self.assertEqual(column, 3)
+        self.assertEqual(score, 10000000)
+
+    def test_minimax_same_as_plain_minimax(self):
+        for seed in range(40):
+            # a new transposition table for every position, so no deeper result from another search is used
+            hard = HardMode()
+            position = random_position(seed % 25, seed)
+            for depth in (1, 2, 3, 4):
+                for maximizing_player in (True, False):
+                    expected = plain_minimax(hard, position, depth, maximizing_player)
+                    actual = hard.minimax(position, depth, maximizing_player=maximizing_player)
+                    self.assertEqual(actual, expected)
+
+    def test_nodes(self):
+        hard = HardMode()
+        hard.minimax(Position(), 4)
+        pruned_nodes = hard.nodes()
+        self.assertGreater(pruned_nodes, 0)
+        self.assertLess(pruned_nodes, 1 + 7 + 7 ** 2 + 7 ** 3 + 7 ** 4)
+
+    def test_transposition_table(self):
+        hard = HardMode()
+        hard.minimax(Position(), 6)
+        nodes_first_search = hard.nodes()
+        stats = hard.table().stats()
+        self.assertGreater(stats['hits'], 0)
+        self.assertGreater(stats['entries'], 0)
+
+        # the same search again is answered mostly from the table
+        hard.minimax(Position(), 6)
+        self.assertLess(hard.nodes(), nodes_first_search)
+
+    def test_iterative_deepening(self):
+        position = random_position(10, 7)
+        expected = HardMode().minimax(position, 5)
+        hard = HardMode()
+        self.assertEqual(hard.iterative_deepening(position, max_depth=5), expected)
+        self.assertEqual(hard.principal_variation()[0], expected[0])
+        self.assertEqual(position.move_count(), random_position(10, 7).move_count())
+
+    def test_iterative_deepening_time_budget(self):
+        hard = HardMode()
+        position = Position()
+        start = time.perf_counter()
+        column, score = hard.iterative_deepening(position, time_budget=0.2)
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertIn(column, range(7))
+        self.assertEqual(position, Position())
+
+    def test_parallel_minimax(self):
+        hard = HardMode(workers=2)
+        try:
+            for seed in range(6):
+                position = random_position(seed * 4, seed)
+                self.assertEqual(hard.parallel_minimax(position, 4), HardMode().minimax(position, 4))
+            column, score = hard.iterative_deepening(Position(), time_budget=0.3)
+            self.assertIn(column, range(7))
+        finally:
+            hard.close()
+
+    def test_parallel_deadline(self):
+        # the moves which wait for a free worker get the time left, not a new budget
+        self.assertRaises(SearchTimeout, HardMode().search_move, Position(), 3, 6, time.time() - 1)
+        hard = HardMode(workers=2, opening_book='', endgame_threshold=0, search_log='')
+        try:
+            hard.iterative_deepening(Position(), time_budget=0.1)
+            start = time.perf_counter()
+            hard.iterative_deepening(random_position(3, 1), time_budget=0.5)
+            self.assertLess(time.perf_counter() - start, 0.8)
+        finally:
+            hard.close()
@@ -0,0 +1,50 @@
+import os
+import tempfile
+from unittest import TestCase
+from domain.position import Position
+from start_game.minimax import HardMode
+from start_game.opening_book import OpeningBook, InvalidBook, book_positions, build_book
+
+
+class TestOpeningBook(TestCase):
+    def test_book_positions(self):
+        positions = book_positions(3)
+        self.assertEqual(len(positions), len({position.key() for position in positions}))
+        self.assertEqual({position.move_count() for position in positions}, {1, 3})
+
+    def test_lookup(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'test.book')
+            self.assertEqual(build_book(path, 1, 4), 7)
+            book = OpeningBook(path)
+            self.assertEqual((len(book), book.plies(), book.depth()), (7, 1, 4))
+            for position in book_positions(1):
+                expected = HardMode(opening_book='').minimax(position, 4)
+                self.assertEqual(book.lookup(position), expected)
+
+            position = Position()
+            self.assertEqual(book.lookup(position), None)
+            position.play(3, 1)
+            position.play(3, 2)
+            position.play(3, 1)
+            self.assertEqual(book.lookup(position), None)
+            book.close()
+
+    def test_hard_mode(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'test.book')
+            build_book(path, 1, 4)
+            hard = HardMode(opening_book=path)
+            position = Position()
+            position.play(0, 1)
+            column, score = hard.iterative_deepening(position)
+            self.assertEqual((column, score), hard.opening_book().lookup(position))
+            self.assertEqual(hard.nodes(), 0)
+            hard.opening_book().close()
+
+    def test_invalid_book(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'test.book')
+            with open(path, 'wb') as f:
+                f.write(b'not an opening book')
+            self.assertRaises(InvalidBook, OpeningBook, path)
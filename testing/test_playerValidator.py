@@ -1,19 +1,33 @@
 from unittest import TestCase
-from domain.boardJSON import BoardJSON
-from validator.boardValidator import validate_column, InvalidColumn
+from domain.position import Position
+from validator.boardValidator import validate_column, InvalidColumn, validate_geometry, InvalidGeometry, \
+    validate_save_policy, InvalidSavePolicy
 
 
 class Test(TestCase):
     def test_validate_column(self):
-        board = BoardJSON()
+        board = Position()
         ans = validate_column(board, 1)
         self.assertEqual(ans, True)
 
-        board.drop_piece(board, 0, 0, 1)
-        board.drop_piece(board, 1, 0, 1)
-        board.drop_piece(board, 2, 0, 1)
-        board.drop_piece(board, 3, 0, 1)
-        board.drop_piece(board, 4, 0, 1)
-        board.drop_piece(board, 5, 0, 1)
+        for _ in range(6):
+            board.play(0, 1)
 
-        self.assertRaises(InvalidColumn, validate_column, board, 0)
\ No newline at end of file
+        self.assertRaises(InvalidColumn, validate_column, board, 0)
+
+    def test_validate_geometry(self):
+        self.assertEqual(validate_geometry(6, 7, 4), True)
+        self.assertEqual(validate_geometry(10, 12, 5), True)
+        self.assertEqual(validate_geometry(3, 9, 9), True)
+        self.assertRaises(InvalidGeometry, validate_geometry, 0, 7, 4)
+        self.assertRaises(InvalidGeometry, validate_geometry, 6, 7, 1)
+        self.assertRaises(InvalidGeometry, validate_geometry, 6, 7, 8)
+
+    def test_validate_save_policy(self):
+        self.assertEqual(validate_save_policy('move'), 'move')
+        self.assertEqual(validate_save_policy(' Exit '), 'exit')
+        self.assertEqual(validate_save_policy('never'), 'never')
+        self.assertEqual(validate_save_policy('10'), 10)
+        self.assertEqual(validate_save_policy(1), 'move')
+        self.assertRaises(InvalidSavePolicy, validate_save_policy, '0')
+        self.assertRaises(InvalidSavePolicy, validate_save_policy, 'often')
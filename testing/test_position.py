@@ -0,0 +1,101 @@
+import copy
+import random
+from unittest import TestCase
+from domain.position import Position, InvalidMove
+
+
+class TestPosition(TestCase):
+    def test_play_undo(self):
+        position = Position()
+        row = position.play(3, 1)
+        self.assertEqual(row, 0)
+        row = position.play(3, 2)
+        self.assertEqual(row, 1)
+        self.assertEqual(position.piece_at(0, 3), 1)
+        self.assertEqual(position.piece_at(1, 3), 2)
+        self.assertEqual(position.height(3), 2)
+        self.assertEqual(position.move_count(), 2)
+
+        position.undo()
+        self.assertEqual(position.piece_at(1, 3), 0)
+        self.assertEqual(position.height(3), 1)
+        position.undo()
+        self.assertEqual(position, Position())
+
+    def test_copy(self):
+        position = Position()
+        position.play(3, 1)
+        for other in (position.copy(), copy.copy(position), copy.deepcopy(position)):
+            self.assertEqual(other, position)
+            self.assertEqual(other.key(), position.key())
+            other.play(3, 2)
+            self.assertEqual(position.height(3), 1)
+
+    def test_valid_moves(self):
+        position = Position()
+        for _ in range(6):
+            position.play(0, 1)
+        self.assertEqual(position.valid_moves(), [1, 2, 3, 4, 5, 6])
+        self.assertRaises(InvalidMove, position.play, 0, 2)
+        self.assertFalse(position.is_full())
+
+    def test_is_winning(self):
+        position = Position()
+        for col in range(1, 5):
+            position.play(col, 1)
+        self.assertEqual(position.is_winning(1), True)
+        self.assertEqual(position.is_winning(2), False)
+
+        position = Position()
+        for _ in range(4):
+            position.play(0, 1)
+        self.assertEqual(position.is_winning(1), True)
+
+        matrix = [[0] * 7 for _ in range(6)]
+        for i in range(4):
+            matrix[1 + i][1 + i] = 2
+        self.assertEqual(Position.from_matrix(matrix).is_winning(2), True)
+
+        matrix = [[0] * 7 for _ in range(6)]
+        for i in range(4):
+            matrix[4 - i][1 + i] = 2
+        self.assertEqual(Position.from_matrix(matrix).is_winning(2), True)
+
+        # four pieces split over the top of a column and the bottom of the next one are not a win
+        matrix = [[0] * 7 for _ in range(6)]
+        matrix[4][0] = matrix[5][0] = matrix[0][1] = matrix[1][1] = 1
+        self.assertEqual(Position.from_matrix(matrix).is_winning(1), False)
+
+    def test_connect_n(self):
+        # the win check of every geometry agrees with a scan of all the lines of the matrix
+        for rows, columns, connect in ((6, 7, 4), (8, 9, 5), (10, 12, 5), (5, 5, 3), (4, 9, 6)):
+            position = Position(rows, columns, connect)
+            self.assertEqual(position.geometry(), (rows, columns, connect))
+            across, up = max(columns - connect + 1, 0), max(rows - connect + 1, 0)
+            lines = across * rows + up * columns + 2 * across * up
+            self.assertEqual(len(position.window_cells()), lines)
+            self.assertEqual(len(position.window_masks()), lines)
+
+            generator = random.Random(rows * 100 + connect)
+            for _ in range(40):
+                position = Position(rows, columns, connect)
+                for _ in range(generator.randrange(rows * columns)):
+                    position.play(generator.choice(position.valid_moves()), generator.choice((1, 2)))
+                matrix = position.to_matrix()
+                for piece in (1, 2):
+                    expected = any(all(matrix[row][col] == piece for row, col in window)
+                                   for window in position.window_cells())
+                    self.assertEqual(position.is_winning(piece), expected)
+                self.assertEqual(Position.from_matrix(matrix, rows, columns, connect), position)
+                self.assertEqual(position.copy(), position)
+
+        self.assertNotEqual(Position(6, 7, 4), Position(6, 7, 5))
+
+    def test_from_matrix(self):
+        matrix = [[0.0] * 7 for _ in range(6)]
+        matrix[0][2] = 1.0
+        matrix[1][2] = 2.0
+        position = Position.from_matrix(matrix)
+        self.assertEqual(position.height(2), 2)
+        self.assertEqual(position.to_matrix()[1][2], 2)
+        self.assertEqual(Position.from_board(position) is position, True)
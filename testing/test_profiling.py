@@ -0,0 +1,58 @@
+import json
+import os
+import pstats
+import random
+import tracemalloc
+from unittest import TestCase
+from start_game.minimax import EasyMode, MediumMode, HardMode
+from start_game.profiling import MoveProfiler, make_profiler, read_position, replay
+from start_game.start import Game
+from testing.test_minimax import random_position
+from testing.test_repository import use_temporary_data_dir
+
+
+class TestMoveProfiler(TestCase):
+    def setUp(self):
+        self.directory = use_temporary_data_dir(self)
+        self.profiler = MoveProfiler(os.path.join(self.directory, 'profiles'))
+
+    def test_run(self):
+        position = random_position(10, 4)
+        hard = HardMode(time_budget=0.2, opening_book='', endgame_threshold=0)
+        column, path = self.profiler.run(hard, 'hard', position)
+        self.assertEqual(column, hard.search_stats().column)
+        with open(path) as f:
+            record = json.load(f)
+        self.assertEqual(read_position(record), position)
+        self.assertEqual(record['search_stats']['pv'], hard.principal_variation())
+        self.assertEqual(record['hard_mode']['opening_book'], '')
+        self.assertGreater(record['peak_bytes'], 0)
+
+        name = path[:-len('.json')]
+        self.assertGreater(pstats.Stats(name + '.pstats').total_calls, 0)
+        self.assertGreater(len(tracemalloc.Snapshot.load(name + '.tracemalloc').traces), 0)
+
+    def test_replay(self):
+        # a new AI for every move, the replay starts with an empty transposition table too
+        for difficulty, make_ai in (('easy', EasyMode), ('medium', MediumMode),
+                                    ('hard', lambda: HardMode(time_budget=0.2, opening_book='', endgame_threshold=0))):
+            for seed in range(3):
+                column, path = self.profiler.run(make_ai(), difficulty, random_position(6 + seed * 2, seed))
+                self.assertEqual(replay(path)[0], column)
+
+    def test_random_state(self):
+        # profiling a move and replaying it do not change the random moves of the rest of the game
+        random.seed(7)
+        state = random.getstate()
+        column, path = self.profiler.run(EasyMode(), 'easy', random_position(6, 1))
+        self.assertEqual(random.getstate(), state)
+        replay(path)
+        self.assertEqual(random.getstate(), state)
+
+    def test_game(self):
+        game = Game()
+        self.assertIsNone(make_profiler())
+        game.set_dif('medium')
+        position = random_position(4, 1)
+        self.assertIn(game.find_computer_move(MediumMode(), position), position.valid_moves())
+        self.assertFalse(os.path.exists(self.profiler.directory()))
@@ -0,0 +1,102 @@
+import gzip
+import io
+import os
+from unittest import TestCase, mock
+from domain.position import Position
+from domain.records import InvalidRecord, format_moves, parse_moves, game_result, replay, write_record, \
+    read_record, read_records, write_records, import_games, export_games, main
+from domain.repository import GameRepository
+from start_game.analysis import analyse_positions
+from start_game.start import Game
+from start_game.tournament import run_tournament
+from testing.test_minimax import random_position
+from testing.test_repository import use_temporary_data_dir
+
+
+class TestRecords(TestCase):
+    def setUp(self):
+        self.directory = use_temporary_data_dir(self)
+
+    def test_moves(self):
+        self.assertEqual(format_moves([3, 3, 4, 2]), '4453')
+        self.assertEqual(parse_moves('4453'), [3, 3, 4, 2])
+        self.assertEqual(format_moves([5, 11, 0], 12), '6,12,1')
+        self.assertEqual(parse_moves('6,12,1', 12), [5, 11, 0])
+        self.assertEqual(parse_moves('10', 12), [9])
+        self.assertRaises(InvalidRecord, parse_moves, '4083')
+        self.assertRaises(InvalidRecord, parse_moves, '13', 12)
+
+    def test_replay(self):
+        # the same rules as a game played with Game.run_game
+        game = Game(GameRepository(self.directory))
+        game.set_battle_mode('player vs player')
+        board, turn = game.new_game()
+        columns = [3, 3, 4, 4, 5, 5, 6]
+        for col in columns:
+            game_over, board, turn = game.run_game(board, turn, col)
+        self.assertEqual(game_over, True)
+        self.assertEqual(replay(columns), board)
+        self.assertEqual(game_result(board), '1-0')
+
+        self.assertRaises(InvalidRecord, replay, columns + [0])
+        self.assertRaises(InvalidRecord, replay, [0] * 7)
+        self.assertRaises(InvalidRecord, replay, [7])
+        self.assertEqual(game_result(replay([])), '*')
+
+    def test_write_read(self):
+        for position in [random_position(seed * 5, seed) for seed in range(8)] + [random_position(9, 1, 10, 12, 5)]:
+            line = write_record(position, {'battle_mode': 'player vs computer'})
+            read, metadata = read_record(line)
+            self.assertEqual(read, position)
+            self.assertEqual(read.moves(), position.moves())
+            self.assertEqual(metadata['battle_mode'], 'player vs computer')
+            self.assertEqual(metadata['result'], game_result(position))
+        self.assertEqual(read.geometry(), (10, 12, 5))
+
+        self.assertEqual(read_record('4453')[0].moves(), [(3, 1), (3, 2), (4, 1), (2, 2)])
+        self.assertRaises(InvalidRecord, read_record, '4453\t{"result": "1-0"}')
+        self.assertRaises(InvalidRecord, read_record, '4453\t[1]')
+        self.assertRaises(InvalidRecord, write_record, Position.from_matrix([[1] + [0] * 6] + [[0] * 7] * 5))
+
+    def test_stream(self):
+        games = [(random_position(seed * 3, seed), {'n': seed}) for seed in range(10)]
+        for name in ('games.txt', 'games.txt.gz'):
+            path = os.path.join(self.directory, name)
+            self.assertEqual(export_games(path, iter(games)), 10)
+            read = list(import_games(path))
+            self.assertEqual([position for position, metadata in read], [position for position, metadata in games])
+            self.assertEqual([metadata['n'] for position, metadata in read], list(range(10)))
+        with gzip.open(path, 'rt') as f:
+            self.assertEqual(len(f.read().splitlines()), 10)
+
+        lines = io.StringIO()
+        write_records(games[:2], lines)
+        lines = ['# games', ''] + lines.getvalue().splitlines() + ['44444444']
+        self.assertEqual(len(list(read_records(lines, skip_invalid=True))), 2)
+        with self.assertRaises(InvalidRecord) as context:
+            list(read_records(lines))
+        self.assertIn('Line 5', str(context.exception))
+
+        # the games go straight into the analysis
+        results = list(analyse_positions((position for position, metadata in import_games(path)), depth=2,
+                                         endgame=0, every_move=True))
+        self.assertEqual(len(results), sum(position.move_count() + 1 for position, metadata in games))
+
+    def test_export(self):
+        path = os.path.join(self.directory, 'games.txt')
+        run_tournament(['easy', 'medium'], games=2, seed=3, games_path=path)
+        self.assertEqual([metadata['first'] for position, metadata in import_games(path)], ['easy', 'medium'])
+
+        game = Game()
+        game.set_battle_mode('player vs computer')
+        board, turn = game.new_game()
+        game.run_game(board, turn, 3)
+        main(['export', path])
+        position, metadata = list(import_games(path))[-1]
+        self.assertEqual(position.moves(), [(3, 1)])
+        self.assertEqual(metadata['battle_mode'], 'player vs computer')
+
+        output = io.StringIO()
+        with mock.patch('sys.stdout', output):
+            main(['check', path])
+        self.assertTrue(output.getvalue().startswith('3 games'))
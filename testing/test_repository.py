@@ -0,0 +1,195 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase, mock
+from domain.position import Position
+from domain.repository import GameRepository, InvalidJSON, board_from_string, board_to_string
+from start_game.settings import DATA_DIR_VARIABLE, SETTINGS_PATH, data_directory
+
+
+def use_temporary_data_dir(test_case):
+    """
+    Make the repositories created in the test save in a temporary directory, with a copy of the shipped save,
+    so the tests do not change the real save files
+    """
+    directory = tempfile.mkdtemp()
+    test_case.addCleanup(shutil.rmtree, directory)
+    shutil.copy(os.path.join(os.path.dirname(SETTINGS_PATH), 'Game.json'), directory)
+    patcher = mock.patch.dict(os.environ, {DATA_DIR_VARIABLE: directory})
+    patcher.start()
+    test_case.addCleanup(patcher.stop)
+    return directory
+
+
+def played(moves):
+    """
+    A position with the (column, piece) moves played on an empty board
+    """
+    position = Position()
+    for col, piece in moves:
+        position.play(col, piece)
+    return position
+
+
+class TestGameRepository(TestCase):
+    def setUp(self):
+        use_temporary_data_dir(self)
+
+    def test_save(self):
+        with tempfile.TemporaryDirectory() as directory:
+            repository = GameRepository(directory)
+            repository.save(played([(3, 1), (3, 2)]), 'player1', 'player vs computer', 'hard')
+
+            self.assertEqual(os.listdir(directory), ['Game.json'])
+            with open(os.path.join(directory, 'Game.json')) as f:
+                record = json.load(f)
+            self.assertEqual(record['version'], 2)
+            self.assertEqual(record['board'], '000100000020000' + '0' * 27)
+            self.assertEqual(record['moves'], [[0, 3, 1], [1, 3, 2]])
+            self.assertEqual(record['turn'], 'player1')
+            self.assertEqual(record['battle_mode'], 'player vs computer')
+            self.assertEqual(record['difficulty'], 'hard')
+
+    def test__load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            position = played([(6, 2), (0, 1)])
+            GameRepository(directory).save(position, 'player_ai', 'player vs computer', 'medium')
+
+            loaded = GameRepository(directory)
+            board, turn, battle_mode, difficulty = loaded._load()
+            self.assertEqual(board, position)
+            self.assertEqual(board.moves(), [(6, 2), (0, 1)])
+            self.assertEqual(turn, 'player_ai')
+            self.assertEqual(battle_mode, 'player vs computer')
+            self.assertEqual(difficulty, 'medium')
+
+            with open(os.path.join(directory, 'Game.json'), 'w') as f:
+                json.dump({'version': 99}, f)
+            self.assertRaises(InvalidJSON, loaded._load)
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(GameRepository(directory).load(), None)
+
+    def test_board_from_string(self):
+        position = played([(3, 1), (3, 2), (0, 1)])
+        self.assertEqual(board_from_string(board_to_string(position), 6, 7), position)
+        # a piece of column 3 above an empty cell
+        self.assertRaises(InvalidJSON, board_from_string, '0000000' * 2 + '0001000' + '0' * 21, 6, 7)
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'Game.json'), 'w') as f:
+                json.dump({'version': 2, 'board': '0' * 7 + '1' + '0' * 34, 'turn': 'player2',
+                           'battle_mode': 'player vs player', 'difficulty': None}, f)
+            self.assertRaises(InvalidJSON, GameRepository(directory)._load)
+
+    def test_geometry(self):
+        with tempfile.TemporaryDirectory() as directory:
+            position = Position(10, 12, 5)
+            for col, piece in ((11, 1), (0, 2), (11, 1)):
+                position.play(col, piece)
+            GameRepository(directory).save(position, 'player2', 'player vs player', None)
+            with open(os.path.join(directory, 'Game.json')) as f:
+                record = json.load(f)
+            self.assertEqual((record['rows'], record['columns'], record['connect']), (10, 12, 5))
+
+            board = GameRepository(directory)._load()[0]
+            self.assertEqual(board.geometry(), (10, 12, 5))
+            self.assertEqual(board, position)
+            self.assertEqual(board.moves(), position.moves())
+
+    def test__load_legacy(self):
+        with tempfile.TemporaryDirectory() as directory:
+            data = {str(row): {str(col): "0.0" for col in range(7)} for row in range(6)}
+            data["0"]["2"] = "1.0"
+            data["1"]["2"] = "2.0"
+            for name, value in (('Board.json', data), ('Turn.json', 'player2'),
+                                ('Battle mode.json', 'player vs player'), ('Difficulty.json', None)):
+                with open(os.path.join(directory, name), 'w') as f:
+                    json.dump(value, f)
+
+            board, turn, battle_mode, difficulty = GameRepository(directory)._load()
+            self.assertEqual(board.piece_at(0, 2), 1)
+            self.assertEqual(board.piece_at(1, 2), 2)
+            self.assertEqual(turn, 'player2')
+            self.assertEqual(battle_mode, 'player vs player')
+            # the old files are imported into the new save file
+            self.assertEqual(os.path.exists(os.path.join(directory, 'Game.json')), True)
+
+    def test_record_move(self):
+        with tempfile.TemporaryDirectory() as directory:
+            repository = GameRepository(directory)
+            position = Position()
+            repository.save(position, 'player1', 'player vs player', None)
+            row = position.play(3, 1)
+            repository.record_move(position, row, 3, 1, 'player2', 'player vs player', None)
+            row = position.play(3, 2)
+            repository.record_move(position, row, 3, 2, 'player1', 'player vs player', None)
+
+            # the snapshot did not change, the moves are in the journal
+            with open(os.path.join(directory, 'Game.json')) as f:
+                self.assertEqual(json.load(f)['board'], '0' * 42)
+            with open(os.path.join(directory, 'Game.journal')) as f:
+                self.assertEqual(len(f.readlines()), 2)
+
+            loaded = GameRepository(directory)
+            board, turn, battle_mode, difficulty = loaded._load()
+            self.assertEqual(board, position)
+            self.assertEqual(board.moves(), [(3, 1), (3, 2)])
+            self.assertEqual(turn, 'player1')
+
+            # a line that was not written completely is ignored
+            with open(os.path.join(directory, 'Game.journal'), 'a') as f:
+                f.write('{"n":3,"mo')
+            board, turn, battle_mode, difficulty = loaded._load()
+            self.assertEqual(board.moves(), [(3, 1), (3, 2)])
+
+    def test_snapshot_compaction(self):
+        with tempfile.TemporaryDirectory() as directory:
+            repository = GameRepository(directory)
+            position = Position()
+            repository.save(position, 'player1', 'player vs player', None)
+            repository._snapshot_interval = 3
+            moves = [(0, 1), (1, 2), (2, 1), (0, 2)]
+            for col, piece in moves:
+                row = position.play(col, piece)
+                repository.record_move(position, row, col, piece, 'player1', 'player vs player', None)
+
+            # the third move saved a snapshot and emptied the journal
+            with open(os.path.join(directory, 'Game.json')) as f:
+                self.assertEqual(len(json.load(f)['moves']), 3)
+            with open(os.path.join(directory, 'Game.journal')) as f:
+                journal = f.readlines()
+            self.assertEqual(len(journal), 1)
+
+            # if the journal was not emptied after the snapshot, its old moves are not played twice
+            with open(os.path.join(directory, 'Game.journal'), 'w') as f:
+                f.write(json.dumps({'n': 3, 'move': [0, 2, 1], 'turn': 'player1', 'battle_mode': 'player vs player',
+                                    'difficulty': None}) + '\n' + journal[0])
+            board, turn, battle_mode, difficulty = GameRepository(directory)._load()
+            self.assertEqual(board.moves(), moves)
+            self.assertEqual(board, position)
+
+    def test_data_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch.dict(os.environ, {DATA_DIR_VARIABLE: directory}):
+                self.assertEqual(data_directory(), directory)
+                GameRepository().save(Position(), 'player1', 'player vs player', None)
+            self.assertEqual(os.listdir(directory), ['Game.json'])
+
+    def test_shared_state(self):
+        with tempfile.TemporaryDirectory() as directory:
+            repository = GameRepository(directory)
+            position = Position()
+            repository.save(position, 'player1', 'player vs player', None)
+            row = position.play(3, 1)
+            repository.record_move(position, row, 3, 1, 'player2', 'player vs player', None)
+
+            # the other repositories of the same file get the game without reading the file again
+            os.remove(os.path.join(directory, 'Game.json'))
+            board, turn, battle_mode, difficulty = GameRepository(directory).load()
+            self.assertEqual(board, position)
+            self.assertEqual(turn, 'player2')
+
+            # but every loaded game has its own position
+            board.play(4, 2)
+            self.assertEqual(GameRepository(directory).load()[0], position)
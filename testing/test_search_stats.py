@@ -0,0 +1,77 @@
+import json
+import os
+from unittest import TestCase
+from domain.position import Position
+from start_game.minimax import HardMode
+from testing.test_minimax import random_position
+from testing.test_repository import use_temporary_data_dir
+from testing.test_solver import endgame_position
+
+
+class TestSearchStats(TestCase):
+    def setUp(self):
+        self.directory = use_temporary_data_dir(self)
+
+    def test_minimax(self):
+        hard = HardMode(opening_book='')
+        column, score = hard.minimax(random_position(8, 2), 4)
+        stats = hard.search_stats()
+        self.assertEqual((stats.source, stats.column, stats.score), ('search', column, score))
+        self.assertEqual(stats.nodes(), hard.nodes())
+        self.assertEqual(len(stats.nodes_by_ply), 5)
+        self.assertEqual(stats.nodes_by_ply[0], 1)
+        self.assertGreater(stats.leaf_evaluations, 0)
+        self.assertLessEqual(stats.first_move_cutoffs, stats.cutoffs)
+        self.assertLessEqual(stats.tt_cutoffs, stats.tt_hits)
+        self.assertLessEqual(stats.tt_hits, stats.tt_probes)
+        self.assertTrue(1 <= stats.branching_factor() <= 7)
+        self.assertEqual(stats.pv, hard.principal_variation())
+        self.assertEqual(stats.depth(), 4)
+
+    def test_iterative_deepening(self):
+        hard = HardMode(opening_book='', endgame_threshold=0)
+        hard.iterative_deepening(random_position(10, 7), max_depth=5)
+        stats = hard.search_stats()
+        self.assertEqual([iteration['depth'] for iteration in stats.iterations], [1, 2, 3, 4, 5])
+        self.assertTrue(all(iteration['completed'] for iteration in stats.iterations))
+        self.assertEqual(sum(iteration['nodes'] for iteration in stats.iterations), stats.nodes())
+        self.assertEqual(stats.nodes(), hard.nodes())
+        self.assertIn('depth 5', stats.summary())
+
+    def test_book_and_solver(self):
+        hard = HardMode()
+        position = Position()
+        position.play(3, 1)
+        hard.iterative_deepening(position)
+        self.assertEqual(hard.search_stats().source, 'book')
+        self.assertEqual(hard.search_stats().nodes(), 0)
+
+        position, piece = endgame_position(32, 1)
+        hard.iterative_deepening(position)
+        stats = hard.search_stats()
+        self.assertEqual(stats.source, 'solver')
+        self.assertEqual(stats.solver_nodes, hard.nodes())
+        self.assertEqual(stats.pv, [stats.column])
+
+    def test_parallel(self):
+        hard = HardMode(workers=2, opening_book='', endgame_threshold=0)
+        try:
+            hard.iterative_deepening(random_position(6, 3), max_depth=3)
+        finally:
+            hard.close()
+        stats = hard.search_stats()
+        self.assertEqual(stats.source, 'parallel')
+        self.assertEqual(stats.depth(), 3)
+        self.assertGreater(stats.leaf_evaluations, 0)
+
+    def test_search_log(self):
+        hard = HardMode(opening_book='', endgame_threshold=0, search_log='logs/search.jsonl')
+        self.assertEqual(hard.search_log(), os.path.join(self.directory, 'logs/search.jsonl'))
+        hard.iterative_deepening(Position(), max_depth=3)
+        hard.minimax(random_position(4, 1), 2)
+        with open(hard.search_log()) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record['moves'] for record in records], [0, 4])
+        self.assertEqual(records[0]['depth'], 3)
+        self.assertEqual(records[1]['nodes'], hard.nodes())
+        self.assertIsNone(HardMode(search_log='').search_log())
@@ -0,0 +1,98 @@
+import random
+from unittest import TestCase
+from domain.position import Position
+from start_game.minimax import HardMode
+from start_game.solver import EndgameSolver
+from start_game.start import Game
+from testing.test_repository import use_temporary_data_dir
+
+
+def full_search(position, piece):
+    """
+    The score of the position searched without any pruning
+    """
+    cells = position.rowcount() * position.columncount()
+    best = None
+    for col in position.valid_moves():
+        position.play(col, piece)
+        if position.is_winning(piece):
+            score = cells + 1 - position.move_count()
+        elif position.is_full():
+            score = 0
+        else:
+            score = -full_search(position, 3 - piece)
+        position.undo()
+        if best is None or score > best:
+            best = score
+    return best
+
+
+def endgame_position(moves, seed):
+    """
+    A position of random moves which do not win, with the piece that moves
+    """
+    generator = random.Random(seed)
+    position = Position()
+    piece = 1
+    while position.move_count() < moves:
+        columns = []
+        for col in position.valid_moves():
+            position.play(col, piece)
+            if not position.is_winning(piece):
+                columns.append(col)
+            position.undo()
+        if not columns:
+            position = Position()
+            piece = 1
+            continue
+        position.play(generator.choice(columns), piece)
+        piece = 3 - piece
+    return position, piece
+
+
+class TestEndgameSolver(TestCase):
+    def test_solve(self):
+        solver = EndgameSolver()
+        for seed in range(15):
+            position, piece = endgame_position(34, seed)
+            self.assertEqual(solver.solve(position, piece), full_search(position, piece))
+            self.assertEqual(position.move_count(), 34)
+
+    def test_best_move(self):
+        # the computer wins at once in column 0, or later in other ways
+        position = Position()
+        for col, piece in [(0, 2), (1, 1), (0, 2), (1, 1), (0, 2), (1, 1)]:
+            position.play(col, piece)
+        solver = EndgameSolver()
+        column, score = solver.best_move(position, 2)
+        self.assertEqual(column, 0)
+        self.assertEqual(EndgameSolver.result(score), 'win')
+        self.assertEqual(EndgameSolver.distance(position, score), 1)
+
+    def test_hard_mode(self):
+        position, piece = endgame_position(30, 3)
+        hard = HardMode(endgame_threshold=12)
+        column, score = hard.iterative_deepening(position)
+        expected_column, expected_score = EndgameSolver().best_move(position, 2)
+        self.assertEqual(column, expected_column)
+        if expected_score == 0:
+            self.assertEqual(score, 0)
+        else:
+            distance = EndgameSolver.distance(position, expected_score)
+            self.assertEqual(abs(score), 10000000 - distance)
+
+
+class TestGameSolver(TestCase):
+    def setUp(self):
+        use_temporary_data_dir(self)
+
+    def test_solve_position(self):
+        game = Game()
+        self.assertEqual(game.solve_position(Position(), 1), None)
+
+        position, piece = endgame_position(34, 5)
+        column, result, distance = game.solve_position(position, piece)
+        score = full_search(position, piece)
+        self.assertEqual(result, EndgameSolver.result(score))
+        self.assertEqual(distance, EndgameSolver.distance(position, score))
+        self.assertIn(column, position.valid_moves())
@@ -1,9 +1,15 @@
+import os
 from unittest import TestCase
+from domain.repository import GameRepository
+from testing.test_repository import use_temporary_data_dir
 from start_game.start import Game
-from domain.boardJSON import BoardJSON
+from domain.position import Position
+from validator.boardValidator import InvalidGeometry, InvalidSavePolicy
 
 
 class TestGame(TestCase):
+    def setUp(self):
+        self.directory = use_temporary_data_dir(self)
 
     def test_next_turn(self):
         game = Game()
@@ -32,11 +38,11 @@ class TestGame(TestCase):
 
     def test_play_turn(self):
         game = Game()
-        board = BoardJSON()
-        board.create_board("player1", "player vs player")
+        game.set_battle_mode("player vs player")
+        board = Position()
         game_over, board, turn = game.play_turn(board, "player1", 4, 1)
         import numpy as np
-        actual_matrix = np.flip(board.boardmatrix(), 0)
+        actual_matrix = np.flip(board.to_matrix(), 0)
         matrix = np.zeros((6, 7))
         matrix[0][4] = 1
         expected_matrix = np.flip(matrix, 0)
@@ -50,7 +56,7 @@ class TestGame(TestCase):
 
     def test_run_game(self):
         game = Game()
-        board = BoardJSON()
+        board, turn, battle_mode = game.load_game()
         game_over, board, turn = game.run_game(board, "player1", 3)
         game_over, board, turn = game.run_game(board, "player2", 3)
         game_over, board, turn = game.run_game(board, "player_ai", 3)
@@ -61,11 +67,66 @@ class TestGame(TestCase):
         import numpy as np
         matrix = np.zeros((6, 7))
         expected_matrix = np.flip(matrix, 0)
-        self.assertEqual(board.boardmatrix().tolist(), expected_matrix.tolist())
+        self.assertEqual(board.to_matrix(), expected_matrix.tolist())
         game_over, board, turn = game.play_turn(board, "player1", 4, 1)
 
         board, turn, battle_mode = game.load_game()
         expected_matrix[0][4] = 1
-        self.assertEqual(expected_matrix.tolist(), board.boardmatrix().tolist())
+        self.assertEqual(expected_matrix.tolist(), board.to_matrix())
+        self.assertEqual(battle_mode, game.battle_mode())
 
+    def test_geometry(self):
+        game = Game(rows=8, columns=9, connect=5)
+        self.assertEqual((game.rowcount(), game.columncount(), game.connect()), (8, 9, 5))
+        game.set_battle_mode("player vs player")
+        board, turn = game.new_game()
+        self.assertEqual(board.geometry(), (8, 9, 5))
+        for col in range(4):
+            game_over, board, turn = game.run_game(board, "player1", col)
+            self.assertEqual(game_over, False)
+            game_over, board, turn = game.run_game(board, "player2", col)
+        game_over, board, turn = game.run_game(board, "player1", 4)
+        self.assertEqual(game_over, True)
 
+        # a loaded game keeps the size it was saved with
+        game = Game()
+        board, turn, battle_mode = game.load_game()
+        self.assertEqual(board.geometry(), (8, 9, 5))
+        self.assertEqual((game.rowcount(), game.columncount(), game.connect()), (8, 9, 5))
+
+        self.assertRaises(InvalidGeometry, Game, rows=6, columns=7, connect=9)
+
+    def test_save_policy(self):
+        journal = os.path.join(self.directory, 'Game.journal')
+        save = os.path.join(self.directory, 'Game.json')
+        for policy, saves in (('move', [True] * 5), (2, [False, True, False, True, False]), ('exit', [False] * 5),
+                              ('never', [False] * 5)):
+            for path in (save, journal):
+                if os.path.exists(path):
+                    os.remove(path)
+            game = Game(GameRepository(), save_policy=policy)
+            game.set_battle_mode("player vs player")
+            board, turn = game.new_game()
+            self.assertEqual(os.path.exists(save), policy == 'move')
+            for col, saved in zip((0, 1, 0, 1, 0), saves):
+                game_over, board, turn = game.run_game(board, turn, col)
+                self.assertEqual(game.has_unsaved_moves(), not saved)
+                if saved:
+                    self.assertEqual(GameRepository()._load()[0], board)
+
+            game.close()
+            self.assertEqual(game.has_unsaved_moves(), policy == 'never')
+            if policy == 'never':
+                self.assertFalse(os.path.exists(save) or os.path.exists(journal))
+            else:
+                self.assertEqual(GameRepository()._load()[0], board)
+                self.assertEqual(GameRepository()._load()[2], "player vs player")
+
+        # flush saves even with the policy never
+        game = Game(save_policy='never')
+        board, turn = game.new_game()
+        game.run_game(board, turn, 3)
+        self.assertEqual(game.flush(), True)
+        self.assertEqual(game.flush(), False)
+        self.assertEqual(GameRepository()._load()[0].moves(), [(3, 1)])
+        self.assertRaises(InvalidSavePolicy, Game, save_policy='sometimes')
@@ -0,0 +1,61 @@
+import os
+from unittest import TestCase
+from domain.position import Position
+from start_game.tournament import InvalidEngine, parse_engine, swap_pieces, play_game, random_opening, \
+    elo_ratings, run_tournament
+from testing.test_repository import use_temporary_data_dir
+
+
+class TestTournament(TestCase):
+    def setUp(self):
+        self.directory = use_temporary_data_dir(self)
+
+    def test_parse_engine(self):
+        self.assertEqual(parse_engine('easy'), ('easy', {}))
+        self.assertEqual(parse_engine('hard:depth=4'), ('hard', {'depth': 4}))
+        self.assertEqual(parse_engine('hard:time=0.5,book=0'), ('hard', {'time': 0.5, 'book': 0}))
+        self.assertRaises(InvalidEngine, parse_engine, 'impossible')
+        self.assertRaises(InvalidEngine, parse_engine, 'medium:depth=3')
+        self.assertRaises(InvalidEngine, parse_engine, 'hard:depth=deep')
+
+    def test_swap_pieces(self):
+        position = Position()
+        position.play(3, 1)
+        position.play(4, 2)
+        swapped = swap_pieces(position)
+        self.assertEqual(swapped.piece_at(0, 3), 2)
+        self.assertEqual(swapped.piece_at(0, 4), 1)
+        self.assertEqual(swap_pieces(swapped), position)
+
+    def test_play_game(self):
+        opening = random_opening(4, 7)
+        self.assertEqual(opening, random_opening(4, 7))
+        game = play_game('hard:depth=2', 'easy', opening)
+        self.assertIn(game['result'], (-1, 0, 1))
+        self.assertEqual(sum(game['turns']) + len(opening), game['moves'])
+
+        opening = random_opening(6, 3, (10, 12, 5))
+        game = play_game('hard:depth=2', 'medium', opening, (10, 12, 5))
+        self.assertIn(game['result'], (-1, 0, 1))
+        self.assertEqual(sum(game['turns']) + len(opening), game['moves'])
+        self.assertEqual(swap_pieces(Position(8, 9, 5)).geometry(), (8, 9, 5))
+
+    def test_elo_ratings(self):
+        ratings = elo_ratings(['a', 'b'], [('a', 'b', 1)] * 3 + [('b', 'a', 0)] * 3)
+        self.assertEqual(ratings['a'], 0)
+        self.assertLess(ratings['b'], 0)
+        ratings = elo_ratings(['a', 'b'], [('a', 'b', 0.5)] * 4)
+        self.assertAlmostEqual(ratings['b'], 0)
+
+    def test_run_tournament(self):
+        files = set(os.listdir(self.directory))
+        for workers in (1, 2):
+            report = run_tournament(['easy', 'medium', 'hard:depth=2'], games=4, workers=workers, seed=1)
+            for stats in report.values():
+                self.assertEqual(stats['games'], 8)
+                self.assertEqual(stats['wins'] + stats['draws'] + stats['losses'], 8)
+            self.assertEqual(sum(stats['wins'] for stats in report.values()),
+                             sum(stats['losses'] for stats in report.values()))
+            self.assertEqual(report['easy']['elo'], 0)
+        # nothing was saved
+        self.assertEqual(set(os.listdir(self.directory)), files)
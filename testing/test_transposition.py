@@ -0,0 +1,48 @@
+from unittest import TestCase
+from domain.position import Position
+from start_game.transposition import TranspositionTable
+
+
+class TestTranspositionTable(TestCase):
+    def test_probe_store(self):
+        table = TranspositionTable()
+        self.assertEqual(table.probe(1), None)
+        table.store(1, 3, 25, TranspositionTable.EXACT, 4)
+        self.assertEqual(table.probe(1), (3, 25, TranspositionTable.EXACT, 4))
+
+        # a shallower search does not replace a deeper one
+        table.store(1, 2, 10, TranspositionTable.LOWER, 2)
+        self.assertEqual(table.probe(1), (3, 25, TranspositionTable.EXACT, 4))
+        table.store(1, 5, 10, TranspositionTable.LOWER, 2)
+        self.assertEqual(table.probe(1), (5, 10, TranspositionTable.LOWER, 2))
+
+        stats = table.stats()
+        self.assertEqual(stats['hits'], 3)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['probes'], 4)
+
+    def test_eviction(self):
+        table = TranspositionTable(memory_mb=3 * TranspositionTable.ENTRY_SIZE / (1024 * 1024))
+        self.assertEqual(table.capacity(), 3)
+        for key in range(3):
+            table.store(key, 1, key, TranspositionTable.EXACT, None)
+        # key 0 was used recently, so key 1 is the least recently used one
+        table.probe(0)
+        table.store(3, 1, 3, TranspositionTable.EXACT, None)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.stats()['evictions'], 1)
+        self.assertEqual(table.probe(1), None)
+        self.assertNotEqual(table.probe(0), None)
+
+    def test_zobrist_key(self):
+        first = Position()
+        first.play(0, 1)
+        first.play(1, 2)
+        second = Position()
+        second.play(1, 2)
+        second.play(0, 1)
+        self.assertEqual(first.key(), second.key())
+        self.assertEqual(Position.from_matrix(first.to_matrix()).key(), first.key())
+        first.undo()
+        first.undo()
+        self.assertEqual(first.key(), Position().key())
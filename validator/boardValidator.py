@@ -4,12 +4,22 @@ class InvalidColumn(Exception):
         super().__init__(msg)
 
 
+class InvalidGeometry(Exception):
+    def __init__(self, msg):
+        super().__init__(msg)
+
+
+class InvalidSavePolicy(Exception):
+    def __init__(self, msg):
+        super().__init__(msg)
+
+
 # ----- VALIDATION FUNCTIONS -----
 def validate_column(board, col):
     """
     Checks if yhe player can put another piece on top
     -- Variables:
-    :param board: the board itself (type: class <Board>)
+    :param board: the board itself (type: class <Position>)
     :param col: the column input from the player (type: <int>)
 
     -- Raises:
@@ -17,9 +27,47 @@ def validate_column(board, col):
 
     :return: true if it's ok, false if not (type: <bool>)
     """
-    upper_row = board.rowcount() - 1
-    matrix = board.boardmatrix()
-    if matrix[upper_row][col] != 0:
+    if not board.can_play(col):
         raise InvalidColumn('The column is full!')
     else:
         return True
+
+
+def validate_geometry(rows, columns, connect):
+    """
+    Checks if a game can be played on the board
+    -- Variables:
+    :param rows: the number of rows (type: <int>)
+    :param columns: the number of columns (type: <int>)
+    :param connect: how many pieces in a row win (type: <int>)
+
+    -- Raises:
+    InvalidGeometry - if the board is empty or no line of <connect> pieces fits on it
+
+    :return: true if it's ok (type: <bool>)
+    """
+    if rows < 1 or columns < 1:
+        raise InvalidGeometry('The board should have at least one row and one column!')
+    if not 2 <= connect <= max(rows, columns):
+        raise InvalidGeometry('The number of pieces in a row should be between 2 and ' + str(max(rows, columns)))
+    return True
+
+
+def validate_save_policy(policy):
+    """
+    Checks when the game should be saved
+    -- Variables:
+    :param policy: move, exit, never or a number of moves (type: <str> or <int>)
+
+    -- Raises:
+    InvalidSavePolicy - if the policy is none of them
+
+    :return: move, exit, never or the number of moves, at least 2 (a save every move is move)
+             (type: <str> or <int>)
+    """
+    text = str(policy).strip().lower()
+    if text in ('move', 'exit', 'never'):
+        return text
+    if not text.isdigit() or int(text) < 1:
+        raise InvalidSavePolicy('The save policy should be move, exit, never or a number of moves')
+    return 'move' if int(text) == 1 else int(text)
@@ -14,7 +14,7 @@ def validate_input(board, col):
     """
     Validates the player input
     -- Variables:
-    :param board: the board itself (type: class <Board>)
+    :param board: the board itself (type: class <Position>)
     :param col: the column input from the player (type: <str>)
 
     --Raises:
@@ -36,13 +36,14 @@ def validate_mode(option, mode):
     :return: type: <int>
     """
     options = ["1", "2", "3"]
+    difficulty_options = options + ["4"]
     if mode == "game_mode" or mode == "player_mode":
         if option in options and option != "3":
             return int(option)
         else:
             raise InvalidInputMode("The option should be either 1 or 2")
     elif mode == "difficulty_mode":
-        if option in options:
+        if option in difficulty_options:
             return int(option)
         else:
-            raise InvalidInputMode("The option should be either 1, 2 or 3")
\ No newline at end of file
+            raise InvalidInputMode("The option should be either 1, 2, 3 or 4")
\ No newline at end of file